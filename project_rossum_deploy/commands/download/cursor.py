@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.common.local_state import read_state, update_state
+from project_rossum_deploy.common.local_index import read_local_entry
+from project_rossum_deploy.common.modified_at import MIRRORED_REFERENCES
+from project_rossum_deploy.utils.consts import settings
+
+
+def parse_timestamp(timestamp: str) -> datetime:
+    if not timestamp:
+        return None
+    try:
+        return datetime.fromisoformat(timestamp)
+    except ValueError:
+        return None
+
+
+def has_same_mirrored_references(
+    resource: Resource, local_object: dict, remote_object: dict
+) -> bool:
+    """Rossum changes these references from the other side (e.g., hook.queues <-> queue.hooks) without updating modified_at."""
+    return all(
+        local_object.get(attribute, []) == remote_object.get(attribute, [])
+        for attribute, _ in MIRRORED_REFERENCES.get(resource, [])
+    )
+
+
+class SyncCursor:
+    """Per resource type, the point in time up to which the last successful pull of a destination is complete.
+
+    This is the highest modified_at seen, but never later than the pull start minus a safety margin,
+    since objects modified while the listing was paginated might have been served in their old version.
+    Objects listed with a modified_at up to the cursor were already pulled, so they don't have to be refetched or rewritten,
+    as long as their local file is still in place.
+    """
+
+    def __init__(
+        self,
+        destination: str,
+        timestamps: dict[str, str] = None,
+        pending_ids: list[int] = None,
+    ):
+        self.destination = destination
+        self.previous_timestamps = {
+            resource: parse_timestamp(timestamp)
+            for resource, timestamp in (timestamps or {}).items()
+        }
+        # Objects that were modified in Rossum, but the user chose to keep their local version
+        self.previous_pending_ids = set(pending_ids or [])
+        self.timestamps: dict[str, datetime] = {}
+        self.pending_ids = set()
+        self.started_at = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.SYNC_CURSOR_SAFETY_MARGIN_SECONDS
+        )
+
+    @classmethod
+    async def load(cls, org_path: Path, destination: str, download_all: bool = False):
+        # Full reconciliation starts from scratch, but still records a new cursor
+        if download_all:
+            return cls(destination)
+
+        state = await read_state(org_path, settings.SYNC_CURSOR_FILENAME)
+        destination_state = state.get(destination, {})
+        return cls(
+            destination,
+            timestamps=destination_state.get("timestamps", {}),
+            pending_ids=destination_state.get("pending_ids", []),
+        )
+
+    async def save(self, org_path: Path):
+        destination_state = {
+            "timestamps": {
+                resource: min(timestamp, self.started_at).isoformat()
+                for resource, timestamp in self.timestamps.items()
+            },
+            "pending_ids": sorted(self.pending_ids),
+        }
+        # Source and target cursors might be saved concurrently
+        await update_state(
+            org_path,
+            settings.SYNC_CURSOR_FILENAME,
+            lambda state: state.update({self.destination: destination_state}),
+        )
+
+    async def is_unchanged(self, resource: Resource, object: dict, path: Path) -> bool:
+        """Checks (without fetching the object) whether the listed remote object was already pulled to the path."""
+        cursor = self.previous_timestamps.get(resource.value, None)
+        modified_at = parse_timestamp(object.get("modified_at", ""))
+        if (
+            not cursor
+            or not modified_at
+            or modified_at > cursor
+            or object["id"] in self.previous_pending_ids
+        ):
+            return False
+
+        if not (local_entry := await read_local_entry(path)):
+            return False
+
+        return has_same_mirrored_references(resource, local_entry, object)
+
+    def see(self, resource: Resource, object: dict):
+        modified_at = parse_timestamp(object.get("modified_at", ""))
+        if not modified_at:
+            return
+        cursor = self.timestamps.get(resource.value, None)
+        if not cursor or modified_at > cursor:
+            self.timestamps[resource.value] = modified_at
+
+    def mark_pending(self, object: dict):
+        self.pending_ids.add(object["id"])
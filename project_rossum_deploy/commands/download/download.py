@@ -7,14 +7,18 @@ from rich import print
 from rich.panel import Panel
 
 import click
+from project_rossum_deploy.commands.download.cursor import SyncCursor
 from project_rossum_deploy.commands.download.helpers import (
     get_all_objects_for_destination,
+    index_remote_objects,
     remove_local_nonexistent_objects,
     replace_code_paths,
     should_write_object,
 )
 from project_rossum_deploy.commands.download.hooks import download_hooks
 from project_rossum_deploy.common.client import create_and_validate_client
+from project_rossum_deploy.common.fetch import is_complete_object
+from project_rossum_deploy.common.local_index import save_local_indexes
 from project_rossum_deploy.common.mapping import (
     create_update_mapping,
     extract_sources_targets,
@@ -23,7 +27,7 @@ from project_rossum_deploy.common.mapping import (
 
 from project_rossum_deploy.commands.download.schemas import download_schemas
 from project_rossum_deploy.commands.download.workspaces import download_workspaces
-from project_rossum_deploy.common.git import get_changed_file_paths
+from project_rossum_deploy.common.git import GitChanges, read_git_changes
 from project_rossum_deploy.commands.migrate_mapping import migrate_mapping
 from project_rossum_deploy.common.mapping import create_empty_mapping
 from project_rossum_deploy.common.read_write import write_json
@@ -60,7 +64,7 @@ In case the directory already exists, it first deletes its contents and then dow
     "-a",
     default=False,
     is_flag=True,
-    help="Downloads all remote files and overwrites the local ones.",
+    help="Downloads all remote files and overwrites the local ones (ignores the incremental sync cursor).",
 )
 @click.option(
     "--message",
@@ -85,13 +89,16 @@ async def download_project(
     commit: bool = False,
     commit_message: str = "",
     download_all: bool = False,
+    git_changes: GitChanges = None,
 ):
     if not org_path:
         org_path = Path("./")
 
+    if not git_changes:
+        git_changes = read_git_changes()
     changed_files = [
-        *get_changed_file_paths(settings.SOURCE_DIRNAME),
-        *get_changed_file_paths(settings.TARGET_DIRNAME),
+        *git_changes.get_changed_file_paths(settings.SOURCE_DIRNAME),
+        *git_changes.get_changed_file_paths(settings.TARGET_DIRNAME),
     ]
     changed_files = list(map(lambda x: x[1], changed_files))
     changed_files = replace_code_paths(changed_files)
@@ -112,6 +119,8 @@ async def download_project(
                 download_all=download_all,
             )
 
+        await save_local_indexes()
+
         if commit:
             subprocess.run(["git", "add", "."])
             subprocess.run(["git", "commit", "-m", commit_message])
@@ -132,53 +141,48 @@ async def download_organizations_separate(
     if not mapping:
         mapping = create_empty_mapping()
 
-    if destination in [settings.SOURCE_DIRNAME, settings.BOTH_DESTINATIONS]:
-        source_client = await create_and_validate_client(settings.SOURCE_DIRNAME)
-        (
-            source_organization,
-            source_workspaces,
-            source_schemas,
-            source_hooks,
-        ) = await download_organization_single(
-            client=source_client,
-            org_path=org_path,
-            destination=settings.SOURCE_DIRNAME,
-            changed_files=changed_files,
-            download_all=download_all,
+    pulled_destinations = [
+        destination_local
+        for destination_local in [settings.SOURCE_DIRNAME, settings.TARGET_DIRNAME]
+        if destination in [destination_local, settings.BOTH_DESTINATIONS]
+    ]
+    # Validated one after another - the user might be prompted for a new token
+    clients = {
+        destination_local: await create_and_validate_client(destination_local)
+        for destination_local in pulled_destinations
+    }
+
+    async def pull_or_read_destination(destination_local: str):
+        if destination_local in pulled_destinations:
+            return await download_organization_single(
+                client=clients[destination_local],
+                org_path=org_path,
+                destination=destination_local,
+                changed_files=changed_files,
+                download_all=download_all,
+            )
+        return await get_all_objects_for_destination(
+            org_path=org_path, destination=destination_local
         )
-    else:
+
+    # Both organizations are pulled concurrently, each client has its own limit of in-flight requests
+    (
         (
             source_organization,
             source_workspaces,
             source_schemas,
             source_hooks,
-        ) = await get_all_objects_for_destination(
-            org_path=org_path, destination=settings.SOURCE_DIRNAME
-        )
-
-    if destination in [settings.TARGET_DIRNAME, settings.BOTH_DESTINATIONS]:
-        target_client = await create_and_validate_client(settings.TARGET_DIRNAME)
+        ),
         (
             _,
             target_workspaces,
             target_schemas,
             target_hooks,
-        ) = await download_organization_single(
-            client=target_client,
-            org_path=org_path,
-            destination=settings.TARGET_DIRNAME,
-            changed_files=changed_files,
-            download_all=download_all,
-        )
-    else:
-        (
-            _,
-            target_workspaces,
-            target_schemas,
-            target_hooks,
-        ) = await get_all_objects_for_destination(
-            org_path=org_path, destination=settings.TARGET_DIRNAME
-        )
+        ),
+    ) = await asyncio.gather(
+        pull_or_read_destination(settings.SOURCE_DIRNAME),
+        pull_or_read_destination(settings.TARGET_DIRNAME),
+    )
 
     await create_update_mapping(
         org_path=org_path,
@@ -189,13 +193,19 @@ async def download_organizations_separate(
         old_mapping=mapping,
     )
 
-    if destination in [settings.SOURCE_DIRNAME, settings.BOTH_DESTINATIONS]:
+    if settings.SOURCE_DIRNAME in pulled_destinations:
         await remove_local_nonexistent_objects(
-            source_client, org_path, settings.SOURCE_DIRNAME, mapping
+            index_remote_objects(source_workspaces, source_schemas, source_hooks),
+            org_path,
+            settings.SOURCE_DIRNAME,
+            mapping,
         )
-    if destination in [settings.TARGET_DIRNAME, settings.BOTH_DESTINATIONS]:
+    if settings.TARGET_DIRNAME in pulled_destinations:
         await remove_local_nonexistent_objects(
-            target_client, org_path, settings.TARGET_DIRNAME, mapping
+            index_remote_objects(target_workspaces, target_schemas, target_hooks),
+            org_path,
+            settings.TARGET_DIRNAME,
+            mapping,
         )
 
 
@@ -215,12 +225,20 @@ async def download_organization_single(
         )
     )
 
-    organizations = [org async for org in client.list_all_organizations()]
+    cursor = await SyncCursor.load(
+        org_path, destination or settings.BOTH_DESTINATIONS, download_all
+    )
+
+    organizations = [
+        org async for org in client._http_client.fetch_all(Resource.Organization)
+    ]
     if not len(organizations):
         raise click.ClickException("No organization found.")
-    organization = await client._http_client.fetch_one(
-        Resource.Organization, organizations[0].id
-    )
+    organization = organizations[0]
+    if not is_complete_object(Resource.Organization, organization):
+        organization = await client._http_client.fetch_one(
+            Resource.Organization, organization["id"]
+        )
 
     if not org_config_path:
         org_config_path = org_path / destination / "organization.json"
@@ -244,6 +262,7 @@ async def download_organization_single(
             download_workspaces(
                 client=client,
                 org_path=org_path,
+                cursor=cursor,
                 destination=destination,
                 sources=previous_sources,
                 targets=previous_targets,
@@ -253,6 +272,7 @@ async def download_organization_single(
             download_schemas(
                 client=client,
                 org_path=org_path,
+                cursor=cursor,
                 destination=destination,
                 sources=previous_sources,
                 targets=previous_targets,
@@ -262,6 +282,7 @@ async def download_organization_single(
             download_hooks(
                 client=client,
                 org_path=org_path,
+                cursor=cursor,
                 destination=destination,
                 sources=previous_sources,
                 targets=previous_targets,
@@ -271,6 +292,9 @@ async def download_organization_single(
         ]
     )
 
+    # The cursor is only moved forward once everything was pulled successfully
+    await cursor.save(org_path)
+
     if destination:
         print(Panel(f"Finished {settings.DOWNLOAD_COMMAND_NAME} for {destination}."))
     else:
@@ -320,9 +344,12 @@ async def download_organization_combined_source_target(
         old_mapping=mapping,
     )
 
+    remote_objects = index_remote_objects(
+        workspaces_for_mapping, schemas_for_mapping, hooks_for_mapping
+    )
     await remove_local_nonexistent_objects(
-        client, org_path, settings.SOURCE_DIRNAME, mapping
+        remote_objects, org_path, settings.SOURCE_DIRNAME, mapping
     )
     await remove_local_nonexistent_objects(
-        client, org_path, settings.TARGET_DIRNAME, mapping
+        remote_objects, org_path, settings.TARGET_DIRNAME, mapping
     )
@@ -1,14 +1,22 @@
-import asyncio
 import os
 import shutil
 from typing import Any
 from anyio import Path
 from rich.prompt import Confirm
 from rich import print
-from rossum_api import APIClientError, ElisAPIClient
+from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 from rich.panel import Panel
 
+from project_rossum_deploy.commands.download.cursor import (
+    SyncCursor,
+    has_same_mirrored_references,
+)
+from project_rossum_deploy.common.concurrency import gather_with_scheduler
+from project_rossum_deploy.common.fetch import (
+    fetch_objects_by_ids,
+    is_complete_object,
+)
 from project_rossum_deploy.utils.functions import (
     find_object_by_key,
 )
@@ -16,6 +24,10 @@ from project_rossum_deploy.common.determine_path import (
     determine_object_type_from_path,
     determine_object_type_from_url,
 )
+from project_rossum_deploy.common.local_index import (
+    get_local_index,
+    read_local_entry,
+)
 from project_rossum_deploy.common.mapping import extract_flat_lookup_table
 from project_rossum_deploy.common.read_write import (
     create_custom_hook_code_path,
@@ -26,8 +38,8 @@ from project_rossum_deploy.common.read_write import (
 from project_rossum_deploy.utils.consts import display_warning, settings
 from project_rossum_deploy.utils.functions import (
     detemplatize_name_id,
+    extract_id_from_url,
     find_object_in_project,
-    find_all_object_paths,
     flatten,
     templatize_name_id,
 )
@@ -53,6 +65,10 @@ class MissingParentObjectException(Exception):
     status_code = 404
 
 
+class ObjectNotFoundException(Exception):
+    status_code = 404
+
+
 def replace_code_paths(file_paths: list[Path]):
     """Since only .json files are compared when pulling, this flags the json file as changed if its code (.py/.js) file has changed."""
     replaced_paths = []
@@ -70,22 +86,17 @@ def replace_code_paths(file_paths: list[Path]):
 
 
 async def should_write_object(path: Path, remote_object: Any, changed_files: list):
-    if await path.exists():
-        local_file = await read_json(path)
-
+    if local_entry := await read_local_entry(path):
         object_type = (
             determine_object_type_from_path(path)
             if "organization" not in str(path)
             else ""
         )
-        # Queues are always pulled - their hooks/webhooks attribute might have changed.
-        # This does not update the timestamp in the DB because this change is only done on hooks entities.
-        if (local_timestamp := local_file.get("modified_at", "")) != (
+        # Queues and hooks are compared by their mirrored references as well (queue.hooks/webhooks <-> hook.queues).
+        # Rossum changes them from the other side without updating the timestamp.
+        if (local_timestamp := local_entry.get("modified_at", "")) != (
             remote_timestamp := remote_object.get("modified_at", "")
-        ) or (
-            object_type == Resource.Queue
-            and local_file.get("hooks", []) != remote_object.get("hooks", [])
-        ):
+        ) or not has_same_mirrored_references(object_type, local_entry, remote_object):
             if path in changed_files:
                 return Confirm.ask(
                     f'File "{path}" has local unversioned changes (local: {local_timestamp} | remote: {remote_timestamp}). Should the remote version overwrite the local one?',
@@ -96,6 +107,47 @@ async def should_write_object(path: Path, remote_object: Any, changed_files: lis
         return True
 
 
+async def refetch_modified_objects(
+    client: ElisAPIClient,
+    resource: Resource,
+    listed_objects: list[tuple[dict, Path]],
+    cursor: SyncCursor,
+) -> list[tuple[dict, bool]]:
+    """Completes listed objects that were modified since the last pull.
+    Listed objects that already contain all attributes are used as they are, the rest is retrieved in bulk.
+
+    Returns:
+        list[tuple[dict, bool]]: The (refetched or listed) object and whether it should be considered for writing
+    """
+    unchanged = await gather_with_scheduler(
+        *[
+            cursor.is_unchanged(resource, listed_object, path)
+            for listed_object, path in listed_objects
+        ]
+    )
+    # Use raw dicts and not dataclasses in case of fields not defined in the Rossum API lib
+    refetched_objects = await fetch_objects_by_ids(
+        client,
+        resource,
+        [
+            listed_object["id"]
+            for (listed_object, _), is_unchanged in zip(listed_objects, unchanged)
+            if not is_unchanged and not is_complete_object(resource, listed_object)
+        ],
+    )
+
+    results = []
+    for (listed_object, _), is_unchanged in zip(listed_objects, unchanged):
+        if is_unchanged:
+            results.append((listed_object, False))
+        else:
+            results.append(
+                (refetched_objects.get(listed_object["id"], listed_object), True)
+            )
+        cursor.see(resource, results[-1][0])
+    return results
+
+
 def is_within_git_dir(path: Path) -> bool:
     """
     Check if the given path is within a .git directory.
@@ -130,6 +182,10 @@ def delete_empty_folders(root: Path):
 
 
 async def check_schema_formula_fields_existence(remote_object: dict, path: Path):
+    # Schemas unchanged since the last pull are only listed (without content), their formula files are up to date
+    if "content" not in remote_object:
+        return
+
     formula_fields = find_formula_fields_in_schema(remote_object["content"])
     formula_field_ids = [f[0] for f in formula_fields]
     formula_directory_path = create_formula_directory_path(
@@ -149,15 +205,50 @@ async def check_schema_formula_fields_existence(remote_object: dict, path: Path)
             os.remove(formula_path)
 
 
+def index_remote_objects(
+    workspaces: list[tuple[str, dict]],
+    schemas: list[tuple[str, dict]],
+    hooks: list[tuple[str, dict]],
+) -> dict[tuple[Resource, int], dict]:
+    """Creates a lookup of everything the pull has just listed in Rossum (including queues and inboxes nested in workspaces)."""
+    remote_objects = {}
+    for _, workspace in workspaces:
+        remote_objects[(Resource.Workspace, workspace["id"])] = workspace
+        for queue in workspace.get("queues", []):
+            if not isinstance(queue, dict):
+                continue
+            remote_objects[(Resource.Queue, queue["id"])] = queue
+            if isinstance(inbox := queue.get("inbox", None), dict):
+                remote_objects[(Resource.Inbox, inbox["id"])] = inbox
+    for _, schema in schemas:
+        remote_objects[(Resource.Schema, schema["id"])] = schema
+    for _, hook in hooks:
+        remote_objects[(Resource.Hook, hook["id"])] = hook
+    return remote_objects
+
+
+def find_remote_object(
+    remote_objects: dict[tuple[Resource, int], dict], url: str
+) -> dict:
+    if not url:
+        raise ObjectNotFoundException
+    remote_object = remote_objects.get(
+        (determine_object_type_from_url(url), extract_id_from_url(url)), None
+    )
+    if not remote_object:
+        raise ObjectNotFoundException
+    return remote_object
+
+
 async def remove_local_nonexistent_object(
     path: Path,
-    client: ElisAPIClient,
+    local_entry: dict,
+    remote_objects: dict[tuple[Resource, int], dict],
     destination: str,
     source_ids: list[int],
     target_ids: list[int],
 ):
-    object = await read_json(path)
-    url, id = object.get("url", ""), object.get("id", "")
+    url, id = local_entry.get("url", ""), local_entry.get("id", "")
     object_type = determine_object_type_from_url(url)
 
     try:
@@ -178,7 +269,7 @@ async def remove_local_nonexistent_object(
         ):
             raise ObjectMovedBetweenSourceTargetException
         # ID not found because it was deleted from Rossum
-        remote_object = await client._http_client.request_json(method="GET", url=url)
+        remote_object = find_remote_object(remote_objects, url)
 
         # Special queue edge case (they are deleted after some period)
         if remote_object.get("status", "") == "deletion_requested":
@@ -197,29 +288,28 @@ async def remove_local_nonexistent_object(
 
         # Workspace name might have changed, remove queue and inbox files inside
         if object_type == Resource.Queue:
-            await check_queue_existence(client, remote_object, path)
+            check_queue_existence(remote_objects, remote_object, path)
         elif object_type == Resource.Inbox:
-            await check_inbox_existence(client, remote_object, path)
+            check_inbox_existence(remote_objects, remote_object, path)
         elif object_type == Resource.Schema:
             await check_schema_formula_fields_existence(remote_object, path)
 
     except (
-        APIClientError,
+        ObjectNotFoundException,
         InactiveQueueException,
         DifferentNameException,
         DifferentPathException,
         MissingParentObjectException,
         ObjectMovedBetweenSourceTargetException,
     ) as e:
-        if e.status_code != 404:
-            raise e
-
         print(
             Panel(
                 f"Deleting a local object that no longer exists in Rossum or was moved between {settings.SOURCE_DIRNAME}/{settings.TARGET_DIRNAME} ({str(e.__class__.__name__)}): {path}",
                 style="yellow",
             )
         )
+        # The hook's code file is found from its config, which is not in the index
+        hook = await read_json(path) if object_type == Resource.Hook else None
         os.remove(path)
 
         previous_name, previous_id = detemplatize_name_id(path)
@@ -230,40 +320,32 @@ async def remove_local_nonexistent_object(
             if await formula_directory_path.exists():
                 shutil.rmtree(formula_directory_path)
         elif object_type == Resource.Hook:
-            object["name"] = previous_name
-            custom_hook_code_path = create_custom_hook_code_path(path, object)
-            if custom_hook_code_path:
+            hook["name"] = previous_name
+            custom_hook_code_path = create_custom_hook_code_path(path, hook)
+            if custom_hook_code_path and await custom_hook_code_path.exists():
                 os.remove(custom_hook_code_path)
 
 
-async def check_queue_existence(client: ElisAPIClient, remote_object: dict, path: Path):
+def check_queue_existence(
+    remote_objects: dict[tuple[Resource, int], dict], remote_object: dict, path: Path
+):
     try:
-        ws = await client._http_client.request_json(
-            method="GET", url=remote_object["workspace"]
-        )
-    except APIClientError as e:
-        if e.status_code != 404:
-            raise e
-
+        ws = find_remote_object(remote_objects, remote_object["workspace"])
+    except ObjectNotFoundException:
         raise MissingParentObjectException
 
     compare_paths(original_path=path, ws=ws, queue=remote_object, suffix="queue.json")
 
 
-async def check_inbox_existence(client: ElisAPIClient, remote_object: dict, path: Path):
+def check_inbox_existence(
+    remote_objects: dict[tuple[Resource, int], dict], remote_object: dict, path: Path
+):
     try:
-        queue = await client._http_client.request_json(
-            method="GET", url=remote_object["queues"][0]
-        )
+        queue = find_remote_object(remote_objects, remote_object["queues"][0])
         if not queue["workspace"]:
             raise MissingParentObjectException
-        ws = await client._http_client.request_json(
-            method="GET", url=queue["workspace"]
-        )
-    except (APIClientError, MissingParentObjectException) as e:
-        if e.status_code != 404:
-            raise e
-
+        ws = find_remote_object(remote_objects, queue["workspace"])
+    except (IndexError, ObjectNotFoundException):
         raise MissingParentObjectException
 
     compare_paths(original_path=path, ws=ws, queue=queue, suffix="inbox.json")
@@ -290,29 +372,31 @@ def compare_paths(original_path: Path, ws, queue, suffix):
 
 
 async def remove_local_nonexistent_objects(
-    client: ElisAPIClient, base_path: Path, destination: str, mapping: dict
+    remote_objects: dict[tuple[Resource, int], dict],
+    base_path: Path,
+    destination: str,
+    mapping: dict,
 ):
     """
     Checks that the local object still exists in Rossum and removes its local file if not.
+    The local objects are compared with the objects listed during the pull, no additional requests are made.
     """
 
-    object_paths = await find_all_object_paths(base_path / destination)
+    local_index = await get_local_index(base_path / destination)
+    local_entries = await local_index.scan(base_path / destination)
     # Ignore the org file, it should never be deleted
-    try:
-        object_paths.remove(Path(base_path / destination / "organization.json"))
     # The file might not be there for target
-    except Exception:
-        ...
+    local_entries.pop(Path(base_path / destination / "organization.json"), None)
 
     lookup_table = extract_flat_lookup_table(mapping)
     source_ids = list(lookup_table.keys())
     target_ids = flatten(list(lookup_table.values()))
-    await asyncio.gather(
+    await gather_with_scheduler(
         *[
             remove_local_nonexistent_object(
-                path, client, destination, source_ids, target_ids
+                path, local_entry, remote_objects, destination, source_ids, target_ids
             )
-            for path in object_paths
+            for path, local_entry in local_entries.items()
         ]
     )
 
@@ -350,6 +434,20 @@ async def determine_object_destination(
     return destination
 
 
+def create_object_from_local_entry(local_entry: dict) -> dict:
+    object = {
+        "id": local_entry["id"],
+        "name": local_entry["name"],
+        "url": local_entry["url"],
+        "modified_at": local_entry["modified_at"],
+    }
+    if local_entry["type"] == Resource.Queue.value:
+        object["workspace"] = local_entry["parent"]
+    elif local_entry["type"] == Resource.Inbox.value:
+        object["queues"] = [local_entry["parent"]] if local_entry["parent"] else []
+    return object
+
+
 async def get_all_objects_for_destination(org_path: Path, destination: str) -> tuple:
     """Find all .json objects stored locally for the given destination.
 
@@ -358,13 +456,15 @@ async def get_all_objects_for_destination(org_path: Path, destination: str) -> t
         destination (str): Either source or target
 
     Returns:
-        tuple: The same tuple of objects as a download of a single organization (source/target) would
+        tuple: The same tuple of objects as a download of a single organization (source/target) would.
+        The objects are created from the local index and contain only the attributes needed for the mapping (id, name, url and parent URLs).
     """
     organization, workspaces, schemas, hooks, queues, inboxes = {}, [], [], [], [], []
 
-    object_paths = await find_all_object_paths(org_path / destination)
-    for object_path in object_paths:
-        object = await read_json(object_path)
+    local_index = await get_local_index(org_path / destination)
+    local_entries = await local_index.scan(org_path / destination)
+    for object_path, local_entry in local_entries.items():
+        object = create_object_from_local_entry(local_entry)
         if object_path.name == "organization.json":
             organization = object
             continue
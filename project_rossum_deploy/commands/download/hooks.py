@@ -1,15 +1,17 @@
-import asyncio
 from anyio import Path
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
+from project_rossum_deploy.commands.download.cursor import SyncCursor
 from project_rossum_deploy.commands.download.helpers import (
     create_custom_hook_code_path,
     determine_object_destination,
+    refetch_modified_objects,
     should_write_object,
 )
 
 from project_rossum_deploy.common.read_write import write_json, write_str
+from project_rossum_deploy.utils.consts import settings
 from project_rossum_deploy.utils.functions import (
     templatize_name_id,
 )
@@ -18,6 +20,7 @@ from project_rossum_deploy.utils.functions import (
 async def download_hooks(
     client: ElisAPIClient,
     org_path: Path,
+    cursor: SyncCursor,
     mapping: dict = {},
     destination: str = "",
     sources: dict = {},
@@ -27,18 +30,15 @@ async def download_hooks(
 ):
     hooks = []
 
-    paginated_hooks = [hook async for hook in client.list_all_hooks()]
-
-    # Refetch in case the paginated fields don't include everything
-    # Use raw dicts and not dataclasses in case of fields not defined in the Rossum API lib
-    full_hooks = await asyncio.gather(
-        *[
-            client._http_client.fetch_one(Resource.Hook, hook.id)
-            for hook in paginated_hooks
-        ]
-    )
+    paginated_hooks = [
+        hook
+        async for hook in client._http_client.fetch_all(
+            Resource.Hook, page_size=settings.BULK_FETCH_BATCH_SIZE
+        )
+    ]
 
-    for hook in full_hooks:
+    hooks_with_paths = []
+    for hook in paginated_hooks:
         destination_local = (
             destination
             if destination
@@ -57,8 +57,24 @@ async def download_hooks(
             / "hooks"
             / f"{templatize_name_id(hook['name'], hook['id'])}.json"
         )
+        hooks_with_paths.append((destination_local, hook_config_path))
+
+    # Complete the hooks in case the paginated fields don't include everything
+    full_hooks = await refetch_modified_objects(
+        client=client,
+        resource=Resource.Hook,
+        listed_objects=[
+            (hook, path) for hook, (_, path) in zip(paginated_hooks, hooks_with_paths)
+        ],
+        cursor=cursor,
+    )
 
-        if download_all or await should_write_object(
+    for (destination_local, hook_config_path), (hook, is_modified) in zip(
+        hooks_with_paths, full_hooks
+    ):
+        if not is_modified:
+            pass
+        elif download_all or await should_write_object(
             hook_config_path, hook, changed_files
         ):
             await write_json(
@@ -73,6 +89,8 @@ async def download_hooks(
                 await write_str(
                     custom_hook_code_path, hook.get("config", {}).get("code", None)
                 )
+        elif hook_config_path in changed_files:
+            cursor.mark_pending(hook)
 
         hooks.append((destination_local, hook))
 
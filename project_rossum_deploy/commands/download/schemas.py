@@ -1,11 +1,12 @@
-import asyncio
 from anyio import Path
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
+from project_rossum_deploy.commands.download.cursor import SyncCursor
 from project_rossum_deploy.commands.download.helpers import (
     create_formula_directory_path,
     determine_object_destination,
+    refetch_modified_objects,
     should_write_object,
 )
 
@@ -14,6 +15,7 @@ from project_rossum_deploy.common.read_write import (
     find_formula_fields_in_schema,
     write_json,
 )
+from project_rossum_deploy.utils.consts import settings
 from project_rossum_deploy.utils.functions import (
     templatize_name_id,
 )
@@ -22,6 +24,7 @@ from project_rossum_deploy.utils.functions import (
 async def download_schemas(
     client: ElisAPIClient,
     org_path: Path,
+    cursor: SyncCursor,
     mapping: dict = {},
     destination: str = "",
     sources: dict = {},
@@ -31,18 +34,15 @@ async def download_schemas(
 ):
     schemas = []
 
-    paginated_schemas = [schema async for schema in client.list_all_schemas()]
-
-    # Refetch because schema fields are not fully listed
-    # Use raw dicts and not dataclasses in case of fields not defined in the Rossum API lib
-    full_schemas = await asyncio.gather(
-        *[
-            client._http_client.fetch_one(Resource.Schema, schema.id)
-            for schema in paginated_schemas
-        ]
-    )
+    paginated_schemas = [
+        schema
+        async for schema in client._http_client.fetch_all(
+            Resource.Schema, page_size=settings.BULK_FETCH_BATCH_SIZE
+        )
+    ]
 
-    for schema in full_schemas:
+    schemas_with_paths = []
+    for schema in paginated_schemas:
         destination_local = (
             destination
             if destination
@@ -61,8 +61,25 @@ async def download_schemas(
             / "schemas"
             / f"{templatize_name_id(schema['name'], schema['id'])}.json"
         )
+        schemas_with_paths.append((destination_local, schema_config_path))
+
+    # Complete the schemas in case their content is not listed
+    full_schemas = await refetch_modified_objects(
+        client=client,
+        resource=Resource.Schema,
+        listed_objects=[
+            (schema, path)
+            for schema, (_, path) in zip(paginated_schemas, schemas_with_paths)
+        ],
+        cursor=cursor,
+    )
 
-        if download_all or await should_write_object(
+    for (destination_local, schema_config_path), (schema, is_modified) in zip(
+        schemas_with_paths, full_schemas
+    ):
+        if not is_modified:
+            pass
+        elif download_all or await should_write_object(
             schema_config_path, schema, changed_files
         ):
             await write_json(
@@ -81,6 +98,8 @@ async def download_schemas(
                     await create_formula_file(
                         formula_directory_path / f"{field_id}.py", code
                     )
+        elif schema_config_path in changed_files:
+            cursor.mark_pending(schema)
 
         schemas.append((destination_local, schema))
 
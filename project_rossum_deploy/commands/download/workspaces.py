@@ -1,14 +1,17 @@
-import asyncio
 from anyio import Path
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
+from project_rossum_deploy.commands.download.cursor import SyncCursor
 from project_rossum_deploy.commands.download.helpers import (
     determine_object_destination,
+    refetch_modified_objects,
     should_write_object,
 )
 
+from project_rossum_deploy.common.concurrency import gather_with_scheduler
 from project_rossum_deploy.common.read_write import write_json
+from project_rossum_deploy.utils.consts import settings
 from project_rossum_deploy.utils.functions import (
     extract_id_from_url,
     templatize_name_id,
@@ -18,6 +21,7 @@ from project_rossum_deploy.utils.functions import (
 async def download_workspaces(
     client: ElisAPIClient,
     org_path: Path,
+    cursor: SyncCursor,
     mapping: dict = {},
     destination: str = "",
     sources: dict = {},
@@ -25,22 +29,27 @@ async def download_workspaces(
     changed_files: list = [],
     download_all: bool = False,
 ):
-    workspaces = []
-
     paginated_workspaces = [
-        workspace async for workspace in client.list_all_workspaces()
+        workspace
+        async for workspace in client._http_client.fetch_all(
+            Resource.Workspace, page_size=settings.BULK_FETCH_BATCH_SIZE
+        )
     ]
+    # Queues and inboxes are listed once for all workspaces instead of one request per workspace/queue
+    paginated_queues_by_workspace = {}
+    async for queue in client._http_client.fetch_all(
+        Resource.Queue, page_size=settings.BULK_FETCH_BATCH_SIZE
+    ):
+        paginated_queues_by_workspace.setdefault(queue["workspace"], []).append(queue)
+    paginated_inboxes = {
+        inbox["id"]: inbox
+        async for inbox in client._http_client.fetch_all(
+            Resource.Inbox, page_size=settings.BULK_FETCH_BATCH_SIZE
+        )
+    }
 
-    # Refetch in case the paginated fields don't include everything
-    # Use raw dicts and not dataclasses in case of fields not defined in the Rossum API lib
-    full_workspaces = await asyncio.gather(
-        *[
-            client._http_client.fetch_one(Resource.Workspace, ws.id)
-            for ws in paginated_workspaces
-        ]
-    )
-
-    for workspace in full_workspaces:
+    workspaces_with_paths = []
+    for workspace in paginated_workspaces:
         destination_local = (
             destination
             if destination
@@ -61,25 +70,59 @@ async def download_workspaces(
             / templatize_name_id(workspace["name"], workspace["id"])
             / "workspace.json"
         )
+        workspaces_with_paths.append(
+            (destination_local, workspace, workspace_config_path)
+        )
 
-        if download_all or await should_write_object(
-            workspace_config_path, workspace, changed_files
-        ):
-            await write_json(
-                workspace_config_path,
-                workspace,
-                Resource.Workspace,
-                log_message=f"Pulled {workspace_config_path}",
-            )
+    full_workspaces = await refetch_modified_objects(
+        client=client,
+        resource=Resource.Workspace,
+        listed_objects=[(ws, path) for _, ws, path in workspaces_with_paths],
+        cursor=cursor,
+    )
+
+    # Each workspace (and its queues and inboxes) is written as soon as it is downloaded
+    async def download_workspace(
+        destination_local: str,
+        workspace_config_path: Path,
+        workspace: dict,
+        is_modified: bool,
+    ):
+        if is_modified:
+            if download_all or await should_write_object(
+                workspace_config_path, workspace, changed_files
+            ):
+                await write_json(
+                    workspace_config_path,
+                    workspace,
+                    Resource.Workspace,
+                    log_message=f"Pulled {workspace_config_path}",
+                )
+            elif workspace_config_path in changed_files:
+                cursor.mark_pending(workspace)
 
         workspace["queues"] = await download_queues_for_workspace(
             client=client,
             parent_dir=workspace_config_path.parent,
-            workspace_id=workspace["id"],
+            cursor=cursor,
+            paginated_queues=paginated_queues_by_workspace.get(workspace["url"], []),
+            paginated_inboxes=paginated_inboxes,
             changed_files=changed_files,
             download_all=download_all,
         )
-        workspaces.append((destination_local, workspace))
+        return destination_local, workspace
+
+    workspaces = await gather_with_scheduler(
+        *[
+            download_workspace(
+                destination_local, workspace_config_path, workspace, is_modified
+            )
+            for (destination_local, _, workspace_config_path), (
+                workspace,
+                is_modified,
+            ) in zip(workspaces_with_paths, full_workspaces)
+        ]
+    )
 
     return workspaces
 
@@ -87,32 +130,39 @@ async def download_workspaces(
 async def download_queues_for_workspace(
     client: ElisAPIClient,
     parent_dir: Path,
-    workspace_id: int,
+    cursor: SyncCursor,
+    paginated_queues: list[dict] = [],
+    paginated_inboxes: dict[int, dict] = {},
     changed_files: list = [],
     download_all: bool = False,
 ):
-    queues = []
-
-    paginated_queues = [q async for q in client.list_all_queues(workspace=workspace_id)]
-    # Refetch in case the paginated fields don't include everything
-    # Use raw dicts and not dataclasses in case of fields not defined in the Rossum API lib
-    full_queues = await asyncio.gather(
-        *[client._http_client.fetch_one(Resource.Queue, q.id) for q in paginated_queues]
+    queue_paths = [
+        parent_dir / "queues" / f"{templatize_name_id(q['name'], q['id'])}"
+        for q in paginated_queues
+    ]
+    full_queues = await refetch_modified_objects(
+        client=client,
+        resource=Resource.Queue,
+        listed_objects=[
+            (queue, queue_path / "queue.json")
+            for queue, queue_path in zip(paginated_queues, queue_paths)
+        ],
+        cursor=cursor,
     )
 
-    for queue in full_queues:
-        queue_path = (
-            parent_dir / "queues" / f"{templatize_name_id(queue['name'], queue['id'])}"
-        )
-        if download_all or await should_write_object(
-            queue_path / "queue.json", queue, changed_files
-        ):
-            await write_json(
-                queue_path / "queue.json",
-                queue,
-                Resource.Queue,
-                log_message=f'Pulled {queue_path / "queue.json"}',
-            )
+    async def download_queue(queue_path: Path, queue: dict, is_modified: bool):
+        if is_modified:
+            if download_all or await should_write_object(
+                queue_path / "queue.json", queue, changed_files
+            ):
+                await write_json(
+                    queue_path / "queue.json",
+                    queue,
+                    Resource.Queue,
+                    log_message=f'Pulled {queue_path / "queue.json"}',
+                )
+            elif queue_path / "queue.json" in changed_files:
+                cursor.mark_pending(queue)
 
         inbox_id = extract_id_from_url(queue["inbox"])
         if inbox_id:
@@ -120,10 +170,19 @@ async def download_queues_for_workspace(
                 client=client,
                 parent_dir=queue_path,
                 inbox_id=inbox_id,
+                cursor=cursor,
+                paginated_inbox=paginated_inboxes.get(inbox_id, None),
                 changed_files=changed_files,
                 download_all=download_all,
             )
-        queues.append(queue)
+        return queue
+
+    queues = await gather_with_scheduler(
+        *[
+            download_queue(queue_path, queue, is_modified)
+            for queue_path, (queue, is_modified) in zip(queue_paths, full_queues)
+        ]
+    )
 
     return queues
 
@@ -132,11 +191,29 @@ async def download_inbox(
     client: ElisAPIClient,
     parent_dir: Path,
     inbox_id: int,
+    cursor: SyncCursor,
+    paginated_inbox: dict = None,
     changed_files: list = [],
     download_all: bool = False,
 ):
-    inbox = await client._http_client.fetch_one(Resource.Inbox, inbox_id)
     inbox_path = parent_dir / "inbox.json"
+    if paginated_inbox:
+        [(inbox, is_modified)] = await refetch_modified_objects(
+            client=client,
+            resource=Resource.Inbox,
+            listed_objects=[(paginated_inbox, inbox_path)],
+            cursor=cursor,
+        )
+    else:
+        inbox, is_modified = (
+            await client._http_client.fetch_one(Resource.Inbox, inbox_id),
+            True,
+        )
+        cursor.see(Resource.Inbox, inbox)
+
+    if not is_modified:
+        return inbox
+
     if download_all or await should_write_object(inbox_path, inbox, changed_files):
         await write_json(
             inbox_path,
@@ -144,5 +221,7 @@ async def download_inbox(
             Resource.Inbox,
             log_message=f"Pulled {inbox_path}",
         )
+    elif inbox_path in changed_files:
+        cursor.mark_pending(inbox)
 
     return inbox
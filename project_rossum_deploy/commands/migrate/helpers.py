@@ -4,6 +4,11 @@ from typing import Callable
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
+from project_rossum_deploy.common.mapping import extract_target_ids
+from project_rossum_deploy.common.modified_at import (
+    RemoteTimestamps,
+    get_remote_object,
+)
 from project_rossum_deploy.utils.consts import settings
 from project_rossum_deploy.utils.functions import (
     extract_id_from_url,
@@ -67,21 +72,19 @@ def replace_dependency_url(
 
         # Target queues can have 'dangling' hooks that exist only on target, these should not be overwritten.
         if target_object:
+            released_target_ids = set(
+                target.get("id", "")
+                for targets in source_id_target_pairs.values()
+                for target in targets
+            )
             for target_dependency_url in target_object[dependency]:
                 # Target ID was found in the new list as well
                 if target_dependency_url in new_urls:
                     continue
 
-                target_has_source = False
                 # Check if this target has a source. If not, it is a dangling target and we need to add it back.
                 target_id = extract_id_from_url(target_dependency_url)
-                for _, targets in source_id_target_pairs.items():
-                    for target in targets:
-                        if target.get("id", "") == target_id:
-                            target_has_source = True
-                            break
-
-                if not target_has_source:
+                if target_id not in released_target_ids:
                     new_urls.append(target_dependency_url)
 
         object[dependency] = new_urls
@@ -109,6 +112,40 @@ def replace_dependency_url(
         object[dependency] = new_url
 
 
+def find_released_target_ids(
+    mapping: dict, target_organization_id: int
+) -> dict[Resource, set[int]]:
+    """Returns IDs of existing target objects that release updates (ignored objects and their children are skipped)."""
+    target_ids = {
+        Resource.Organization: {target_organization_id},
+        Resource.Workspace: set(),
+        Resource.Queue: set(),
+        Resource.Inbox: set(),
+        Resource.Schema: set(),
+        Resource.Hook: set(),
+    }
+    organization_mapping = mapping["organization"]
+
+    for resource, key in [(Resource.Schema, "schemas"), (Resource.Hook, "hooks")]:
+        for submapping in organization_mapping.get(key, []):
+            if not submapping.get("ignore", None):
+                target_ids[resource].update(extract_target_ids(submapping))
+
+    for workspace_mapping in organization_mapping.get("workspaces", []):
+        if workspace_mapping.get("ignore", None):
+            continue
+        target_ids[Resource.Workspace].update(extract_target_ids(workspace_mapping))
+
+        for queue_mapping in workspace_mapping.get("queues", []):
+            if queue_mapping.get("ignore", None):
+                continue
+            target_ids[Resource.Queue].update(extract_target_ids(queue_mapping))
+            if inbox_mapping := queue_mapping.get("inbox", None):
+                target_ids[Resource.Inbox].update(extract_target_ids(inbox_mapping))
+
+    return target_ids
+
+
 async def get_token_owner(client: ElisAPIClient):
     async for user in client.list_all_users(username=client._http_client.username):
         if user.username == settings.TARGET_USERNAME:
@@ -175,13 +212,16 @@ async def simulate_migrate_object(
     target_index: int = 0,
     target_objects_count: int = None,
     source_id_target_pairs: dict[int, list] = None,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     object_counter = f"({target_index +1}/{target_objects_count if target_objects_count is not None else 1})"
     if target_id:
         print(
             f'UPDATE source {target_object_type} "{source_object.get('id', None)} {source_object.get('name', '')}" -> target "{target_id}" {object_counter}.'
         )
-        return await client._http_client.fetch_one(target_object_type, target_id)
+        return await get_remote_object(
+            client, target_object_type, target_id, remote_timestamps
+        )
     else:
         print(
             f'CREATE source {target_object_type} "{source_object.get('id', None)} {source_object.get('name', '')}" -> target {object_counter}.'
@@ -1,5 +1,5 @@
-import asyncio
 import functools
+from typing import Callable
 from rich.progress import Progress
 from anyio import Path
 from rossum_api import ElisAPIClient
@@ -13,13 +13,14 @@ from project_rossum_deploy.commands.migrate.helpers import (
     migrate_object_to_multiple_targets,
     simulate_migrate_object,
 )
-from project_rossum_deploy.common.mapping import find_mapping_of_object
+from project_rossum_deploy.common.mapping import index_mapping_by_id
 from project_rossum_deploy.common.read_write import read_json
 from project_rossum_deploy.utils.consts import (
     PrdVersionException,
     display_error,
     settings,
 )
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
 from project_rossum_deploy.commands.migrate.upload_helpers import upload_hook
 from project_rossum_deploy.utils.functions import (
     PauseProgress,
@@ -28,7 +29,7 @@ from project_rossum_deploy.utils.functions import (
 )
 
 
-async def migrate_hooks(
+async def create_hook_operations(
     source_path: Path,
     client: ElisAPIClient,
     mapping: dict,
@@ -36,12 +37,15 @@ async def migrate_hooks(
     sources_by_source_id_map: dict,
     progress: Progress,
     plan_only: bool = False,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
-):
+    remote_timestamps: RemoteTimestamps = None,
+) -> tuple[dict[tuple[Resource, int], Callable], dict[tuple[Resource, int], set]]:
+    """Returns an operation releasing each hook, hooks do not depend on other released objects (see migrate_run_after)."""
     hook_paths = [hook_path async for hook_path in (source_path / "hooks").iterdir()]
     task = progress.add_task("Releasing hooks.", total=len(hook_paths))
+    hook_mappings = index_mapping_by_id(mapping["organization"]["hooks"])
 
     target_token_owner_id = ""
     if not settings.IS_PROJECT_IN_SAME_ORG:
@@ -54,11 +58,7 @@ async def migrate_hooks(
         else:
             target_token_owner_id = target_org_token_owner.id
 
-    async def migrate_hook(hook_path: Path):
-        if hook_path.suffix != ".json":
-            progress.update(task, advance=1)
-            return
-
+    async def migrate_hook(hook_path: Path, dependency_results: dict = None):
         try:
             _, id = detemplatize_name_id(hook_path.stem)
             hook = await read_json(hook_path)
@@ -72,7 +72,7 @@ async def migrate_hooks(
                     settings.TARGET_API_URL + f"/users/{target_token_owner_id}"
                 )
 
-            hook_mapping = find_mapping_of_object(mapping["organization"]["hooks"], id)
+            hook_mapping = hook_mappings.get(id, None)
             if hook_mapping.get("ignore", None):
                 progress.update(task, advance=1)
                 return
@@ -85,6 +85,7 @@ async def migrate_hooks(
                     client=client,
                     source_object=hook,
                     target_object_type=Resource.Hook,
+                    remote_timestamps=remote_timestamps,
                 )
             else:
                 partial_upload_hook = functools.partial(
@@ -96,6 +97,7 @@ async def migrate_hooks(
                     target_objects=target_objects,
                     errors=errors,
                     force=force,
+                    remote_timestamps=remote_timestamps,
                 )
             source_id_target_pairs[id] = []
             if "target_object" in hook_mapping:
@@ -115,17 +117,28 @@ async def migrate_hooks(
             raise e
         except Exception as e:
             display_error(f"Error while migrating hook with path '{hook_path}': {e}", e)
+            # Objects that depend on this one are not released
+            raise e
 
     if plan_only:
         print(Panel("Simulating hooks."))
 
-    await asyncio.gather(
-        *[migrate_hook(hook_path=hook_path) for hook_path in hook_paths]
-    )
+    operations = {}
+    for hook_path in hook_paths:
+        if hook_path.suffix != ".json":
+            progress.update(task, advance=1)
+            continue
+        operations[(Resource.Hook, detemplatize_name_id(hook_path.stem)[1])] = (
+            functools.partial(migrate_hook, hook_path)
+        )
 
-    if plan_only:
-        return
+    return operations, {}
 
+
+async def migrate_run_after(
+    client: ElisAPIClient, source_path: Path, source_id_target_pairs: dict[int, list]
+):
+    """Hooks reference each other only in run_after, which is set once all hooks were released."""
     await migrate_hook_dependency_graph(client, source_path, source_id_target_pairs)
 
     print(
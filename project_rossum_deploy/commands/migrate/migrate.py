@@ -5,15 +5,23 @@ from rich.panel import Panel
 from rich.progress import Progress
 import click
 from rossum_api import ElisAPIClient
+from rossum_api.api_client import Resource
 from project_rossum_deploy.commands.download.download import (
     download_project,
 )
-from project_rossum_deploy.commands.migrate.organization import migrate_organization
+from project_rossum_deploy.commands.migrate.organization import (
+    MissingTargetOrganizationException,
+    migrate_organization,
+)
 from project_rossum_deploy.common.attribute_override import (
     override_migrated_objects_attributes,
     validate_override_migrated_objects_attributes,
 )
 from project_rossum_deploy.common.client import create_and_validate_client
+from project_rossum_deploy.common.concurrency import (
+    SkippedOperationException,
+    run_dependency_graph,
+)
 from project_rossum_deploy.common.mapping import (
     extract_flat_lookup_table,
     extract_sources_targets,
@@ -21,19 +29,26 @@ from project_rossum_deploy.common.mapping import (
     write_mapping,
 )
 
-from project_rossum_deploy.commands.migrate.hooks import migrate_hooks
-from project_rossum_deploy.commands.migrate.schemas import migrate_schemas
-from project_rossum_deploy.commands.migrate.workspaces import migrate_workspaces
+from project_rossum_deploy.commands.migrate.helpers import find_released_target_ids
+from project_rossum_deploy.commands.migrate.hooks import (
+    create_hook_operations,
+    migrate_run_after,
+)
+from project_rossum_deploy.commands.migrate.schemas import create_schema_operations
+from project_rossum_deploy.commands.migrate.workspaces import (
+    create_workspace_operations,
+)
 
-from project_rossum_deploy.common.read_write import read_json
+from project_rossum_deploy.common.local_index import get_local_index
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
 from project_rossum_deploy.utils.consts import (
     PrdVersionException,
     display_error,
+    display_warning,
     settings,
 )
 from project_rossum_deploy.utils.functions import (
     coro,
-    find_all_object_paths,
     flatten,
 )
 
@@ -147,59 +162,56 @@ async def migrate_project(
             return
 
         source_path = org_path / settings.SOURCE_DIRNAME
-        target_paths = await find_all_object_paths(org_path / settings.TARGET_DIRNAME)
-        target_objects = [await read_json(path) for path in target_paths]
-
-        with Progress() as progress:
-            await migrate_organization(
-                source_path=source_path,
-                client=client,
-                mapping=mapping,
-                source_id_target_pairs=source_id_target_pairs,
-                sources_by_source_id_map=sources_by_source_id_map,
-                target_organization_id=target_organization_id,
-                progress=progress,
-                plan_only=plan_only,
-                target_objects=target_objects,
-                errors=errors_by_target_id,
-                force=force,
+        # Only objects referenced as targets in the mapping are needed
+        mapped_target_ids = flatten(list(extract_flat_lookup_table(mapping).values()))
+        local_index = await get_local_index(org_path / settings.TARGET_DIRNAME)
+        # Keyed by ID, release helpers look target objects up for every target
+        target_objects = {
+            target_object["id"]: target_object
+            for target_object in await local_index.read_objects(
+                org_path / settings.TARGET_DIRNAME,
+                ids={target_organization_id, *mapped_target_ids},
             )
+        }
 
-            await migrate_schemas(
-                source_path=source_path,
-                client=client,
-                mapping=mapping,
-                source_id_target_pairs=source_id_target_pairs,
-                sources_by_source_id_map=sources_by_source_id_map,
-                progress=progress,
-                plan_only=plan_only,
-                target_objects=target_objects,
-                errors=errors_by_target_id,
-                force=force,
-            )
-            await migrate_hooks(
-                source_path=source_path,
-                client=client,
-                mapping=mapping,
-                source_id_target_pairs=source_id_target_pairs,
-                sources_by_source_id_map=sources_by_source_id_map,
-                progress=progress,
-                plan_only=plan_only,
-                target_objects=target_objects,
-                errors=errors_by_target_id,
-                force=force,
+        # All conflicts are reported before anything is released
+        released_target_ids = find_released_target_ids(mapping, target_organization_id)
+        remote_timestamps = await RemoteTimestamps.fetch(client, released_target_ids)
+        conflicts = remote_timestamps.find_conflicts(
+            [
+                (resource, target_object)
+                for resource, ids in released_target_ids.items()
+                for id in ids
+                if (target_object := target_objects.get(id, None))
+            ]
+        )
+        if conflicts and not force:
+            conflicts_listed = "\n".join(
+                [
+                    f"{resource} - {target_object.get('name', '')} ({target_object['id']})"
+                    for resource, target_object in conflicts
+                ]
             )
-            await migrate_workspaces(
+            message = f"The following target objects have a newer version in Rossum. Please check these remote versions and {settings.DOWNLOAD_COMMAND_NAME} them or use the --force option:\n{conflicts_listed}"
+            if not plan_only:
+                display_error(f"{message}\n\nNothing was released.")
+                return
+            display_warning(message)
+
+        with Progress() as progress:
+            await release_objects(
                 source_path=source_path,
                 client=client,
                 mapping=mapping,
                 source_id_target_pairs=source_id_target_pairs,
                 sources_by_source_id_map=sources_by_source_id_map,
+                target_organization_id=target_organization_id,
                 progress=progress,
                 plan_only=plan_only,
                 target_objects=target_objects,
                 errors=errors_by_target_id,
                 force=force,
+                remote_timestamps=remote_timestamps,
             )
 
         if not plan_only:
@@ -272,3 +284,73 @@ async def migrate_project(
         return
     except Exception as e:
         display_error(f"Unexpected error while migrating objects: {e}", e)
+
+
+async def release_objects(
+    source_path: Path,
+    client: ElisAPIClient,
+    mapping: dict,
+    source_id_target_pairs: dict[int, list],
+    sources_by_source_id_map: dict,
+    target_organization_id: int,
+    progress: Progress,
+    plan_only: bool = False,
+    target_objects: dict[int, dict] = {},
+    errors: dict = {},
+    force: bool = False,
+    remote_timestamps: RemoteTimestamps = None,
+):
+    """Releases all source objects as a dependency graph instead of one object type after another.
+
+    The organization goes first, schemas, hooks and workspaces then run concurrently and each queue starts as soon as its own workspace, schema and hooks were released.
+    """
+    arguments = {
+        "source_path": source_path,
+        "client": client,
+        "mapping": mapping,
+        "source_id_target_pairs": source_id_target_pairs,
+        "sources_by_source_id_map": sources_by_source_id_map,
+        "progress": progress,
+        "plan_only": plan_only,
+        "target_objects": target_objects,
+        "errors": errors,
+        "force": force,
+        "remote_timestamps": remote_timestamps,
+    }
+
+    organization_key = (Resource.Organization, mapping["organization"]["id"])
+
+    async def release_organization(dependency_results: dict):
+        await migrate_organization(
+            target_organization_id=target_organization_id, **arguments
+        )
+
+    operations, dependencies = {organization_key: release_organization}, {}
+    for create_operations in [
+        create_schema_operations,
+        create_hook_operations,
+        create_workspace_operations,
+    ]:
+        object_operations, object_dependencies = await create_operations(**arguments)
+        operations.update(object_operations)
+        dependencies.update(object_dependencies)
+
+    # Nothing is released if the organization cannot be (e.g., its local target is missing)
+    for key in operations:
+        if key != organization_key:
+            dependencies.setdefault(key, set()).add(organization_key)
+
+    outcomes = await run_dependency_graph(operations, dependencies)
+    for (resource, id), outcome in outcomes.items():
+        # Errors of individual objects were already displayed, the release continues with the rest
+        if isinstance(
+            outcome, (PrdVersionException, MissingTargetOrganizationException)
+        ):
+            raise outcome
+        elif isinstance(outcome, SkippedOperationException):
+            display_error(
+                f"Skipped releasing {resource.value} with ID '{id}' because an object it references was not released."
+            )
+
+    if not plan_only:
+        await migrate_run_after(client, source_path, source_id_target_pairs)
@@ -4,15 +4,13 @@ from rossum_api import ElisAPIClient
 from rich import print
 from rich.panel import Panel
 
-from project_rossum_deploy.utils.functions import (
-    find_object_by_id,
-)
 from project_rossum_deploy.common.read_write import read_json
 from project_rossum_deploy.utils.consts import (
     PrdVersionException,
     display_error,
     settings,
 )
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
 from project_rossum_deploy.commands.migrate.upload_helpers import (
     upload_organization,
 )
@@ -30,9 +28,10 @@ async def migrate_organization(
     target_organization_id: int,
     progress: Progress,
     plan_only: bool = False,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     task = progress.add_task("Releasing organization.", total=1)
 
@@ -43,9 +42,7 @@ async def migrate_organization(
         if settings.IS_PROJECT_IN_SAME_ORG:
             local_target_organization = organization
         else:
-            local_target_organization = find_object_by_id(
-                target_organization_id, target_objects
-            )
+            local_target_organization = target_objects.get(target_organization_id, None)
             if not local_target_organization:
                 raise MissingTargetOrganizationException(
                     f"Missing local target object, please {settings.DOWNLOAD_COMMAND_NAME} it first."
@@ -68,6 +65,7 @@ async def migrate_organization(
                     local_target_organization=local_target_organization,
                     errors=errors,
                     force=force,
+                    remote_timestamps=remote_timestamps,
                 )
             ]
         progress.update(task, advance=1)
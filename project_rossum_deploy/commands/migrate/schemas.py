@@ -1,6 +1,5 @@
-import asyncio
 import functools
-from typing import Any
+from typing import Any, Callable
 from anyio import Path
 
 from rossum_api import ElisAPIClient
@@ -13,13 +12,14 @@ from project_rossum_deploy.commands.migrate.helpers import (
     migrate_object_to_multiple_targets,
     simulate_migrate_object,
 )
-from project_rossum_deploy.common.mapping import find_mapping_of_object
+from project_rossum_deploy.common.mapping import index_mapping_by_id
 from project_rossum_deploy.common.read_write import read_formula_file, read_json
 from project_rossum_deploy.utils.consts import (
     display_error,
     settings,
     PrdVersionException,
 )
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
 from project_rossum_deploy.commands.migrate.upload_helpers import upload_schema
 from project_rossum_deploy.utils.functions import (
     detemplatize_name_id,
@@ -27,7 +27,7 @@ from project_rossum_deploy.utils.functions import (
 )
 
 
-async def migrate_schemas(
+async def create_schema_operations(
     source_path: Path,
     client: ElisAPIClient,
     mapping: dict,
@@ -35,16 +35,19 @@ async def migrate_schemas(
     sources_by_source_id_map: dict,
     progress: Progress,
     plan_only: bool = False,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
-):
+    remote_timestamps: RemoteTimestamps = None,
+) -> tuple[dict[tuple[Resource, int], Callable], dict[tuple[Resource, int], set]]:
+    """Returns an operation releasing each schema, schemas do not depend on other released objects."""
     schema_paths = [
         schema_path async for schema_path in (source_path / "schemas").iterdir()
     ]
     task = progress.add_task("Releasing schemas.", total=len(schema_paths))
+    schema_mappings = index_mapping_by_id(mapping["organization"]["schemas"])
 
-    async def migrate_schema(schema_path: Path):
+    async def migrate_schema(schema_path: Path, dependency_results: dict = None):
         try:
             _, id = detemplatize_name_id(schema_path.stem)
             schema = await read_json(schema_path)
@@ -52,9 +55,7 @@ async def migrate_schemas(
 
             schema["queues"] = []
 
-            schema_mapping = find_mapping_of_object(
-                mapping["organization"]["schemas"], id
-            )
+            schema_mapping = schema_mappings.get(id, None)
             if schema_mapping.get("ignore", None):
                 progress.update(task, advance=1)
                 return
@@ -67,6 +68,7 @@ async def migrate_schemas(
                     client=client,
                     source_object=schema,
                     target_object_type=Resource.Schema,
+                    remote_timestamps=remote_timestamps,
                 )
             else:
                 partial_upload_schema = functools.partial(
@@ -76,6 +78,7 @@ async def migrate_schemas(
                     target_objects=target_objects,
                     errors=errors,
                     force=force,
+                    remote_timestamps=remote_timestamps,
                 )
             source_id_target_pairs[id] = []
             if "target_object" in schema_mapping:
@@ -95,17 +98,20 @@ async def migrate_schemas(
             raise e
         except Exception as e:
             display_error(f"Error while migrating schema: {e}", e)
+            # Objects that depend on this one are not released
+            raise e
 
     if plan_only:
         print(Panel("Simulating workspaces."))
 
-    await asyncio.gather(
-        *[
-            migrate_schema(schema_path=schema_path)
-            for schema_path in schema_paths
-            if await schema_path.is_file()
-        ]
-    )
+    operations = {
+        (Resource.Schema, detemplatize_name_id(schema_path.stem)[1]): functools.partial(
+            migrate_schema, schema_path
+        )
+        for schema_path in schema_paths
+        if await schema_path.is_file()
+    }
+    return operations, {}
 
 
 def find_schema_id(schema: Any, schema_id: str):
@@ -6,10 +6,12 @@ from rich.panel import Panel
 from rich.prompt import Prompt
 
 from project_rossum_deploy.common.client import create_and_validate_client
-from project_rossum_deploy.utils.functions import (
-    find_object_by_id,
+from project_rossum_deploy.common.modified_at import (
+    RemoteTimestamps,
+    check_modified_timestamp,
+    create_minimal_payload,
+    store_remote_object,
 )
-from project_rossum_deploy.common.modified_at import check_modified_timestamp
 from project_rossum_deploy.utils.consts import (
     display_warning,
     settings,
@@ -26,6 +28,7 @@ async def upload_organization(
     local_target_organization: dict = None,
     errors={},
     force=False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     if not local_target_organization:
         return
@@ -36,6 +39,7 @@ async def upload_organization(
         Resource.Organization,
         target_organization_id,
         local_target_organization,
+        remote_timestamps,
     )
     if not force and not local_remote_timestamp_synced:
         errors[target_organization_id] = (
@@ -55,125 +59,165 @@ async def upload_organization(
     # Use only a subset of org fields where it makes sense to migrate
     organization_fields = {k: organization[k] for k in settings.ORGANIZATION_FIELDS}
 
-    return await client._http_client.update(
-        Resource.Organization, id_=target_organization_id, data=organization_fields
+    updated_object = await client._http_client.update(
+        Resource.Organization,
+        id_=target_organization_id,
+        data=create_minimal_payload(
+            organization_fields,
+            Resource.Organization,
+            target_organization_id,
+            remote_timestamps,
+        ),
     )
+    return store_remote_object(remote_timestamps, Resource.Organization, updated_object)
 
 
 async def upload_workspace(
     client: ElisAPIClient,
     workspace: dict,
     target_id: int,
-    target_objects=[],
+    target_objects: dict[int, dict] = {},
     errors={},
     force=False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     if target_id:
-        local_object = find_object_by_id(target_id, target_objects)
+        local_object = target_objects.get(target_id, None)
         if not local_object:
             raise Exception(
                 f'Not could not find target object with ID "{target_id}" locally. If it exists, please {settings.DOWNLOAD_COMMAND_NAME} it first.'
             )
 
         local_remote_timestamp_synced = await check_modified_timestamp(
-            client, Resource.Workspace, target_id, local_object
+            client, Resource.Workspace, target_id, local_object, remote_timestamps
         )
         if not force and not local_remote_timestamp_synced:
             errors[target_id] = (Resource.Workspace, local_object.get("name", ""))
             return local_object
 
-        return await client._http_client.update(
-            Resource.Workspace, id_=target_id, data=workspace
+        updated_object = await client._http_client.update(
+            Resource.Workspace,
+            id_=target_id,
+            data=create_minimal_payload(
+                workspace, Resource.Workspace, target_id, remote_timestamps
+            ),
+        )
+        return store_remote_object(
+            remote_timestamps, Resource.Workspace, updated_object
         )
     else:
-        return await client._http_client.create(Resource.Workspace, workspace)
+        created_object = await client._http_client.create(Resource.Workspace, workspace)
+        return store_remote_object(
+            remote_timestamps, Resource.Workspace, created_object
+        )
 
 
 async def upload_queue(
     client: ElisAPIClient,
     queue: dict,
     target_id: int,
-    target_objects=[],
+    target_objects: dict[int, dict] = {},
     errors={},
     force=False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     if target_id:
-        local_object = find_object_by_id(target_id, target_objects)
+        local_object = target_objects.get(target_id, None)
         if not local_object:
             raise Exception(
                 f'Not could not find target object with ID "{target_id}" locally. If it exists, please {settings.DOWNLOAD_COMMAND_NAME} it first.'
             )
 
         local_remote_timestamp_synced = await check_modified_timestamp(
-            client, Resource.Queue, target_id, local_object
+            client, Resource.Queue, target_id, local_object, remote_timestamps
         )
         if not force and not local_remote_timestamp_synced:
             errors[target_id] = (Resource.Queue, local_object.get("name", ""))
             return local_object
 
-        return await client._http_client.update(
-            Resource.Queue, id_=target_id, data=queue
+        updated_object = await client._http_client.update(
+            Resource.Queue,
+            id_=target_id,
+            data=create_minimal_payload(
+                queue, Resource.Queue, target_id, remote_timestamps
+            ),
         )
+        return store_remote_object(remote_timestamps, Resource.Queue, updated_object)
     else:
-        return await client._http_client.create(Resource.Queue, queue)
+        created_object = await client._http_client.create(Resource.Queue, queue)
+        return store_remote_object(remote_timestamps, Resource.Queue, created_object)
 
 
 async def upload_inbox(
     client: ElisAPIClient,
     inbox: dict,
     target_id: int,
-    target_objects=[],
+    target_objects: dict[int, dict] = {},
     errors={},
     force=False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     if target_id:
-        local_object = find_object_by_id(target_id, target_objects)
+        local_object = target_objects.get(target_id, None)
         if not local_object:
             raise Exception(
                 f'Not could not find target object with ID "{target_id}" locally. If it exists, please {settings.DOWNLOAD_COMMAND_NAME} it first.'
             )
 
         local_remote_timestamp_synced = await check_modified_timestamp(
-            client, Resource.Inbox, target_id, local_object
+            client, Resource.Inbox, target_id, local_object, remote_timestamps
         )
         if not force and not local_remote_timestamp_synced:
             errors[target_id] = (Resource.Inbox, local_object.get("name", ""))
             return local_object
 
-        return await client._http_client.update(
-            Resource.Inbox, id_=target_id, data=inbox
+        updated_object = await client._http_client.update(
+            Resource.Inbox,
+            id_=target_id,
+            data=create_minimal_payload(
+                inbox, Resource.Inbox, target_id, remote_timestamps
+            ),
         )
+        return store_remote_object(remote_timestamps, Resource.Inbox, updated_object)
     else:
-        return await client._http_client.create(Resource.Inbox, inbox)
+        created_object = await client._http_client.create(Resource.Inbox, inbox)
+        return store_remote_object(remote_timestamps, Resource.Inbox, created_object)
 
 
 async def upload_schema(
     client: ElisAPIClient,
     schema: dict,
     target_id: int,
-    target_objects=[],
+    target_objects: dict[int, dict] = {},
     errors={},
     force=False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     if target_id:
-        local_object = find_object_by_id(target_id, target_objects)
+        local_object = target_objects.get(target_id, None)
         if not local_object:
             raise Exception(
                 f'Not could not find target object with ID "{target_id}" locally. If it exists, please {settings.DOWNLOAD_COMMAND_NAME} it first.'
             )
 
         local_remote_timestamp_synced = await check_modified_timestamp(
-            client, Resource.Schema, target_id, local_object
+            client, Resource.Schema, target_id, local_object, remote_timestamps
         )
         if not force and not local_remote_timestamp_synced:
             errors[target_id] = (Resource.Schema, local_object.get("name", ""))
             return local_object
 
-        return await client._http_client.update(
-            Resource.Schema, id_=target_id, data=schema
+        updated_object = await client._http_client.update(
+            Resource.Schema,
+            id_=target_id,
+            data=create_minimal_payload(
+                schema, Resource.Schema, target_id, remote_timestamps
+            ),
         )
+        return store_remote_object(remote_timestamps, Resource.Schema, updated_object)
     else:
-        return await client._http_client.create(Resource.Schema, schema)
+        created_object = await client._http_client.create(Resource.Schema, schema)
+        return store_remote_object(remote_timestamps, Resource.Schema, created_object)
 
 
 async def upload_hook(
@@ -182,32 +226,40 @@ async def upload_hook(
     hook_mapping: dict,
     target_id: int,
     progress: Progress,
-    target_objects=[],
+    target_objects: dict[int, dict] = {},
     errors={},
     force=False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     if target_id:
-        local_object = find_object_by_id(target_id, target_objects)
+        local_object = target_objects.get(target_id, None)
         if not local_object:
             raise Exception(
                 f'Not could not find target object with ID "{target_id}" locally. If it exists, please {settings.DOWNLOAD_COMMAND_NAME} it first.'
             )
 
         local_remote_timestamp_synced = await check_modified_timestamp(
-            client, Resource.Hook, target_id, local_object
+            client, Resource.Hook, target_id, local_object, remote_timestamps
         )
         if not force and not local_remote_timestamp_synced:
             errors[target_id] = (Resource.Hook, local_object.get("name", ""))
             return local_object
 
-        return await client._http_client.update(Resource.Hook, id_=target_id, data=hook)
+        updated_object = await client._http_client.update(
+            Resource.Hook,
+            id_=target_id,
+            data=create_minimal_payload(
+                hook, Resource.Hook, target_id, remote_timestamps
+            ),
+        )
+        return store_remote_object(remote_timestamps, Resource.Hook, updated_object)
     else:
         created_hook = await create_hook_based_on_template(hook=hook, client=client)
         if not created_hook:
             created_hook = await create_hook_without_template(
                 hook=hook, client=client, hook_mapping=hook_mapping, progress=progress
             )
-        return created_hook
+        return store_remote_object(remote_timestamps, Resource.Hook, created_hook)
 
 
 async def create_hook_based_on_template(hook: dict, client: ElisAPIClient):
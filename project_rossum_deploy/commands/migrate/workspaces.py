@@ -1,7 +1,7 @@
-import asyncio
 from copy import deepcopy
 import functools
 import logging
+from typing import Callable
 from anyio import Path
 from rich import print
 from rich.progress import Progress
@@ -15,12 +15,16 @@ from project_rossum_deploy.commands.migrate.helpers import (
     replace_dependency_url,
     simulate_migrate_object,
 )
+from project_rossum_deploy.common.modified_at import (
+    RemoteTimestamps,
+    get_remote_object,
+)
 from project_rossum_deploy.commands.migrate.upload_helpers import (
     upload_inbox,
     upload_queue,
     upload_workspace,
 )
-from project_rossum_deploy.common.mapping import find_mapping_of_object
+from project_rossum_deploy.common.mapping import index_mapping_by_id
 from project_rossum_deploy.common.read_write import read_json
 from project_rossum_deploy.utils.consts import (
     PrdVersionException,
@@ -30,10 +34,11 @@ from project_rossum_deploy.utils.consts import (
 
 from project_rossum_deploy.utils.functions import (
     detemplatize_name_id,
+    extract_id_from_url,
 )
 
 
-async def migrate_workspaces(
+async def create_workspace_operations(
     source_path: Path,
     client: ElisAPIClient,
     mapping: dict,
@@ -41,17 +46,23 @@ async def migrate_workspaces(
     sources_by_source_id_map: dict,
     progress: Progress,
     plan_only: bool = False,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
-):
+    remote_timestamps: RemoteTimestamps = None,
+) -> tuple[dict[tuple[Resource, int], Callable], dict[tuple[Resource, int], set]]:
+    """Returns an operation releasing each workspace and each of its queues (with the inbox).
+
+    Queues depend on their own workspace, schema and hooks, so each of them starts as soon as these have their targets.
+    """
     workspace_paths = [
         workspace_path
         async for workspace_path in (source_path / "workspaces").iterdir()
     ]
     task = progress.add_task("Releasing workspaces.", total=len(workspace_paths))
+    workspace_mappings = index_mapping_by_id(mapping["organization"]["workspaces"])
 
-    async def migrate_workspace(ws_path: Path):
+    async def migrate_workspace(ws_path: Path, dependency_results: dict = None):
         try:
             _, id = detemplatize_name_id(ws_path.name)
             ws_config_path = ws_path / "workspace.json"
@@ -63,9 +74,7 @@ async def migrate_workspaces(
                 workspace, 0, 1, "organization", source_id_target_pairs
             )
 
-            workspace_mapping = find_mapping_of_object(
-                mapping["organization"]["workspaces"], id
-            )
+            workspace_mapping = workspace_mappings.get(id, None)
             if workspace_mapping.get("ignore", None):
                 progress.update(task, advance=1)
                 return
@@ -76,6 +85,7 @@ async def migrate_workspaces(
                     client=client,
                     source_object=workspace,
                     target_object_type=Resource.Workspace,
+                    remote_timestamps=remote_timestamps,
                 )
             else:
                 partial_upload_workspace = functools.partial(
@@ -85,6 +95,7 @@ async def migrate_workspaces(
                     target_objects=target_objects,
                     errors=errors,
                     force=force,
+                    remote_timestamps=remote_timestamps,
                 )
             source_id_target_pairs[id] = []
             if "target_object" in workspace_mapping:
@@ -99,19 +110,6 @@ async def migrate_workspaces(
             )
             source_id_target_pairs[id].extend(results)
 
-            await migrate_queues_and_inboxes(
-                ws_path=ws_path,
-                client=client,
-                workspace_mapping=workspace_mapping,
-                mapping=mapping,
-                sources_by_source_id_map=sources_by_source_id_map,
-                source_id_target_pairs=source_id_target_pairs,
-                plan_only=plan_only,
-                target_objects=target_objects,
-                errors=errors,
-                force=force,
-            )
-
             progress.update(task, advance=1)
         except PrdVersionException as e:
             raise e
@@ -119,16 +117,60 @@ async def migrate_workspaces(
             display_error(
                 f"Error while migrating workspace with path '{ws_path}': {e}", e
             )
+            # Objects that depend on this one are not released
+            raise e
 
     if plan_only:
         print(Panel("Simulating workspaces."))
 
-    await asyncio.gather(
-        *[migrate_workspace(ws_path=ws_path) for ws_path in workspace_paths]
-    )
-
-
-async def migrate_queues_and_inboxes(
+    operations, dependencies = {}, {}
+    for ws_path in workspace_paths:
+        _, id = detemplatize_name_id(ws_path.name)
+        operations[(Resource.Workspace, id)] = functools.partial(
+            migrate_workspace, ws_path
+        )
+
+        # Queues of ignored workspaces are not released
+        workspace_mapping = workspace_mappings.get(id, None)
+        if not workspace_mapping or workspace_mapping.get("ignore", None):
+            continue
+
+        queue_operations, queue_dependencies = await create_queue_operations(
+            ws_path=ws_path,
+            client=client,
+            workspace_mapping=workspace_mapping,
+            mapping=mapping,
+            sources_by_source_id_map=sources_by_source_id_map,
+            source_id_target_pairs=source_id_target_pairs,
+            plan_only=plan_only,
+            target_objects=target_objects,
+            errors=errors,
+            force=force,
+            remote_timestamps=remote_timestamps,
+        )
+        operations.update(queue_operations)
+        dependencies.update(queue_dependencies)
+
+    return operations, dependencies
+
+
+def find_queue_dependencies(queue: dict) -> set[tuple[Resource, int]]:
+    """Returns the source objects whose targets the queue's targets reference."""
+    dependencies = set()
+    for attribute, resource in [
+        ("workspace", Resource.Workspace),
+        ("schema", Resource.Schema),
+        ("hooks", Resource.Hook),
+        ("webhooks", Resource.Hook),
+    ]:
+        value = queue.get(attribute, None)
+        for url in value if isinstance(value, list) else [value]:
+            if url:
+                dependencies.add((resource, extract_id_from_url(url)))
+    return dependencies
+
+
+async def create_queue_operations(
     ws_path: Path,
     client: ElisAPIClient,
     workspace_mapping: dict,
@@ -136,24 +178,25 @@ async def migrate_queues_and_inboxes(
     sources_by_source_id_map: dict,
     source_id_target_pairs: dict[int, list],
     plan_only: bool = False,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
-):
+    remote_timestamps: RemoteTimestamps = None,
+) -> tuple[dict[tuple[Resource, int], Callable], dict[tuple[Resource, int], set]]:
     if not (await (ws_path / "queues").exists()):
-        return
+        return {}, {}
 
     queue_paths = [queue_path async for queue_path in (ws_path / "queues").iterdir()]
+    queue_mappings = index_mapping_by_id(workspace_mapping["queues"])
 
-    async def migrate_queue_and_inbox(queue_path: Path):
+    async def migrate_queue_and_inbox(
+        queue_path: Path, queue: dict, dependency_results: dict = None
+    ):
         try:
             _, id = detemplatize_name_id(queue_path.name)
-
-            queue_config_path = queue_path / "queue.json"
-            queue = await read_json(queue_config_path)
             sources_by_source_id_map[id] = queue
 
-            queue_mapping = find_mapping_of_object(workspace_mapping["queues"], id)
+            queue_mapping = queue_mappings.get(id, None)
             if queue_mapping.get("ignore", None):
                 return
 
@@ -163,6 +206,7 @@ async def migrate_queues_and_inboxes(
                     client=client,
                     source_object=queue,
                     target_object_type=Resource.Queue,
+                    remote_timestamps=remote_timestamps,
                 )
             else:
                 partial_upload_queue_function = functools.partial(
@@ -173,6 +217,7 @@ async def migrate_queues_and_inboxes(
                     target_objects=target_objects,
                     errors=errors,
                     force=force,
+                    remote_timestamps=remote_timestamps,
                 )
 
             source_id_target_pairs[id] = []
@@ -207,6 +252,7 @@ async def migrate_queues_and_inboxes(
                     client=client,
                     source_object=inbox,
                     target_object_type=Resource.Inbox,
+                    remote_timestamps=remote_timestamps,
                 )
             else:
                 partial_upload_inbox_function = functools.partial(
@@ -217,6 +263,7 @@ async def migrate_queues_and_inboxes(
                     target_objects=target_objects,
                     errors=errors,
                     force=force,
+                    remote_timestamps=remote_timestamps,
                 )
             source_id_target_pairs[inbox_id] = []
             if "target_object" in inbox_mapping:
@@ -239,10 +286,25 @@ async def migrate_queues_and_inboxes(
                 f"Error while migrating queue with path '{queue_path}': {e}", e
             )
             logging.exception(e)
+            raise e
 
-    await asyncio.gather(
-        *[migrate_queue_and_inbox(queue_path=queue_path) for queue_path in queue_paths]
-    )
+    operations, dependencies = {}, {}
+    for queue_path in queue_paths:
+        try:
+            _, id = detemplatize_name_id(queue_path.name)
+            queue = await read_json(queue_path / "queue.json")
+        except Exception as e:
+            display_error(
+                f"Error while migrating queue with path '{queue_path}': {e}", e
+            )
+            continue
+
+        operations[(Resource.Queue, id)] = functools.partial(
+            migrate_queue_and_inbox, queue_path, queue
+        )
+        dependencies[(Resource.Queue, id)] = find_queue_dependencies(queue)
+
+    return operations, dependencies
 
 
 async def prepare_queue_upload(
@@ -252,13 +314,14 @@ async def prepare_queue_upload(
     target_objects_count: int,
     source_id_target_pairs: dict[int, list],
     target_id: int,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     queue = deepcopy(queue)
     target_object = (
-        await client._http_client.fetch_one(Resource.Queue, target_id)
+        await get_remote_object(client, Resource.Queue, target_id, remote_timestamps)
         if target_id
         else None
     )
@@ -305,6 +368,7 @@ async def prepare_queue_upload(
         target_objects=target_objects,
         errors=errors,
         force=force,
+        remote_timestamps=remote_timestamps,
     )
 
 
@@ -315,9 +379,10 @@ async def prepare_inbox_upload(
     target_objects_count: int,
     source_id_target_pairs: dict[int, list],
     target_id: int,
-    target_objects: list[dict] = [],
+    target_objects: dict[int, dict] = {},
     errors: dict = {},
     force: bool = False,
+    remote_timestamps: RemoteTimestamps = None,
 ):
     inbox = deepcopy(inbox)
 
@@ -338,4 +403,5 @@ async def prepare_inbox_upload(
         target_objects=target_objects,
         errors=errors,
         force=force,
+        remote_timestamps=remote_timestamps,
     )
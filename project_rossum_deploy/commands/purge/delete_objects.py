@@ -1,10 +1,9 @@
-import asyncio
-
 from rich.progress import Progress
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
 
+from project_rossum_deploy.common.concurrency import gather_with_scheduler
 from project_rossum_deploy.utils.consts import display_error
 from project_rossum_deploy.utils.functions import make_request_with_progress
 
@@ -52,7 +51,7 @@ async def delete_all_objects_with_ids(ids_to_delete: list[dict], client: ElisAPI
         )
 
         try:
-            await asyncio.gather(
+            await gather_with_scheduler(
                 *[
                     make_request_with_progress(
                         client._http_client.delete(Resource.Hook, hook_id),
@@ -66,7 +65,7 @@ async def delete_all_objects_with_ids(ids_to_delete: list[dict], client: ElisAPI
             display_error(f"Error while deleting hooks: {e}", e)
 
         try:
-            await asyncio.gather(
+            await gather_with_scheduler(
                 *[
                     make_request_with_progress(
                         client._http_client.delete(Resource.Inbox, inbox_id),
@@ -80,7 +79,7 @@ async def delete_all_objects_with_ids(ids_to_delete: list[dict], client: ElisAPI
             display_error(f"Error while deleting inboxes: {e}", e)
 
         try:
-            await asyncio.gather(
+            await gather_with_scheduler(
                 *[
                     make_request_with_progress(
                         client._http_client._request(
@@ -96,7 +95,7 @@ async def delete_all_objects_with_ids(ids_to_delete: list[dict], client: ElisAPI
             display_error(f"Error while deleting queues: {e}", e)
 
         try:
-            await asyncio.gather(
+            await gather_with_scheduler(
                 *[
                     make_request_with_progress(
                         client.delete_workspace(workspace_id), progress, task
@@ -108,7 +107,7 @@ async def delete_all_objects_with_ids(ids_to_delete: list[dict], client: ElisAPI
             display_error(f"Error while deleting workspaces: {e}", e)
 
         try:
-            await asyncio.gather(
+            await gather_with_scheduler(
                 *[
                     make_request_with_progress(
                         client.delete_schema(schema_id), progress, task
@@ -1,7 +1,10 @@
 import os
 from rich.prompt import Confirm
 from rossum_api import ElisAPIClient
+from rossum_api.api_client import Resource
 from project_rossum_deploy.commands.migrate.schemas import find_schema_id
+from project_rossum_deploy.common.concurrency import gather_with_scheduler
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
 from project_rossum_deploy.common.read_write import (
     create_custom_hook_code_path,
     create_formula_directory_path,
@@ -18,62 +21,78 @@ from project_rossum_deploy.utils.consts import GIT_CHARACTERS, display_error, se
 from anyio import Path
 
 
-def is_change_existing(change, changes):
-    c_op, c_path = change
-    for op, path in changes:
-        if c_op == op and str(c_path) == str(path):
-            return True
-    return False
+MERGED_OPS = [
+    GIT_CHARACTERS.UPDATED,
+    GIT_CHARACTERS.CREATED,
+    GIT_CHARACTERS.CREATED_STAGED,
+]
+
+
+class ChangeSet:
+    """Changes (op, path) in the order they were added, each change is kept only once (paths are compared as strings)."""
+
+    def __init__(self, changes: list[tuple[str, Path]] = []):
+        self.changes: dict[tuple[str, str], tuple[str, Path]] = {}
+        for change in changes:
+            self.add(change)
+
+    @staticmethod
+    def get_key(change: tuple[str, Path]) -> tuple[str, str]:
+        op, path = change
+        return (op, str(path))
+
+    def add(self, change: tuple[str, Path]):
+        self.changes.setdefault(self.get_key(change), change)
+
+    def __contains__(self, change: tuple[str, Path]) -> bool:
+        return self.get_key(change) in self.changes
+
+    def __iter__(self):
+        return iter(list(self.changes.values()))
+
+    def to_list(self) -> list[tuple[str, Path]]:
+        return list(self.changes.values())
 
 
 async def merge_formula_changes(changes: list[tuple[str, Path]]):
-    merged_changes = []
+    merged_changes = ChangeSet()
+    # Formula files grouped by their schema, so that each schema is read and written once
+    formula_paths_by_schema_path: dict[Path, list[Path]] = {}
     for change in changes:
         op, path = change
 
         if (
-            op
-            in [
-                GIT_CHARACTERS.UPDATED,
-                GIT_CHARACTERS.CREATED,
-                GIT_CHARACTERS.CREATED_STAGED,
-            ]
+            op in MERGED_OPS
             and "schemas" in path.parent.parent.name
             and (path.suffix == ".py")
         ):
-            formula_code = await read_formula_file(path)
-            formula_name = path.stem
-
             schema_file_name = str(path.parent.stem).removeprefix(
                 settings.FORMULA_DIR_PREFIX
             )
             schema_path = path.parent.parent / f"{schema_file_name}.json"
-            schema = await read_json(schema_path)
+            formula_paths_by_schema_path.setdefault(schema_path, []).append(path)
+            merged_changes.add((GIT_CHARACTERS.UPDATED, schema_path))
+        else:
+            merged_changes.add(change)
 
-            schema_id = find_schema_id(schema["content"], formula_name)
-            schema_id["formula"] = formula_code
+    schemas_by_path = {}
+    for schema_path, formula_paths in formula_paths_by_schema_path.items():
+        schema = await read_json(schema_path)
+        for path in formula_paths:
+            schema_id = find_schema_id(schema["content"], path.stem)
+            schema_id["formula"] = await read_formula_file(path)
 
-            await write_json(schema_path, schema)
-            new_change = (GIT_CHARACTERS.UPDATED, schema_path)
-            if not is_change_existing(new_change, merged_changes):
-                merged_changes.append(new_change)
-        elif not is_change_existing(change, merged_changes):
-            merged_changes.append(change)
+        await write_json(schema_path, schema)
+        schemas_by_path[str(schema_path)] = schema
 
     # If code file was not among the changes, the JSON schemas file already has the new code thanks to the for loop above and no change is technically actually made.
     # In case code of a schema was changed directly in the JSON file, update the code file as well.
     for change in merged_changes:
         op, path = change
         if (
-            op
-            in [
-                GIT_CHARACTERS.UPDATED,
-                GIT_CHARACTERS.CREATED,
-                GIT_CHARACTERS.CREATED_STAGED,
-            ]
-            and "schemas" in path.parent.name
+            op in MERGED_OPS and "schemas" in path.parent.name
         ) and path.suffix == ".json":
-            schema = await read_json(path)
+            schema = schemas_by_path.get(str(path), None) or await read_json(path)
 
             formula_fields = find_formula_fields_in_schema(schema["content"])
             if formula_fields:
@@ -85,54 +104,47 @@ async def merge_formula_changes(changes: list[tuple[str, Path]]):
                         formula_directory_path / f"{field_id}.py", code
                     )
 
-    return merged_changes
+    return merged_changes.to_list()
 
 
 async def merge_hook_changes(changes: list[tuple[str, Path]], org_path: Path):
-    merged_changes = []
+    merged_changes = ChangeSet()
+    # Code files grouped by their hook, so that each hook is read and written once
+    code_paths_by_object_path: dict[Path, list[Path]] = {}
     for change in changes:
         op, path = change
         if (
-            op
-            in [
-                GIT_CHARACTERS.UPDATED,
-                GIT_CHARACTERS.CREATED,
-                GIT_CHARACTERS.CREATED_STAGED,
-            ]
+            op in MERGED_OPS
             and path.parent.name == "hooks"
             and path.suffix in [".py", ".js"]
         ):
-            # Overwrite the code property in the JSON hook file with the code from the file.
-            # If the JSON hook file also had changed code, it will get overwritten!
-            with open(path, "r") as file:
-                code_str = file.read()
-                object_path = org_path / (
-                    Path(str(path).removesuffix(".py").removesuffix(".js") + ".json")
-                )
-                hook = await read_json(object_path)
-                hook["config"]["code"] = code_str
-                await write_json(object_path, hook)
-                new_change = (GIT_CHARACTERS.UPDATED, object_path)
-                exists = is_change_existing(new_change, merged_changes)
-                if not exists:
-                    merged_changes.append(new_change)
-        elif not is_change_existing(change, merged_changes):
-            merged_changes.append(change)
+            object_path = org_path / (
+                Path(str(path).removesuffix(".py").removesuffix(".js") + ".json")
+            )
+            code_paths_by_object_path.setdefault(object_path, []).append(path)
+            merged_changes.add((GIT_CHARACTERS.UPDATED, object_path))
+        else:
+            merged_changes.add(change)
+
+    hooks_by_path = {}
+    for object_path, code_paths in code_paths_by_object_path.items():
+        # Overwrite the code property in the JSON hook file with the code from the file.
+        # If the JSON hook file also had changed code, it will get overwritten!
+        hook = await read_json(object_path)
+        for path in code_paths:
+            hook["config"]["code"] = await Path(path).read_text()
+
+        await write_json(object_path, hook)
+        hooks_by_path[str(object_path)] = hook
 
     # If code file was not among the changes, the JSON hook file already has the new code thanks to the for loop above and no change is technically actually made.
     # In case code of a hook was changed directly in the JSON file, update the code file as well.
     for change in merged_changes:
         op, path = change
         if (
-            op
-            in [
-                GIT_CHARACTERS.UPDATED,
-                GIT_CHARACTERS.CREATED,
-                GIT_CHARACTERS.CREATED_STAGED,
-            ]
-            and path.parent.name == "hooks"
+            op in MERGED_OPS and path.parent.name == "hooks"
         ) and path.suffix == ".json":
-            hook = await read_json(path)
+            hook = hooks_by_path.get(str(path), None) or await read_json(path)
 
             code_path = create_custom_hook_code_path(Path(path), hook)
             if not code_path:
@@ -140,57 +152,65 @@ async def merge_hook_changes(changes: list[tuple[str, Path]], org_path: Path):
 
             await write_str(code_path, hook.get("config", {}).get("code", None))
 
-    return merged_changes
+    return merged_changes.to_list()
+
+
+def determine_created_resource(path: Path) -> Resource:
+    if str(path).endswith("workspace.json"):
+        return Resource.Workspace
+    elif str(path).endswith("queue.json"):
+        return Resource.Queue
+    elif str(path.parent).endswith("hooks"):
+        return Resource.Hook
+    elif str(path.parent).endswith("schemas"):
+        return Resource.Schema
+    return None
 
 
-async def evaluate_create_dependencies(changes, org_path, client: ElisAPIClient):
-    changes_updated = []
+async def evaluate_create_dependencies(
+    changes, org_path, client: ElisAPIClient
+) -> tuple[tuple[str, Path], ...]:
+    """Drops created files of objects that already exist in Rossum.
+
+    Existence is checked in id-filtered list calls grouped by resource type, all at once.
+    """
+    created_changes = []
+    skipped_changes = ChangeSet()
     for change in changes:
-        path: Path
         op, path = change
         if (
             op == GIT_CHARACTERS.CREATED or op == GIT_CHARACTERS.CREATED_STAGED
         ) and path.suffix == ".json":
-            object_path = org_path / path
-            object = await read_json(object_path)
-            id = object.get("id", None)
-            obj = None
-            if str(path).endswith("workspace.json"):
-                if id:
-                    obj = await client.retrieve_workspace(id)
-                if not obj and not is_change_existing(change, changes_updated):
-                    changes_updated.append(change)
-            elif str(path).endswith("queue.json"):
-                if id:
-                    obj = await client.retrieve_queue(id)
-                if not obj and not is_change_existing(change, changes_updated):
-                    changes_updated.append(change)
-            elif str(path.parent).endswith("hooks"):
-                if id:
-                    obj = await client.retrieve_hook(id)
-                if not obj and not is_change_existing(change, changes_updated):
-                    changes_updated.append(change)
-            elif str(path.parent).endswith("schemas"):
-                if id:
-                    obj = await client.retrieve_schema(id)
-                if not obj and not is_change_existing(change, changes_updated):
-                    changes_updated.append(change)
-            elif str(path).endswith("inbox.json") or str(path).endswith(
+            if str(path).endswith("inbox.json") or str(path).endswith(
                 "organization.json"
             ):
                 display_error(
                     f"Creating organization or inbox is not supported. ({path})"
                 )
-            else:
-                if not is_change_existing(change, changes_updated):
-                    changes_updated.append(change)
-        else:
-            changes_updated.append(change)
-
-    return changes_updated
-
-
-async def cascade_delete_ops(path, change, changes_updated, org_path):
+                skipped_changes.add(change)
+            elif resource := determine_created_resource(path):
+                created_changes.append((change, resource))
+
+    created_objects = await gather_with_scheduler(
+        *[read_json(org_path / path) for (_, path), _ in created_changes]
+    )
+    ids_by_resource = {}
+    for (_, resource), object in zip(created_changes, created_objects):
+        if id := object.get("id", None):
+            ids_by_resource.setdefault(resource, set()).add(id)
+    remote_objects = await RemoteTimestamps.fetch(client, ids_by_resource)
+
+    for (change, resource), object in zip(created_changes, created_objects):
+        if remote_objects.is_fetched(resource, object.get("id", None)):
+            skipped_changes.add(change)
+
+    plan = ChangeSet(change for change in changes if change not in skipped_changes)
+    return tuple(plan.to_list())
+
+
+async def cascade_delete_ops(
+    path, change, changes_updated: ChangeSet, org_path
+) -> ChangeSet:
     abs_path = await path.parent.absolute()
     file_set = set()
     for dir_, _, files in os.walk(str(abs_path)):
@@ -205,15 +225,13 @@ async def cascade_delete_ops(path, change, changes_updated, org_path):
         ):  # ignore deleting inboxes, it will be deleted when queue is deleted
             continue
         op_obj = ("D", new_path)
-        if not is_change_existing(op_obj, changes_updated):
-            changes_updated.append(op_obj)
-    if not is_change_existing(change, changes_updated):
-        changes_updated.append(change)
+        changes_updated.add(op_obj)
+    changes_updated.add(change)
     return changes_updated
 
 
 async def evaluate_delete_dependencies(changes, org_path):
-    changes_updated = []
+    changes_updated = ChangeSet()
     for change in changes:
         op, path = change
         if op == GIT_CHARACTERS.DELETED:
@@ -230,10 +248,8 @@ async def evaluate_delete_dependencies(changes, org_path):
                     path, change, changes_updated, org_path
                 )
             else:
-                if not is_change_existing(change, changes_updated):
-                    changes_updated.append(change)
+                changes_updated.add(change)
         else:
-            if not is_change_existing(change, changes_updated):
-                changes_updated.append(change)
+            changes_updated.add(change)
 
-    return changes_updated
+    return changes_updated.to_list()
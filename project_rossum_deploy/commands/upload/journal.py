@@ -0,0 +1,175 @@
+from anyio import Path
+
+from project_rossum_deploy.common.git import (
+    GitChanges,
+    get_head_commit,
+    read_committed_changes,
+)
+from project_rossum_deploy.common.local_index import get_local_index
+from project_rossum_deploy.common.local_state import (
+    append_record,
+    read_records,
+    read_state,
+    remove_state,
+    update_state,
+)
+from project_rossum_deploy.utils.consts import (
+    GIT_CHARACTERS,
+    display_warning,
+    settings,
+)
+
+
+async def read_push_journal(org_path: Path, destination: str) -> dict:
+    state = await read_state(org_path, settings.PUSH_JOURNAL_FILENAME)
+    return state.get(destination, {})
+
+
+async def find_changes_since_last_push(
+    org_path: Path,
+    destination: str,
+    git_changes: GitChanges,
+    indexed_only: bool = False,
+) -> list[tuple[str, Path]]:
+    """Files changed in commits since the last successful push together with the (uncommitted) changes from git status."""
+    changes = git_changes.get_changed_file_paths(destination, indexed_only=indexed_only)
+
+    journal = await read_push_journal(org_path, destination)
+    if not journal.get("commit", None):
+        return changes
+
+    committed_changes = read_committed_changes(journal["commit"], destination)
+    if committed_changes is None:
+        display_warning(
+            f'The last pushed commit "{journal["commit"]}" no longer exists, only uncommitted changes are pushed. Use "--all" to push everything.'
+        )
+        return changes
+
+    changed_paths = set(path for _, path in changes)
+    for op, path in committed_changes:
+        # Deletions are not pushed
+        if path in changed_paths or op == GIT_CHARACTERS.DELETED:
+            continue
+        op = (
+            GIT_CHARACTERS.CREATED_STAGED.value
+            if op == GIT_CHARACTERS.CREATED_STAGED
+            else GIT_CHARACTERS.UPDATED.value
+        )
+        changes.append((op, path))
+        changed_paths.add(path)
+
+    return changes
+
+
+async def filter_already_pushed_changes(
+    org_path: Path, destination: str, changes: list[tuple[str, Path]]
+) -> list[tuple[str, Path]]:
+    """Drops object files whose content is the same as when they were last pushed (or pulled right after that push)."""
+    pushed_hashes = (await read_push_journal(org_path, destination)).get("hashes", {})
+    if not pushed_hashes:
+        return changes
+
+    local_index = await get_local_index(org_path / destination)
+    unpushed_changes = []
+    for op, path in changes:
+        key = local_index.get_key(org_path / path)
+        if (
+            key in pushed_hashes
+            and (local_entry := await local_index.get_entry(org_path / path))
+            and local_entry["hash"] == pushed_hashes[key]
+        ):
+            continue
+        unpushed_changes.append((op, path))
+    return unpushed_changes
+
+
+async def record_successful_push(
+    org_path: Path, destination: str, unpushed_paths: list[Path] = []
+):
+    """Stores the current commit and hashes of all object files that are now in sync with Rossum."""
+    local_index = await get_local_index(org_path / destination)
+    local_entries = await local_index.scan(org_path / destination)
+    unpushed_keys = set(local_index.get_key(org_path / path) for path in unpushed_paths)
+
+    destination_journal = {
+        "commit": get_head_commit(),
+        "hashes": {
+            key: local_entry["hash"]
+            for path, local_entry in local_entries.items()
+            if (key := local_index.get_key(path)) not in unpushed_keys
+        },
+    }
+    await update_state(
+        org_path,
+        settings.PUSH_JOURNAL_FILENAME,
+        lambda state: state.update({destination: destination_journal}),
+    )
+
+
+class PushLog:
+    """Append-only log of the operations completed by an unfinished push (op, path, resulting id/url, hash of the written response).
+
+    A failed push keeps its log, so that `push --resume` does not send the completed operations again (and does not create duplicates).
+    The log is removed once the push finishes.
+    """
+
+    def __init__(self, org_path: Path, destination: str, records: list[dict] = []):
+        self.org_path = org_path
+        self.destination = destination
+        self.records = {
+            record["path"]: record
+            for record in records
+            if record.get("destination", None) == destination
+        }
+
+    @classmethod
+    async def start(cls, org_path: Path, destination: str, resume: bool = False):
+        if not resume:
+            await remove_state(org_path, settings.PUSH_LOG_FILENAME)
+            return cls(org_path, destination)
+
+        records = await read_records(org_path, settings.PUSH_LOG_FILENAME)
+        push_log = cls(org_path, destination, records)
+        if not push_log.records:
+            display_warning(
+                f"There is no unfinished {settings.UPLOAD_COMMAND_NAME} of {destination} to resume, all changes will be pushed."
+            )
+        return push_log
+
+    async def record(self, op: str, path: Path, source_url: str, result: dict):
+        local_index = await get_local_index(self.org_path / path)
+        local_entry = await local_index.get_entry(self.org_path / path)
+        record = {
+            "destination": self.destination,
+            "op": str(op),
+            "path": str(path),
+            "id": result.get("id", None),
+            "url": result.get("url", None),
+            "source_url": source_url,
+            # The pushed file was overwritten by the response
+            "hash": local_entry["hash"] if local_entry else None,
+        }
+        await append_record(self.org_path, settings.PUSH_LOG_FILENAME, record)
+        self.records[record["path"]] = record
+
+    async def is_completed(self, path: Path) -> bool:
+        """Checks whether the operation of the path was completed and the file did not change since then."""
+        record = self.records.get(str(path), None)
+        if not record or not record["hash"]:
+            return False
+        local_index = await get_local_index(self.org_path / path)
+        local_entry = await local_index.get_entry(self.org_path / path)
+        return bool(local_entry) and local_entry["hash"] == record["hash"]
+
+    def get_replaced_urls(self) -> dict[str, str]:
+        """URLs of objects created before the push was interrupted, their dependents still reference the local ones."""
+        return {
+            record["source_url"]: record["url"]
+            for record in self.records.values()
+            if record["source_url"]
+            and record["url"]
+            and record["source_url"] != record["url"]
+        }
+
+    async def finish(self):
+        await remove_state(self.org_path, settings.PUSH_LOG_FILENAME)
@@ -4,8 +4,14 @@ from anyio import Path
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
+from project_rossum_deploy.commands.upload.scheduler import (
+    determine_object_type,
+    replace_references,
+)
 from project_rossum_deploy.common.modified_at import (
+    RemoteTimestamps,
     check_modified_timestamp,
+    create_minimal_payload,
 )
 from project_rossum_deploy.common.determine_path import determine_object_type_from_url
 from project_rossum_deploy.common.read_write import (
@@ -25,6 +31,8 @@ async def update_object(
     path: Path = None,
     errors: list = None,
     force=False,
+    replaced_urls: dict = {},
+    remote_timestamps: RemoteTimestamps = None,
 ):
     try:
         object = await read_json(path)
@@ -36,9 +44,10 @@ async def update_object(
             raise Exception("Missing object URL")
 
         resource = determine_object_type_from_url(url)
+        replace_references(resource, object, replaced_urls)
 
         local_remote_timestamp_synced = await check_modified_timestamp(
-            client, resource, id, object
+            client, resource, id, object, remote_timestamps
         )
         if not force and not local_remote_timestamp_synced:
             display_error(create_mismatch_warning(resource, id))
@@ -49,7 +58,12 @@ async def update_object(
         if resource == Resource.Queue:
             object.pop("inbox", None)
 
-        result = await client._http_client.update(resource, id, object)
+        # Only attributes that differ from the prefetched remote version are sent
+        result = await client._http_client.update(
+            resource,
+            id,
+            create_minimal_payload(object, resource, id, remote_timestamps),
+        )
 
         # Just to update the timestamp
         await write_json(
@@ -69,20 +83,19 @@ async def update_object(
 
 
 async def create_object(
-    path: Path, client: ElisAPIClient, errors: list = None, force=False
+    path: Path,
+    client: ElisAPIClient,
+    errors: list = None,
+    force=False,
+    replaced_urls: dict = {},
 ):
     try:
         object = await read_json(path)
         object["id"] = None
-        resource = determine_object_type_from_path(path)
-
-        local_remote_timestamp_synced = await check_modified_timestamp(
-            client, resource, id, object
-        )
-        if not force and not local_remote_timestamp_synced:
-            display_error(create_mismatch_warning(resource, id))
-            return
+        resource = determine_object_type(path, object)
+        replace_references(resource, object, replaced_urls)
 
+        # There is no remote version of a new object to compare the timestamp with
         result = await client._http_client.create(resource, object)
 
         # Just to update the timestamp
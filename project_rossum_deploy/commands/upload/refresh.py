@@ -0,0 +1,107 @@
+from anyio import Path
+from rossum_api import ElisAPIClient
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.upload.scheduler import determine_object_type
+from project_rossum_deploy.common.fetch import fetch_objects_by_ids
+from project_rossum_deploy.common.local_index import (
+    get_local_index,
+    save_local_indexes,
+)
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
+from project_rossum_deploy.common.read_write import write_json
+from project_rossum_deploy.utils.consts import settings
+from project_rossum_deploy.utils.functions import (
+    extract_id_from_url,
+    templatize_name_id,
+)
+
+# Attributes whose change is reflected by Rossum in the referenced objects (e.g., hook.queues <-> queue.hooks)
+REVERSE_REFERENCES = {
+    Resource.Hook: [("queues", Resource.Queue)],
+    Resource.Queue: [
+        ("hooks", Resource.Hook),
+        ("webhooks", Resource.Hook),
+        ("schema", Resource.Schema),
+        ("inbox", Resource.Inbox),
+    ],
+    Resource.Inbox: [("queues", Resource.Queue)],
+}
+
+
+def get_reference_urls(object: dict, attribute: str) -> set[str]:
+    value = object.get(attribute, None)
+    if isinstance(value, str):
+        return {value}
+    elif isinstance(value, list):
+        return set(item for item in value if isinstance(item, str))
+    return set()
+
+
+def is_stored_under_name(path: Path, object: dict) -> bool:
+    """Checks whether the object's (possibly renamed) name and ID still match its local path."""
+    if path.stem in ("organization", "inbox"):
+        return True
+    stored_name = path.parent.name if path.stem in ("queue", "workspace") else path.stem
+    return stored_name == templatize_name_id(object["name"], object["id"])
+
+
+async def refresh_pushed_objects(
+    client: ElisAPIClient,
+    org_path: Path,
+    destination: str,
+    pushed_objects: list[tuple[Path, dict, dict]],
+    remote_timestamps: RemoteTimestamps,
+) -> bool:
+    """Pulls only the objects whose attributes were changed by Rossum because of the pushed objects (pushed objects were already written back).
+
+    Args:
+        pushed_objects: (path, local object before the push, object returned by Rossum)
+
+    Returns:
+        bool: False if a full pull is needed (e.g., objects were created, renamed or moved)
+    """
+    referenced_ids = {}
+    for path, local_object, result in pushed_objects:
+        resource = determine_object_type(path, result)
+        previous_object = remote_timestamps.get_object(
+            resource, local_object.get("id", None)
+        )
+        if (
+            not previous_object
+            or result.get("id", None) != local_object.get("id", None)
+            or not is_stored_under_name(path, result)
+            or result.get("workspace", None) != previous_object.get("workspace", None)
+        ):
+            return False
+
+        for attribute, referenced_resource in REVERSE_REFERENCES.get(resource, []):
+            for url in get_reference_urls(
+                previous_object, attribute
+            ) ^ get_reference_urls(result, attribute):
+                referenced_ids.setdefault(referenced_resource, set()).add(
+                    extract_id_from_url(url)
+                )
+
+    # Objects of both destinations are in the same organization
+    directory = None if settings.IS_PROJECT_IN_SAME_ORG else org_path / destination
+    local_index = await get_local_index(org_path / destination)
+    referenced_objects = []
+    for resource, ids in referenced_ids.items():
+        try:
+            objects = await fetch_objects_by_ids(client, resource, list(ids))
+        except Exception:
+            return False
+        for id in ids:
+            path = await local_index.find_object_path(
+                id, type=resource.value, directory=directory
+            )
+            if not path or id not in objects:
+                return False
+            referenced_objects.append((path, resource, objects[id]))
+
+    for path, resource, object in referenced_objects:
+        await write_json(path, object, resource, log_message=f"Pulled {path}")
+
+    await save_local_indexes()
+    return True
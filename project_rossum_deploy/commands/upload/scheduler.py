@@ -0,0 +1,113 @@
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.common.determine_path import (
+    determine_object_type_from_path,
+    determine_object_type_from_url,
+)
+from project_rossum_deploy.common.read_write import read_json
+from project_rossum_deploy.utils.consts import GIT_CHARACTERS, display_warning
+
+# Attributes referencing objects that have to exist (be created/updated) before the object itself is pushed
+DEPENDENCY_ATTRIBUTES = {
+    Resource.Queue: ["schema", "workspace", "hooks", "webhooks"],
+    Resource.Inbox: ["queues"],
+    Resource.Hook: ["run_after"],
+}
+
+
+class DuplicateUrlException(Exception): ...
+
+
+def determine_object_type(path: Path, object: dict) -> Resource:
+    if url := object.get("url", None):
+        return determine_object_type_from_url(url)
+    # Inboxes are stored in queue directories (queues/<queue>/inbox.json)
+    if path.name == "inbox.json":
+        return Resource.Inbox
+    return determine_object_type_from_path(path)
+
+
+def find_references(resource: Resource, object: dict) -> list[str]:
+    references = []
+    for attribute in DEPENDENCY_ATTRIBUTES.get(resource, []):
+        value = object.get(attribute, None)
+        if isinstance(value, str):
+            references.append(value)
+        elif isinstance(value, list):
+            references.extend(item for item in value if isinstance(item, str))
+    return references
+
+
+def replace_references(resource: Resource, object: dict, replaced_urls: dict):
+    """Points the object to the URLs of objects that were created during the same push."""
+    for attribute in DEPENDENCY_ATTRIBUTES.get(resource, []):
+        value = object.get(attribute, None)
+        if isinstance(value, str):
+            object[attribute] = replaced_urls.get(value, value)
+        elif isinstance(value, list):
+            object[attribute] = [replaced_urls.get(item, item) for item in value]
+
+
+def assign_urls(
+    changes: list[tuple[str, Path]], objects: dict[Path, dict]
+) -> dict[Path, str]:
+    """Decides which pushed file stands for each URL, so that references to the URL wait for (and point to) that file.
+
+    Created files with the URL of another pushed file are copies, they get a new URL in Rossum and do not stand for the copied one.
+    Several updated files with the same URL are refused, it is not clear which version should be pushed.
+    """
+    paths_by_url = {}
+    for op, path in changes:
+        if url := objects.get(path, {}).get("url", None):
+            paths_by_url.setdefault(url, []).append((op, path))
+
+    urls = {path: None for path in objects}
+    for url, url_changes in paths_by_url.items():
+        updated_paths = [
+            path
+            for op, path in url_changes
+            if op not in (GIT_CHARACTERS.CREATED, GIT_CHARACTERS.CREATED_STAGED)
+        ]
+        if len(updated_paths) > 1:
+            duplicates = ", ".join(f'"{path}"' for path in updated_paths)
+            raise DuplicateUrlException(
+                f"Files {duplicates} have the same URL {url}, keep only one of them."
+            )
+        owner = updated_paths[0] if updated_paths else url_changes[0][1]
+        urls[owner] = url
+        for _, path in url_changes:
+            if path != owner:
+                display_warning(
+                    f'"{path}" has the same URL as "{owner}". It is pushed as a new object and references to {url} keep pointing to "{owner}".'
+                )
+    return urls
+
+
+async def build_push_graph(
+    org_path: Path, changes: list[tuple[str, Path]]
+) -> tuple[dict[Path, dict], dict[Path, str], dict[Path, set[Path]]]:
+    """Returns the local version of each pushed object, the URL each object stands for and the objects (paths) each object depends on.
+
+    Only references to objects pushed in the same run are dependencies, the rest already exists in Rossum.
+    """
+    objects, references = {}, {}
+    for _, path in changes:
+        try:
+            object = await read_json(org_path / path)
+            resource = determine_object_type(path, object)
+        except Exception:
+            # Files that cannot be read fail when they are pushed, they just do not wait for anything
+            references[path] = []
+            continue
+        objects[path] = object
+        references[path] = find_references(resource, object)
+
+    urls = assign_urls(changes, objects)
+    paths_by_url = {url: path for path, url in urls.items() if url}
+    dependencies = {
+        path: set(paths_by_url[url] for url in path_references if url in paths_by_url)
+        - {path}
+        for path, path_references in references.items()
+    }
+    return objects, urls, dependencies
@@ -1,3 +1,4 @@
+import functools
 import subprocess
 from anyio import Path
 from rich import print
@@ -6,6 +7,7 @@ from rich.progress import Progress
 
 import click
 from rossum_api import ElisAPIClient
+from rossum_api.api_client import Resource
 
 from project_rossum_deploy.commands.download.download import download_project
 from project_rossum_deploy.commands.upload.dependencies import (
@@ -13,21 +15,37 @@ from project_rossum_deploy.commands.upload.dependencies import (
     merge_formula_changes,
     merge_hook_changes,
 )
+from project_rossum_deploy.commands.upload.journal import (
+    PushLog,
+    filter_already_pushed_changes,
+    find_changes_since_last_push,
+    record_successful_push,
+)
+from project_rossum_deploy.commands.upload.refresh import refresh_pushed_objects
+from project_rossum_deploy.commands.upload.scheduler import (
+    build_push_graph,
+    determine_object_type,
+)
 from project_rossum_deploy.commands.upload.operations import (
     create_object,
     update_object,
 )
 from project_rossum_deploy.common.client import create_and_validate_client
-from project_rossum_deploy.common.git import get_changed_file_paths
+from project_rossum_deploy.common.concurrency import (
+    SkippedOperationException,
+    run_dependency_graph,
+)
+from project_rossum_deploy.common.git import read_git_changes
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
 from project_rossum_deploy.utils.consts import (
     GIT_CHARACTERS,
+    create_mismatch_warning,
     display_error,
     settings,
 )
 from project_rossum_deploy.utils.functions import (
     coro,
     find_all_object_paths,
-    gather_with_concurrency,
     make_request_with_progress,
 )
 
@@ -78,9 +96,16 @@ Only source files are taken into account by default.
     default="Pushed changes to remote",
     help="Commit message for pulling.",
 )
+@click.option(
+    "--resume",
+    "-r",
+    default=False,
+    is_flag=True,
+    help="Continues a push that failed halfway, operations it completed are not sent again.",
+)
 @coro
 async def upload_project_wrapper(
-    destination, all, force, indexed_only, commit, message
+    destination, all, force, indexed_only, commit, message, resume
 ):
     # To be able to run the command progammatically without the CLI decorators
     await upload_project(
@@ -90,6 +115,7 @@ async def upload_project_wrapper(
         indexed_only=indexed_only,
         commit=commit,
         commit_message=message,
+        resume=resume,
     )
 
 
@@ -101,6 +127,7 @@ async def upload_project(
     indexed_only: bool = False,
     commit: bool = False,
     commit_message: str = "",
+    resume: bool = False,
 ):
     try:
         org_path = Path("./")
@@ -108,88 +135,185 @@ async def upload_project(
         if not client:
             client = await create_and_validate_client(destination)
 
-        changes = get_changed_file_paths(destination, indexed_only=indexed_only)
+        push_log = await PushLog.start(org_path, destination, resume=resume)
+        is_resumed = bool(push_log.records)
+
+        # Both destinations are read at once, so that the pull after the push does not have to call git again
+        git_changes = read_git_changes()
+        # Commits made since the last push are pushed as well, not only uncommitted changes
+        changes = await find_changes_since_last_push(
+            org_path, destination, git_changes, indexed_only=indexed_only
+        )
 
         if changes:
             changes = await merge_hook_changes(changes, org_path)
             # changes = await evaluate_delete_dependencies(changes, org_path)
             changes = await merge_formula_changes(changes)
+            changes = await filter_already_pushed_changes(
+                org_path, destination, changes
+            )
             changes = await evaluate_create_dependencies(changes, org_path, client)
 
         if upload_all:
-            await include_unmodified_files(org_path / destination, changes)
+            changes = await include_unmodified_files(org_path / destination, changes)
 
-        requests = []
         errors = []
 
         if not changes:
             print(Panel(f"No changes to {settings.UPLOAD_COMMAND_NAME}."))
             return
 
+        operations = {}
         for change in changes:
             op, path = change
             match op:
-                case GIT_CHARACTERS.CREATED:
-                    requests.append(
-                        create_object(
-                            path=org_path / path,
-                            client=client,
-                            errors=errors,
-                            force=force,
-                        )
-                    )
-                case GIT_CHARACTERS.CREATED_STAGED:
-                    requests.append(
-                        create_object(
-                            path=org_path / path,
-                            client=client,
-                            errors=errors,
-                            force=force,
-                        )
-                    )
+                case GIT_CHARACTERS.CREATED | GIT_CHARACTERS.CREATED_STAGED:
+                    operations[path] = (op, create_object)
                 # case GIT_CHARACTERS.DELETED:
                 #    requests.append(delete_object(org_path / path, client, errors))
                 case GIT_CHARACTERS.UPDATED | GIT_CHARACTERS.PARTIALLY_UPADTED:
-                    if upload_all:
-                        requests.append(
-                            update_create_object(
-                                client=client,
-                                path=org_path / path,
-                                errors=errors,
-                                force=force,
-                            )
-                        )
-                    else:
-                        requests.append(
-                            update_object(
-                                client=client,
-                                path=org_path / path,
-                                errors=errors,
-                                force=force,
-                            )
-                        )
+                    operations[path] = (
+                        op,
+                        update_create_object if upload_all else update_object,
+                    )
                 case _:
                     display_error(f'Unrecognized operation "{op}" for "{path}".')
                     errors.append({"op": op, "path": path})
 
+        # Operations completed by the interrupted push are not sent again
+        resumed_paths = [
+            path for path in operations if await push_log.is_completed(path)
+        ]
+        for path in resumed_paths:
+            del operations[path]
+
+        # Objects are pushed after the objects they reference (e.g., a new queue after its new schema)
+        objects, urls, dependencies = await build_push_graph(
+            org_path, [(op, path) for path, (op, _) in operations.items()]
+        )
+
+        updated_objects = [
+            (path, determine_object_type(path, objects[path]), objects[path])
+            for path, (op, _) in operations.items()
+            if op in (GIT_CHARACTERS.UPDATED, GIT_CHARACTERS.PARTIALLY_UPADTED)
+            and path in objects
+            and objects[path].get("id", None)
+            and objects[path].get("url", None)
+        ]
+
+        # All conflicts are reported before anything is pushed
+        local_objects = [(resource, object) for _, resource, object in updated_objects]
+        remote_timestamps = await fetch_remote_timestamps(client, local_objects)
+        conflicts = remote_timestamps.find_conflicts(local_objects)
+        if conflicts and not force:
+            for resource, object in conflicts:
+                display_error(create_mismatch_warning(resource, object["id"]))
+            display_error(
+                f"Nothing was pushed because {len(conflicts)} object(s) have a newer version in Rossum."
+            )
+            return
+
+        # Objects with the same content as in Rossum are not sent at all (e.g., most files with --all)
+        identical_paths = set(
+            path
+            for path, resource, object in updated_objects
+            if remote_timestamps.is_identical(resource, object)
+        )
+        for path in identical_paths:
+            del operations[path]
+        if identical_paths:
+            print(
+                Panel(
+                    f"Skipped {len(identical_paths)} object(s) that are identical to Rossum."
+                )
+            )
+
+        # Only updates take the prefetched versions, created objects do not exist in Rossum yet
+        for path, _, _ in updated_objects:
+            if path in identical_paths:
+                continue
+            op, operation = operations[path]
+            operations[path] = (
+                op,
+                functools.partial(
+                    operation,
+                    remote_timestamps=remote_timestamps,
+                ),
+            )
+
+        resumed_urls = push_log.get_replaced_urls()
         with Progress() as progress:
-            task = progress.add_task("Pushing changes to Rossum.", total=len(requests))
-            await gather_with_concurrency(
-                5,
-                *map(lambda r: make_request_with_progress(r, progress, task), requests),
+            task = progress.add_task(
+                "Pushing changes to Rossum.", total=len(operations)
             )
+            outcomes = await run_dependency_graph(
+                {
+                    path: create_push_operation(
+                        operation=operation,
+                        op=op,
+                        client=client,
+                        org_path=org_path,
+                        path=path,
+                        errors=errors,
+                        force=force,
+                        urls=urls,
+                        resumed_urls=resumed_urls,
+                        push_log=push_log,
+                        progress=progress,
+                        task=task,
+                    )
+                    for path, (op, operation) in operations.items()
+                },
+                dependencies,
+            )
+
+            for path, outcome in outcomes.items():
+                if isinstance(outcome, SkippedOperationException):
+                    display_error(f'Skipped pushing "{path}" because {outcome}')
+                    errors.append({"op": operations[path][0], "path": path})
+                    progress.update(task, advance=1)
 
         if len(errors):
             errors_listed = "\n".join(list(map(lambda x: str(x["path"]), errors)))
             display_error(
-                f"Errors happened during {settings.UPLOAD_COMMAND_NAME} for the following paths. Do not run {settings.DOWNLOAD_COMMAND_NAME} or you might lose changes in these files:\n{errors_listed}",
+                f"Errors happened during {settings.UPLOAD_COMMAND_NAME} for the following paths. Do not run {settings.DOWNLOAD_COMMAND_NAME} or you might lose changes in these files:\n{errors_listed}\n\nRun '{settings.UPLOAD_COMMAND_NAME} --resume' to continue without sending the completed operations again.",
             )
             return
         else:
-            await download_project(destination=destination, client=client)
+            # Pushed objects were already written back, only objects changed as their side effect are pulled
+            # Objects pushed by the interrupted push might have changed other objects as well
+            is_refreshed = not is_resumed and await refresh_pushed_objects(
+                client=client,
+                org_path=org_path,
+                destination=destination,
+                pushed_objects=[
+                    (org_path / path, objects[path], outcome)
+                    for path, outcome in outcomes.items()
+                    if path in objects and isinstance(outcome, dict)
+                ],
+                remote_timestamps=remote_timestamps,
+            )
+            if not is_refreshed:
+                await download_project(
+                    destination=destination, client=client, git_changes=git_changes
+                )
             if commit:
                 subprocess.run(["git", "add", "."])
                 subprocess.run(["git", "commit", "-m", commit_message])
+
+            pushed_paths = set(path for _, path in changes)
+            await record_successful_push(
+                org_path,
+                destination,
+                unpushed_paths=[
+                    path
+                    for _, path in git_changes.get_changed_file_paths(destination)
+                    if path not in pushed_paths
+                ]
+                if indexed_only
+                else [],
+            )
+            await push_log.finish()
             print(
                 Panel(
                     f"Finished {settings.UPLOAD_COMMAND_NAME}.{ ' Please commit the changes before running this command again.' if not commit else ''}"
@@ -200,20 +324,100 @@ async def upload_project(
         display_error(f"Error during project {settings.UPLOAD_COMMAND_NAME}: {e}", e)
 
 
-async def update_create_object(client, path, errors, force):
-    result = await update_object(client=client, path=path, errors=errors, force=force)
+async def fetch_remote_timestamps(
+    client: ElisAPIClient, local_objects: list[tuple[Resource, dict]]
+) -> RemoteTimestamps:
+    ids_by_resource = {}
+    for resource, object in local_objects:
+        ids_by_resource.setdefault(resource, set()).add(object["id"])
+    return await RemoteTimestamps.fetch(client, ids_by_resource)
+
+
+def create_push_operation(
+    operation,
+    op,
+    client,
+    org_path,
+    path,
+    errors,
+    force,
+    urls,
+    resumed_urls,
+    push_log: PushLog,
+    progress,
+    task,
+):
+    async def push(dependency_results: dict):
+        # References to objects created in this push must point to their new URLs
+        replaced_urls = {
+            **resumed_urls,
+            **{
+                urls[dependency]: result["url"]
+                for dependency, result in dependency_results.items()
+                if urls.get(dependency, None) and result.get("url", None)
+            },
+        }
+        result = await make_request_with_progress(
+            operation(
+                client=client,
+                path=org_path / path,
+                errors=errors,
+                force=force,
+                replaced_urls=replaced_urls,
+            ),
+            progress,
+            task,
+        )
+        # Objects depending on this one are not pushed, the error was already reported
+        if not isinstance(result, dict):
+            raise Exception(f'pushing "{path}" failed')
+
+        await push_log.record(op, path, urls.get(path, None), result)
+        return result
+
+    return push
+
+
+async def update_create_object(
+    client,
+    path,
+    errors,
+    force,
+    replaced_urls={},
+    remote_timestamps=None,
+):
+    result = await update_object(
+        client=client,
+        path=path,
+        errors=errors,
+        force=force,
+        replaced_urls=replaced_urls,
+        remote_timestamps=remote_timestamps,
+    )
 
     if not result:
         print(f'Recreating object with path "{path}".')
-        await create_object(path=path, client=client, errors=errors, force=force)
+        return await create_object(
+            path=path,
+            client=client,
+            errors=errors,
+            force=force,
+            replaced_urls=replaced_urls,
+        )
+    return result
 
 
 async def include_unmodified_files(
-    destination_path: Path, changes: list[tuple[str, Path]]
-):
+    destination_path: Path, changes: tuple[tuple[str, Path], ...]
+) -> tuple[tuple[str, Path], ...]:
     all_files = await find_all_object_paths(destination_path)
 
     changes_paths = set(map(lambda x: x[1], changes))
-    for file_path in all_files:
-        if file_path not in changes_paths:
-            changes.append((GIT_CHARACTERS.UPDATED.value, file_path))
+    return (
+        *changes,
+        *[
+            (GIT_CHARACTERS.UPDATED.value, file_path)
+            for file_path in all_files
+            if file_path not in changes_paths
+        ],
+    )
@@ -1,3 +1,4 @@
+from functools import lru_cache
 import json
 import re
 import subprocess
@@ -10,14 +11,13 @@ from anyio import Path
 from rossum_api import ElisAPIClient
 
 from project_rossum_deploy.common.mapping import extract_flat_lookup_table
-from project_rossum_deploy.common.read_write import read_json
+from project_rossum_deploy.common.local_index import get_local_index
 from project_rossum_deploy.utils.consts import (
     ATTRIBUTE_OVERRIDE_SOURCE_REFERENCE_KEYWORD,
     ATTRIBUTE_OVERRIDE_TARGET_REFERENCE_KEYWORD,
 )
 from project_rossum_deploy.utils.functions import (
     flatten,
-    find_all_object_paths,
 )
 from project_rossum_deploy.commands.migrate.helpers import (
     traverse_mapping,
@@ -27,6 +27,9 @@ from project_rossum_deploy.utils.consts import (
     display_error,
 )
 
+# Whole numbers, not digits that are a part of a longer word (e.g., abc123)
+ID_REGEX = re.compile(r"(?<!\w)\d+(?!\w)")
+
 
 def convert_reference_to_int_id(value):
     """Converts value into int if necessary and returns the original type - supports int, str and url (ie. https://elis.rossum.ai/api/v1/queues/156)"""
@@ -143,6 +146,8 @@ def override_attributes_v2(
         )
 
 
+# The same override keys are used for many targets, each of them is parsed only once
+@lru_cache(maxsize=None)
 def parse_parent_and_key(key_query: str):
     try:
         parent, key = ".".join(key_query.split(".")[:-1]), key_query.split(".")[-1]
@@ -153,12 +158,17 @@ def parse_parent_and_key(key_query: str):
     return parent, key
 
 
+@lru_cache(maxsize=None)
+def compile_query(query: str) -> jmespath.parser.ParsedResult:
+    return jmespath.compile(query)
+
+
 def perform_search(parent: str, object: dict):
     # The query targets a key of the top-most object, no need to search
     if not parent:
         return [object]
 
-    search = jmespath.search(parent, object)
+    search = compile_query(parent).search(object)
     if isinstance(search, list):
         search = flatten(search)
     else:
@@ -177,40 +187,36 @@ async def replace_ids_in_settings(
     object_index: int,
     num_targets: int,
 ):
-    stringified_dict = json.dumps(object_settings)
-    for source_id, target_ids in lookup_table.items():
-        source_id_regex = re.compile(f"(?<!\\w)({source_id})(?!\\w)")
-        if not re.search(source_id_regex, stringified_dict):
-            continue
+    """Replaces all source IDs in the settings in a single pass over the stringified settings.
+    Only whole numbers are replaced (e.g., not 123 in 1234 or abc123).
+    """
+    skipped_source_ids = set()
+
+    def replace_id(match: re.Match) -> str:
+        source_id = int(match[0])
+        # Numbers with leading zeros are not IDs
+        if str(source_id) != match[0] or source_id not in lookup_table:
+            return match[0]
+
+        target_ids = lookup_table[source_id]
+        # N:N objects -> objects are referenced in pairs
+        if num_targets == len(target_ids):
+            return str(target_ids[object_index])
+        # N:1 objects -> everything should be mapped to the first target ID
+        elif len(target_ids) == 1:
+            return str(target_ids[0])
 
-        if len(target_ids) != 1 and num_targets != len(target_ids):
+        if source_id not in skipped_source_ids:
+            skipped_source_ids.add(source_id)
             print(
                 Panel(
                     f"Could not override source '{source_id}' in settings of '{object_id}'. There are multiple target IDs. Please do the attribute_override explicitly.",
                     style="yellow",
                 ),
             )
-            continue
-
-        # Using lambdas for sub() because of quotes inside strings
-        # N:N objects -> objects are referenced in pairs
-        elif num_targets == len(target_ids):
-            stringified_dict = re.sub(
-                source_id_regex,
-                lambda m: str(target_ids[object_index])
-                if m[0] == str(source_id)
-                else m[0],
-                stringified_dict,
-            )
-        # N:1 objects -> everything should be mapped to the first target ID
-        else:
-            stringified_dict = re.sub(
-                source_id_regex,
-                lambda m: str(target_ids[0]) if m[0] == str(source_id) else m[0],
-                stringified_dict,
-            )
+        return match[0]
 
-    return json.loads(stringified_dict)
+    return json.loads(ID_REGEX.sub(replace_id, json.dumps(object_settings)))
 
 
 async def validate_override_migrated_objects_attributes(
@@ -218,27 +224,37 @@ async def validate_override_migrated_objects_attributes(
 ) -> bool:
     try:
         print(Panel("Validating attribute_override."))
-        source_paths = await find_all_object_paths(base_path)
-        source_objects = [await read_json(path) for path in source_paths]
+        # Only objects that have a target have to be read
+        local_index = await get_local_index(base_path)
+        source_objects = await local_index.read_objects(
+            base_path,
+            ids={
+                mapping_object["id"]
+                for mapping_object in traverse_mapping(mapping)
+                if not mapping_object.get("ignore", None)
+                and mapping_object.get("targets", [])
+            },
+        )
+        source_objects_by_id = {}
+        for source_object in source_objects:
+            source_objects_by_id.setdefault(source_object["id"], source_object)
+        # The same lookup table as override_attributes_v2 uses for dry runs, created once for all targets
+        dryrun_lookup_table = {k: ["dummy"] for k in extract_flat_lookup_table(mapping)}
+
         for mapping_object in traverse_mapping(mapping):
             if mapping_object.get("ignore", None) or not (
                 targets := mapping_object.get("targets", [])
             ):
                 continue
 
-            source_object = None
-            for source_candidate in source_objects:
-                if source_candidate["id"] == mapping_object["id"]:
-                    source_object = source_candidate
-                    break
+            source_object = source_objects_by_id.get(mapping_object["id"], None)
 
             for target in targets:
                 source_copy = deepcopy(source_object)
                 override_attributes_v2(
-                    lookup_table=extract_flat_lookup_table(mapping),
+                    lookup_table=dryrun_lookup_table,
                     target_submapping=target,
                     object=source_copy,
-                    is_dryrun=True,
                 )
 
         print(Panel("Attribute override dry-run found no errors."))
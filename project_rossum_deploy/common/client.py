@@ -1,7 +1,14 @@
+import asyncio
 import click
+import httpx
 from rossum_api import ElisAPIClient
 
-from project_rossum_deploy.utils.consts import settings, validate_token
+from project_rossum_deploy.common.concurrency import AdaptiveLimiter, AdaptiveTransport
+from project_rossum_deploy.utils.consts import display_warning, settings, validate_token
+
+# Validated clients are shared by all commands running in the same process (e.g., push followed by pull)
+# The key is (api_url, token, username, password), the value is the event loop the client was created in and the client
+_clients: dict[tuple, tuple[asyncio.AbstractEventLoop, ElisAPIClient]] = {}
 
 
 async def create_and_validate_client(
@@ -13,42 +20,110 @@ async def create_and_validate_client(
         if not settings.SOURCE_API_BASE:
             raise click.ClickException(f"No base URL provided for {destination}.")
 
-        if settings.SOURCE_TOKEN and not settings.SOURCE_PASSWORD:
-            validate_token(settings.SOURCE_API_BASE, settings.SOURCE_TOKEN, "source")
-
-        try:
-            client = ElisAPIClient(
-                base_url=settings.SOURCE_API_URL,
-                token=settings.SOURCE_TOKEN,
-                username=settings.SOURCE_USERNAME,
-                password=settings.SOURCE_PASSWORD,
-            )
-            await client.request("get", "auth/user")
-            return client
-        except Exception:
-            raise click.ClickException(f'Invalid credentials for "{destination}".')
+        return await get_or_create_client(destination, "source")
 
     elif destination == settings.TARGET_DIRNAME and not settings.IS_PROJECT_IN_SAME_ORG:
         if not settings.TARGET_API_URL:
             raise click.ClickException(f"No base URL provided for {destination}.")
 
-        if settings.TARGET_TOKEN and not settings.TARGET_PASSWORD:
-            validate_token(settings.TARGET_API_BASE, settings.TARGET_TOKEN, "target")
+        return await get_or_create_client(destination, "target")
+
+    else:
+        raise click.ClickException(f'Unrecognized destination "{destination}".')
+
+
+def get_credentials(credentials_key: str) -> tuple[str, str, str, str, str]:
+    if credentials_key == "source":
+        return (
+            settings.SOURCE_API_BASE,
+            settings.SOURCE_API_URL,
+            settings.SOURCE_TOKEN,
+            settings.SOURCE_USERNAME,
+            settings.SOURCE_PASSWORD,
+        )
+    return (
+        settings.TARGET_API_BASE,
+        settings.TARGET_API_URL,
+        settings.TARGET_TOKEN,
+        settings.TARGET_USERNAME,
+        settings.TARGET_PASSWORD,
+    )
+
 
+async def get_or_create_client(destination: str, credentials_key: str) -> ElisAPIClient:
+    """Returns an already validated client for the same credentials or creates (and validates) a new one."""
+    loop = asyncio.get_running_loop()
+    api_base, api_url, token, username, password = get_credentials(credentials_key)
+
+    cached_loop, cached_client = _clients.get(
+        (api_url, token, username, password), (None, None)
+    )
+    # httpx connections cannot be reused across event loops (e.g., multiple asyncio.run() calls in tests)
+    if cached_client and cached_loop is loop:
+        return cached_client
+
+    if token and not password:
+        validate_token(api_base, token, credentials_key)
+        # The user might have provided a new token
+        api_base, api_url, token, username, password = get_credentials(credentials_key)
+
+    try:
+        client = ElisAPIClient(
+            base_url=api_url,
+            token=token,
+            username=username,
+            password=password,
+        )
+        client._http_client.client = create_http_client(
+            timeout=client._http_client.client.timeout,
+            max_concurrency=settings.SOURCE_MAX_CONCURRENCY
+            if credentials_key == "source"
+            else settings.TARGET_MAX_CONCURRENCY,
+        )
+        await client.request("get", "auth/user")
+    except Exception:
+        raise click.ClickException(f'Invalid credentials for "{destination}".')
+
+    _clients[(api_url, token, username, password)] = (loop, client)
+    return client
+
+
+def create_http_client(
+    timeout: httpx.Timeout, max_concurrency: int = settings.MAX_CONCURRENCY
+) -> httpx.AsyncClient:
+    """Creates an HTTP client with a keep-alive connection pool (and optionally HTTP/2) that is shared by all requests of the Rossum client.
+    The number of in-flight requests adapts to how fast the API responds and whether it throttles the client.
+    """
+    http2 = settings.HTTP2
+    if http2:
         try:
-            client = ElisAPIClient(
-                base_url=settings.TARGET_API_URL,
-                token=settings.TARGET_TOKEN,
-                username=settings.TARGET_USERNAME,
-                password=settings.TARGET_PASSWORD,
+            import h2  # noqa: F401
+        except ImportError:
+            display_warning(
+                'HTTP/2 is enabled in credentials.json, but the "h2" package is not installed. Falling back to HTTP/1.1.'
             )
-            await client.request("get", "auth/user")
-            return client
-        except Exception:
-            raise click.ClickException(f'Invalid credentials for "{destination}".')
+            http2 = False
 
-    else:
-        raise click.ClickException(f'Unrecognized destination "{destination}".')
+    transport = httpx.AsyncHTTPTransport(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max(settings.HTTP_MAX_CONNECTIONS, max_concurrency),
+            max_keepalive_connections=max(
+                settings.HTTP_MAX_CONNECTIONS, max_concurrency
+            ),
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    limiter = AdaptiveLimiter(
+        initial_limit=settings.INITIAL_CONCURRENCY,
+        min_limit=settings.MIN_CONCURRENCY,
+        max_limit=max_concurrency,
+        slow_response_seconds=settings.SLOW_RESPONSE_SECONDS,
+    )
+
+    return httpx.AsyncClient(
+        timeout=timeout, transport=AdaptiveTransport(transport, limiter)
+    )
 
 
 if __name__ == "__main__":
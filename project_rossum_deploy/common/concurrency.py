@@ -0,0 +1,220 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import time
+from typing import Any, Awaitable, Callable, Hashable
+
+import httpx
+
+from project_rossum_deploy.utils.consts import settings
+
+THROTTLED_HTTP_CODES = (429, 503)
+
+
+class AdaptiveLimiter:
+    """Limits the number of in-flight requests sent to a single Rossum API (AIMD).
+
+    The limit grows by one after a full window of fast responses and is halved when the API throttles (429/503) or responds slowly.
+    A Retry-After header pauses all requests going through the limiter until the requested time.
+    """
+
+    # Requests that were already in flight report the same congestion, react to it only once per cooldown
+    DECREASE_COOLDOWN_SECONDS = 1.0
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        slow_response_seconds: float,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.slow_response_seconds = slow_response_seconds
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._fast_responses = 0
+        self._last_decrease = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    async def acquire(self):
+        while True:
+            if (delay := self.paused_until - time.monotonic()) > 0:
+                await asyncio.sleep(delay)
+            elif self.in_flight < self.limit:
+                self.in_flight += 1
+                return
+            else:
+                waiter = asyncio.get_running_loop().create_future()
+                self._waiters.append(waiter)
+                try:
+                    await waiter
+                finally:
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+
+    def release(
+        self, elapsed: float, status_code: int = None, retry_after: float = None
+    ):
+        self.in_flight -= 1
+
+        if retry_after:
+            self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+        if status_code in THROTTLED_HTTP_CODES or elapsed > self.slow_response_seconds:
+            self._decrease()
+        elif status_code is not None:
+            self._fast_responses += 1
+            # Additive increase - one more slot per window of fast responses
+            if self._fast_responses >= self.limit:
+                self._fast_responses = 0
+                self.limit = min(self.limit + 1, self.max_limit)
+
+        self._wake_waiters()
+
+    def _decrease(self):
+        now = time.monotonic()
+        self._fast_responses = 0
+        if now - self._last_decrease < self.DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        self.limit = max(self.limit // 2, self.min_limit)
+
+    def _wake_waiters(self):
+        free_slots = self.limit - self.in_flight
+        while free_slots > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free_slots -= 1
+
+
+def parse_retry_after(value: str) -> float:
+    """Returns the number of seconds to wait based on a Retry-After header (delay in seconds or an HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        ...
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
+class AdaptiveTransport(httpx.AsyncBaseTransport):
+    """Sends all requests of an HTTP client through an AdaptiveLimiter."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, limiter: AdaptiveLimiter):
+        self.transport = transport
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.limiter.acquire()
+        start = time.monotonic()
+        status_code, retry_after = None, None
+        try:
+            response = await self.transport.handle_async_request(request)
+            status_code = response.status_code
+            if status_code in THROTTLED_HTTP_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            return response
+        finally:
+            self.limiter.release(time.monotonic() - start, status_code, retry_after)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+async def gather_with_scheduler(*coros):
+    """Runs the coroutines concurrently and returns their results in order.
+
+    The number of in-flight requests is controlled by the AdaptiveLimiter of the client's transport,
+    this only caps the number of coroutines (reading files, preparing payloads) that run at once.
+    """
+    semaphore = asyncio.Semaphore(settings.MAX_SCHEDULED_OPERATIONS)
+
+    async def sem_coro(coro):
+        async with semaphore:
+            return await coro
+
+    return await asyncio.gather(*(sem_coro(c) for c in coros))
+
+
+class SkippedOperationException(Exception):
+    """The operation was not run because an operation it depends on failed."""
+
+
+def remove_dependency_cycles(
+    dependencies: dict[Hashable, set[Hashable]],
+) -> list[tuple[Hashable, Hashable]]:
+    """Removes dependencies that close a cycle (in place) and returns them."""
+    removed, visited, in_progress = [], set(), set()
+
+    def visit(key: Hashable):
+        visited.add(key)
+        in_progress.add(key)
+        for dependency in list(dependencies.get(key, set())):
+            if dependency in in_progress:
+                dependencies[key].discard(dependency)
+                removed.append((key, dependency))
+            elif dependency not in visited:
+                visit(dependency)
+        in_progress.discard(key)
+
+    for key in list(dependencies):
+        if key not in visited:
+            visit(key)
+    return removed
+
+
+async def run_dependency_graph(
+    operations: dict[Hashable, Callable[[dict], Awaitable]],
+    dependencies: dict[Hashable, set[Hashable]],
+) -> dict[Hashable, Any]:
+    """Runs each operation as soon as all operations it depends on have finished, independent operations run concurrently.
+
+    Every operation receives the results of its dependencies. An operation whose dependency failed is not run.
+    Dependencies on keys without an operation are ignored, cycles are broken (see remove_dependency_cycles).
+
+    Returns:
+        dict[Hashable, Any]: The result of each operation or the exception it raised (SkippedOperationException if it was not run)
+    """
+    dependencies = {
+        key: set(dependencies.get(key, set())).intersection(operations) - {key}
+        for key in operations
+    }
+    remove_dependency_cycles(dependencies)
+
+    semaphore = asyncio.Semaphore(settings.MAX_SCHEDULED_OPERATIONS)
+    loop = asyncio.get_running_loop()
+    futures = {key: loop.create_future() for key in operations}
+
+    async def run(key: Hashable):
+        # Waiting for dependencies does not take a slot, so that the prerequisites can always run
+        results = {}
+        for dependency in dependencies[key]:
+            try:
+                results[dependency] = await asyncio.shield(futures[dependency])
+            except Exception:
+                futures[key].set_exception(
+                    SkippedOperationException(f"{dependency} failed")
+                )
+                return
+
+        async with semaphore:
+            try:
+                futures[key].set_result(await operations[key](results))
+            except Exception as e:
+                futures[key].set_exception(e)
+
+    await asyncio.gather(*[run(key) for key in operations])
+
+    outcomes = {}
+    for key, future in futures.items():
+        outcomes[key] = future.exception() or future.result()
+    return outcomes
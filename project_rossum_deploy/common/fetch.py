@@ -0,0 +1,78 @@
+from rossum_api import ElisAPIClient
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.common.concurrency import gather_with_scheduler
+from project_rossum_deploy.utils.consts import settings
+
+# Attributes that must be present for an object to be considered complete (the same as a detail GET)
+REQUIRED_FIELDS = {
+    Resource.Organization: ["id", "url", "name"],
+    Resource.Workspace: ["id", "url", "name", "queues"],
+    Resource.Queue: ["id", "url", "name", "schema", "inbox", "hooks", "settings"],
+    Resource.Inbox: ["id", "url", "name", "email"],
+    Resource.Schema: ["id", "url", "name", "content"],
+    Resource.Hook: ["id", "url", "name", "config"],
+}
+
+# The list serializer omits some attributes of these objects (e.g., schema content), listing them by ID does not help
+PARTIAL_LIST_RESOURCES = {Resource.Schema}
+
+
+def is_complete_object(resource: Resource, object: dict) -> bool:
+    return all(field in object for field in REQUIRED_FIELDS.get(resource, ["id"]))
+
+
+def chunk_ids(ids: list[int], size: int = settings.BULK_FETCH_BATCH_SIZE):
+    for index in range(0, len(ids), size):
+        yield ids[index : index + size]
+
+
+async def fetch_objects_by_ids(
+    client: ElisAPIClient, resource: Resource, ids: list[int]
+) -> dict[int, dict]:
+    """Retrieves full objects in id-filtered list calls (?id=1,2,3), one request per batch.
+
+    Objects that are missing from the listing or miss a required attribute are fetched one by one,
+    objects whose listing is known to be partial are fetched one by one right away.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return {}
+
+    if resource in PARTIAL_LIST_RESOURCES:
+        return {
+            object["id"]: object
+            for object in await gather_with_scheduler(
+                *[client._http_client.fetch_one(resource, id) for id in ids]
+            )
+        }
+
+    async def fetch_batch(batch: list[int]):
+        return [
+            object
+            async for object in client._http_client.fetch_all(
+                resource,
+                id=",".join(map(str, batch)),
+                page_size=settings.BULK_FETCH_BATCH_SIZE,
+            )
+        ]
+
+    objects = {}
+    for batch in await gather_with_scheduler(
+        *[fetch_batch(batch) for batch in chunk_ids(ids)]
+    ):
+        for object in batch:
+            objects[object["id"]] = object
+
+    incomplete_ids = [
+        id
+        for id in ids
+        if id not in objects or not is_complete_object(resource, objects[id])
+    ]
+    fetched_one_by_one = await gather_with_scheduler(
+        *[client._http_client.fetch_one(resource, id) for id in incomplete_ids]
+    )
+    for object in fetched_one_by_one:
+        objects[object["id"]] = object
+
+    return objects
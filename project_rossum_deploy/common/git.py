@@ -1,40 +1,147 @@
+import os
 import subprocess
 
 from anyio import Path
 
-from project_rossum_deploy.utils.consts import GIT_CHARACTERS
+from project_rossum_deploy.utils.consts import GIT_CHARACTERS, settings
+
+
+class GitChanges:
+    """Changes in the working tree and index as reported by a single `git status` call.
+    The same object can be reused by commands running one after another (e.g., push followed by pull).
+    """
+
+    def __init__(self, entries: list[tuple[str, str, Path]]):
+        # (X = index status, Y = working tree status, path relative to the current directory)
+        self.entries = entries
+
+    def get_changed_file_paths(
+        self, destination: str, indexed_only=False
+    ) -> list[tuple[str, Path]]:
+        changes = []
+        for x, y, path in self.entries:
+            if path.parts[0] != destination:
+                continue
+
+            # Only staged modifications, not files modified (again) in the working tree
+            if indexed_only and (x != GIT_CHARACTERS.UPDATED or y != "."):
+                continue
+
+            # The same operation codes as in the short format (e.g., "M", "MM", "??")
+            op = (
+                GIT_CHARACTERS.CREATED.value
+                if x == "?"
+                else (x + y).replace(".", " ").strip(" ")
+            )
+            changes.append((op, path))
+        return changes
+
+
+def find_repository_prefix() -> str:
+    """Returns the path of the current directory relative to the repository root (git status -z paths are relative to the root)."""
+    current_dir = os.getcwd()
+    candidate = current_dir
+    while True:
+        if os.path.exists(os.path.join(candidate, ".git")):
+            return os.path.relpath(current_dir, candidate)
+        parent = os.path.dirname(candidate)
+        if parent == candidate:
+            return "."
+        candidate = parent
+
+
+def parse_porcelain_v2(output: str, prefix: str = ".") -> list[tuple[str, str, Path]]:
+    entries = []
+    records = iter(output.split("\0"))
+    for record in records:
+        if not record:
+            continue
+
+        match record[0]:
+            case "1":
+                fields = record.split(" ", 8)
+            case "2":
+                fields = record.split(" ", 9)
+                # Renamed/copied entries are followed by the original path
+                next(records, None)
+            case "u":
+                fields = record.split(" ", 10)
+            case "?":
+                fields = ["?", "??", record[2:]]
+            case _:
+                continue
+
+        xy, path = fields[1], fields[-1]
+        if prefix != ".":
+            path = os.path.relpath(path, prefix)
+        entries.append((xy[0], xy[1], Path(path)))
+    return entries
+
+
+def read_git_changes(
+    destinations: list[str] = [settings.SOURCE_DIRNAME, settings.TARGET_DIRNAME],
+) -> GitChanges:
+    # The -u flag is there to show each individual file (and not a subdir)
+    # Paths are NUL-separated and never quoted (e.g., 'unusual' non-ASCII characters), the config is passed only for this call
+    git_status = subprocess.run(
+        [
+            "git",
+            "-c",
+            "core.quotePath=false",
+            "status",
+            "--porcelain=v2",
+            "-z",
+            "-u",
+            "--",
+            *destinations,
+        ],
+        capture_output=True,
+    )
+    output = git_status.stdout.decode("utf-8", errors="surrogateescape")
+    return GitChanges(parse_porcelain_v2(output, find_repository_prefix()))
 
 
 def get_changed_file_paths(
     destination: str, indexed_only=False
 ) -> list[tuple[str, Path]]:
-    # The -s flag is there to show a simplified list of changes
-    # The -u flag is there to show each individual file (and not a subdir)
-    # The change in git config is because of potential 'unusual' (non-ASCII) characters in paths
-    subprocess.run(["git", "config", "core.quotePath", "false"])
-    git_destination_diff = subprocess.run(
-        ["git", "status", destination, "-s", "-u"],
-        capture_output=True,
-        text=True,
+    return read_git_changes([destination]).get_changed_file_paths(
+        destination, indexed_only=indexed_only
     )
-    subprocess.run(["git", "config", "core.quotePath", "true"])
 
-    changes_raw = git_destination_diff.stdout.split("\n")
-    changes = []
-    for change in changes_raw:
-        if not change:
-            continue
 
-        if indexed_only:
-            # "M" is staged modified, " M" is staged unmodified
-            first_char, op_path = tuple(change.split(" ", maxsplit=1))
-            if first_char != GIT_CHARACTERS.UPDATED:
-                continue
+def get_head_commit() -> str:
+    git_rev_parse = subprocess.run(
+        ["git", "rev-parse", "--verify", "-q", "HEAD"], capture_output=True, text=True
+    )
+    return git_rev_parse.stdout.strip() if git_rev_parse.returncode == 0 else None
 
-        change = change.strip(" ")
-        op, path = tuple(change.split(" ", maxsplit=1))
 
-        path = Path(path.strip().strip('"'))
+def read_committed_changes(
+    since_commit: str, destination: str
+) -> list[tuple[str, Path]]:
+    """Returns files of the destination changed in commits since the given one or None if the commit is not known (e.g., after a rebase)."""
+    # --relative makes the paths relative to the current directory (like the ones from git status)
+    git_diff = subprocess.run(
+        [
+            "git",
+            "diff",
+            "--name-status",
+            "-z",
+            "--no-renames",
+            "--relative",
+            since_commit,
+            "HEAD",
+            "--",
+            destination,
+        ],
+        capture_output=True,
+    )
+    if git_diff.returncode != 0:
+        return None
 
-        changes.append((op, path))
-    return changes
+    records = git_diff.stdout.decode("utf-8", errors="surrogateescape").split("\0")
+    return [
+        (op, Path(path))
+        for op, path in zip(records[0::2], records[1::2])
+        if op and path
+    ]
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+
+import anyio
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.common.local_state import read_state, write_state
+from project_rossum_deploy.utils.consts import settings
+
+LOCAL_INDEX_VERSION = 2
+
+# Indexes loaded by the commands running in the same process, keyed by the absolute project path
+_indexes: dict[str, "LocalIndex"] = {}
+
+
+def hash_content(content: bytes) -> str:
+    """The same hash as `git hash-object` computes, so that files can be compared with blobs stored in git."""
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def find_org_path(path: Path) -> Path:
+    """Returns the project directory (the one containing source/target) of an object path or None if it is not in a project."""
+    for candidate in [path, *path.parents]:
+        if candidate.name in (settings.SOURCE_DIRNAME, settings.TARGET_DIRNAME):
+            return candidate.parent
+    return None
+
+
+def determine_entry_type(url: str) -> str:
+    parts = url.split("/") if url else []
+    if len(parts) < 2 or parts[-2] not in set(resource.value for resource in Resource):
+        return None
+    return parts[-2]
+
+
+def create_entry(object: dict, content: bytes, stat: os.stat_result) -> dict:
+    url = object.get("url", "") or ""
+    type = determine_entry_type(url)
+    entry = {
+        "id": object.get("id", None),
+        "type": type,
+        "name": object.get("name", ""),
+        "url": url,
+        "modified_at": object.get("modified_at", ""),
+        "parent": None,
+        "hash": hash_content(content),
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+    }
+    # References mirrored by Rossum without updating modified_at are compared with Rossum (see should_write_object)
+    if type == Resource.Queue.value:
+        entry["parent"] = object.get("workspace", None)
+        entry["hooks"] = object.get("hooks", [])
+        entry["webhooks"] = object.get("webhooks", [])
+    elif type == Resource.Hook.value:
+        entry["queues"] = object.get("queues", [])
+    elif type == Resource.Inbox.value:
+        entry["parent"] = (object.get("queues", None) or [None])[0]
+    return entry
+
+
+def is_entry_valid(entry: dict, stat: os.stat_result) -> bool:
+    return (
+        entry is not None
+        and entry["mtime_ns"] == stat.st_mtime_ns
+        and entry["size"] == stat.st_size
+    )
+
+
+def scan_directory(directory: str, entries: dict[str, dict], org_path: str):
+    """Lists all .json files in the directory and reindexes those that changed since they were indexed (runs in a worker thread)."""
+    scanned = {}
+    for current_dir, subdirs, files in os.walk(directory):
+        subdirs[:] = [subdir for subdir in subdirs if subdir != ".git"]
+        for file in files:
+            if not file.endswith(".json"):
+                continue
+            path = os.path.join(current_dir, file)
+            key = os.path.relpath(path, org_path).replace(os.sep, "/")
+            try:
+                stat = os.stat(path)
+                entry = entries.get(key, None)
+                if not is_entry_valid(entry, stat):
+                    with open(path, "rb") as rf:
+                        content = rf.read()
+                    entry = create_entry(json.loads(content), content, stat)
+            except (OSError, ValueError):
+                continue
+            scanned[key] = entry
+    return scanned
+
+
+class LocalIndex:
+    """Persistent index of the local object files of a project (id, type, name, url, modified_at and content hash per path).
+
+    Entries are kept up to date by write_json and validated against the file's mtime and size,
+    so files changed outside of PRD (e.g., git checkout) are reindexed the first time they are needed.
+    """
+
+    def __init__(self, org_path: Path, entries: dict[str, dict] = None):
+        self.org_path = org_path
+        self.entries = {}
+        # Keys of the entries per (type, id), so that objects can be found without iterating all entries
+        self.keys_by_object: dict[tuple[str, int], set[str]] = {}
+        for key, entry in (entries or {}).items():
+            self.set_entry(key, entry)
+        self.is_dirty = False
+
+    def get_key(self, path: Path) -> str:
+        return os.path.relpath(str(path), str(self.org_path)).replace(os.sep, "/")
+
+    def set_entry(self, key: str, entry: dict):
+        self.delete_entry(key)
+        self.entries[key] = entry
+        self.keys_by_object.setdefault((entry["type"], entry["id"]), set()).add(key)
+        self.is_dirty = True
+
+    def delete_entry(self, key: str):
+        if (entry := self.entries.pop(key, None)) is None:
+            return
+        object_key = (entry["type"], entry["id"])
+        self.keys_by_object[object_key].discard(key)
+        if not self.keys_by_object[object_key]:
+            del self.keys_by_object[object_key]
+        self.is_dirty = True
+
+    def update(self, path: Path, object: dict, content: bytes, stat: os.stat_result):
+        entry = create_entry(object, content, stat)
+        self.set_entry(self.get_key(path), entry)
+        return entry
+
+    def remove(self, path: Path):
+        self.delete_entry(self.get_key(path))
+
+    async def get_entry(self, path: Path) -> dict:
+        """Returns the entry of an object file, reading the file only if it changed since it was indexed."""
+        try:
+            stat = await path.stat()
+        except FileNotFoundError:
+            self.remove(path)
+            return None
+
+        entry = self.entries.get(self.get_key(path), None)
+        if is_entry_valid(entry, stat):
+            return entry
+
+        content = await path.read_bytes()
+        return self.update(path, json.loads(content), content, stat)
+
+    async def scan(self, directory: Path) -> dict[Path, dict]:
+        """Returns entries of all object files in the directory, only files that changed are read."""
+        directory_key = self.get_key(directory)
+        prefix = "" if directory_key == "." else directory_key + "/"
+        scanned = await anyio.to_thread.run_sync(
+            scan_directory, str(directory), self.entries, str(self.org_path)
+        )
+
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            if key not in scanned:
+                self.delete_entry(key)
+        for key, entry in scanned.items():
+            if self.entries.get(key, None) is not entry:
+                self.set_entry(key, entry)
+
+        # Paths are returned in the same form as the directory (e.g., relative to the current directory)
+        return {
+            directory / key.removeprefix(prefix): entry
+            for key, entry in scanned.items()
+        }
+
+    async def find_object_path(
+        self, id: int, type: str = None, directory: Path = None
+    ) -> Path:
+        """Finds where an object is stored locally without scanning the directory."""
+        prefix = ""
+        if directory:
+            directory_key = self.get_key(directory)
+            prefix = "" if directory_key == "." else directory_key + "/"
+
+        types = (
+            [type]
+            if type
+            else [
+                object_type
+                for object_type, object_id in self.keys_by_object
+                if object_id == id
+            ]
+        )
+        candidates = sorted(
+            key
+            for object_type in types
+            for key in self.keys_by_object.get((object_type, id), set())
+            if key.startswith(prefix)
+        )
+        for key in candidates:
+            if (
+                current_entry := await self.get_entry(self.org_path / key)
+            ) and current_entry["id"] == id:
+                return (
+                    directory / key.removeprefix(prefix)
+                    if directory
+                    else self.org_path / key
+                )
+        return None
+
+    async def read_objects(self, directory: Path, ids: set[int]) -> list[dict]:
+        """Reads only the objects with the given IDs from the directory."""
+        local_entries = await self.scan(directory)
+        return [
+            json.loads(await path.read_text())
+            for path, entry in local_entries.items()
+            if entry["id"] in ids
+        ]
+
+    async def save(self):
+        if not self.is_dirty:
+            return
+        await write_state(
+            self.org_path,
+            settings.LOCAL_INDEX_FILENAME,
+            {"version": LOCAL_INDEX_VERSION, "entries": dict(self.entries)},
+        )
+        self.is_dirty = False
+
+
+async def get_local_index(path: Path) -> LocalIndex:
+    """Returns the (lazily loaded) index of the project the path belongs to or None if the path is not in a project."""
+    org_path = find_org_path(path)
+    if org_path is None:
+        return None
+
+    # Indexes are shared by all commands of the process, which might run in a different current directory
+    key = os.path.abspath(str(org_path))
+    if key not in _indexes:
+        state = await read_state(org_path, settings.LOCAL_INDEX_FILENAME)
+        entries = (
+            state.get("entries", {})
+            if state.get("version", None) == LOCAL_INDEX_VERSION
+            else {}
+        )
+        _indexes.setdefault(key, LocalIndex(Path(key), entries))
+    return _indexes[key]
+
+
+async def read_local_entry(path: Path) -> dict:
+    """Returns the index entry of an object file, falling back to the file content if the path is not in a project.
+
+    Returns None if the file does not exist.
+    """
+    if local_index := await get_local_index(path):
+        return await local_index.get_entry(path)
+    try:
+        return json.loads(await path.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+async def save_local_indexes():
+    for index in _indexes.values():
+        await index.save()
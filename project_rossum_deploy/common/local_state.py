@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from typing import Callable
+import anyio
+from anyio import Path
+
+from project_rossum_deploy.utils.consts import settings
+
+# Commands pulling source and target concurrently might update the same state file
+_state_lock = threading.Lock()
+
+
+def get_state_path(org_path: Path, filename: str) -> Path:
+    """Local PRD state (cursors, indexes, journals) lives in a self-ignored directory next to mapping.yaml."""
+    return org_path / settings.STATE_DIRNAME / filename
+
+
+def read_state_sync(state_path: str) -> dict:
+    try:
+        with open(state_path, "r") as rf:
+            return json.load(rf)
+    # Missing or corrupted state is never fatal, it only makes the next command do the full work
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def create_state_dir(state_path: str):
+    state_dir = os.path.dirname(state_path)
+    os.makedirs(state_dir, exist_ok=True)
+
+    # The state describes this particular clone of the project and must not be committed
+    gitignore_path = os.path.join(state_dir, ".gitignore")
+    if not os.path.exists(gitignore_path):
+        with open(gitignore_path, "w") as wf:
+            wf.write("*\n")
+
+
+def write_state_sync(state_path: str, state: dict):
+    create_state_dir(state_path)
+
+    temp_path = f"{state_path}.tmp"
+    with open(temp_path, "w") as wf:
+        json.dump(state, wf, indent=2)
+    os.replace(temp_path, state_path)
+
+
+async def read_state(org_path: Path, filename: str) -> dict:
+    return await anyio.to_thread.run_sync(
+        read_state_sync, str(get_state_path(org_path, filename))
+    )
+
+
+async def write_state(org_path: Path, filename: str, state: dict):
+    def write():
+        with _state_lock:
+            write_state_sync(str(get_state_path(org_path, filename)), state)
+
+    await anyio.to_thread.run_sync(write)
+
+
+async def update_state(
+    org_path: Path, filename: str, update: Callable[[dict], None]
+) -> dict:
+    """Reads the state, applies the update and writes it back as a single step (no other update can interleave)."""
+
+    def read_update_write():
+        state_path = str(get_state_path(org_path, filename))
+        with _state_lock:
+            state = read_state_sync(state_path)
+            update(state)
+            write_state_sync(state_path, state)
+        return state
+
+    return await anyio.to_thread.run_sync(read_update_write)
+
+
+def read_records_sync(state_path: str) -> list[dict]:
+    records = []
+    try:
+        with open(state_path, "r") as rf:
+            for line in rf:
+                try:
+                    records.append(json.loads(line))
+                # A record cut short by a crash is the last one, the ones before it are complete
+                except json.JSONDecodeError:
+                    break
+    except FileNotFoundError:
+        pass
+    return records
+
+
+async def read_records(org_path: Path, filename: str) -> list[dict]:
+    return await anyio.to_thread.run_sync(
+        read_records_sync, str(get_state_path(org_path, filename))
+    )
+
+
+async def append_record(org_path: Path, filename: str, record: dict):
+    """Appends the record as a single line (JSON Lines), records are never rewritten."""
+
+    def append():
+        state_path = str(get_state_path(org_path, filename))
+        with _state_lock:
+            create_state_dir(state_path)
+            with open(state_path, "a") as af:
+                af.write(json.dumps(record) + "\n")
+                af.flush()
+                os.fsync(af.fileno())
+
+    await anyio.to_thread.run_sync(append)
+
+
+async def remove_state(org_path: Path, filename: str):
+    def remove():
+        with _state_lock:
+            try:
+                os.remove(str(get_state_path(org_path, filename)))
+            except FileNotFoundError:
+                pass
+
+    await anyio.to_thread.run_sync(remove)
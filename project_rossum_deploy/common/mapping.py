@@ -277,6 +277,14 @@ def find_mapping_of_object(sub_mapping: list[dict], id: int):
     return None
 
 
+def index_mapping_by_id(sub_mapping: list[dict]) -> dict[int, dict]:
+    """The same lookup as find_mapping_of_object for all objects of a mapping list at once."""
+    index = {}
+    for object in sub_mapping:
+        index.setdefault(object["id"], object)
+    return index
+
+
 def extract_target_ids(submapping: dict) -> list[int]:
     target_ids = []
     for target_object in submapping.get("targets", []):
@@ -1,9 +1,175 @@
+import hashlib
+import json
+
 from rossum_api import ElisAPIClient
 from rossum_api.api_client import Resource
 
+from project_rossum_deploy.common.concurrency import gather_with_scheduler
+from project_rossum_deploy.common.fetch import chunk_ids
+from project_rossum_deploy.utils.consts import settings
+from project_rossum_deploy.utils.functions import extract_id_from_url
+
+# References that Rossum mirrors in the referenced objects (e.g., writing hook.queues changes queue.hooks)
+MIRRORED_REFERENCES = {
+    Resource.Hook: [("queues", Resource.Queue)],
+    Resource.Queue: [("hooks", Resource.Hook), ("webhooks", Resource.Hook)],
+}
+
+
+def hash_object(object: dict, resource: Resource) -> str:
+    """Hash of the object's content that does not depend on key order, keys not stored locally and keys set by Rossum."""
+    ignored_keys = set(settings.IGNORED_KEYS.get(resource, [])) | set(
+        settings.SERVER_MANAGED_KEYS
+    )
+    content = json.dumps(
+        {key: value for key, value in object.items() if key not in ignored_keys},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class RemoteTimestamps:
+    """Remote objects (and their modified_at) fetched in a few id-filtered list calls (?id=1,2,3) before anything is written.
+
+    The Rossum API does not support conditional writes (If-Unmodified-Since/ETag), so conflicts are detected up front instead.
+    The objects are also the cache of remote objects for the rest of the command, kept up to date with the write responses.
+    """
+
+    def __init__(self, objects: dict[tuple[Resource, int], dict] = None):
+        self.objects = objects or {}
+
+    @classmethod
+    async def fetch(
+        cls, client: ElisAPIClient, ids_by_resource: dict[Resource, set[int]]
+    ):
+        async def fetch_batch(resource: Resource, batch: list[int]):
+            return [
+                (resource, object)
+                async for object in client._http_client.fetch_all(
+                    resource,
+                    id=",".join(map(str, batch)),
+                    page_size=settings.BULK_FETCH_BATCH_SIZE,
+                )
+            ]
+
+        batches = await gather_with_scheduler(
+            *[
+                fetch_batch(resource, batch)
+                for resource, ids in ids_by_resource.items()
+                for batch in chunk_ids(sorted(ids))
+            ]
+        )
+        return cls(
+            {
+                (resource, object["id"]): object
+                for batch in batches
+                for resource, object in batch
+            }
+        )
+
+    def is_fetched(self, resource: Resource, id: int) -> bool:
+        return (resource, id) in self.objects
+
+    def get_object(self, resource: Resource, id: int) -> dict:
+        return self.objects.get((resource, id), None)
+
+    def store(self, resource: Resource, object: dict) -> dict:
+        if object and object.get("id", None):
+            previous_object = self.objects.get((resource, object["id"]), None) or {}
+            # Cached objects referenced by the previous or the new version were changed by the write as well
+            for attribute, referenced_resource in MIRRORED_REFERENCES.get(resource, []):
+                for url in [
+                    *(previous_object.get(attribute, None) or []),
+                    *(object.get(attribute, None) or []),
+                ]:
+                    self.objects.pop(
+                        (referenced_resource, extract_id_from_url(url)), None
+                    )
+            self.objects[(resource, object["id"])] = object
+        return object
+
+    def is_synced(self, resource: Resource, id: int, local_object: dict) -> bool:
+        return self.objects[(resource, id)].get("modified_at", "") == local_object.get(
+            "modified_at", ""
+        )
+
+    def is_identical(self, resource: Resource, local_object: dict) -> bool:
+        """Whether pushing the object would not change anything (attributes missing in the listing make it different)."""
+        remote_object = self.get_object(resource, local_object.get("id", None))
+        return remote_object is not None and hash_object(
+            remote_object, resource
+        ) == hash_object(local_object, resource)
+
+    def find_conflicts(
+        self, local_objects: list[tuple[Resource, dict]]
+    ) -> list[tuple[Resource, dict]]:
+        """Returns local objects with a different remote version, objects missing in Rossum are not conflicts."""
+        return [
+            (resource, local_object)
+            for resource, local_object in local_objects
+            if self.is_fetched(resource, local_object["id"])
+            and not self.is_synced(resource, local_object["id"], local_object)
+        ]
+
+
+def store_remote_object(
+    remote_timestamps: RemoteTimestamps, resource: Resource, object: dict
+) -> dict:
+    """Keeps the cached remote objects up to date with the write responses, returns the object."""
+    return remote_timestamps.store(resource, object) if remote_timestamps else object
+
+
+async def get_remote_object(
+    client: ElisAPIClient,
+    resource: Resource,
+    id: int,
+    remote_timestamps: RemoteTimestamps = None,
+) -> dict:
+    """Returns the remote object, each object is requested at most once per command if remote_timestamps are passed."""
+    if remote_timestamps and remote_timestamps.is_fetched(resource, id):
+        return remote_timestamps.get_object(resource, id)
+
+    object = await client._http_client.fetch_one(resource, id)
+    if remote_timestamps:
+        remote_timestamps.store(resource, object)
+    return object
+
 
 async def check_modified_timestamp(
-    client: ElisAPIClient, resource: Resource, id: int, local_object: dict
+    client: ElisAPIClient,
+    resource: Resource,
+    id: int,
+    local_object: dict,
+    remote_timestamps: RemoteTimestamps = None,
 ):
-    object = await client._http_client.fetch_one(resource, id)
+    # Objects checked during the preflight do not need another request
+    object = await get_remote_object(client, resource, id, remote_timestamps)
     return object.get("modified_at", "") == local_object.get("modified_at", "")
+
+
+def create_minimal_payload(
+    object: dict,
+    resource: Resource,
+    id: int,
+    remote_timestamps: RemoteTimestamps = None,
+) -> dict:
+    """Returns only the top-level attributes that differ from the version Rossum has (the whole object if it was not prefetched).
+
+    Attributes missing in the listing are always sent, so are the many-to-many references because the prefetched
+    version might be outdated by writes of the referenced objects (e.g., releasing a hook detaches it from queues).
+    """
+    remote_object = (
+        remote_timestamps.get_object(resource, id) if remote_timestamps else None
+    )
+    if not remote_object:
+        return object
+
+    return {
+        key: value
+        for key, value in object.items()
+        if key not in remote_object
+        or remote_object[key] != value
+        or key in settings.ALWAYS_SENT_KEYS
+    }
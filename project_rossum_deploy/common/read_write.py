@@ -1,6 +1,10 @@
 import dataclasses
 import json
+import os
 from typing import Any
+import uuid
+
+import anyio
 from anyio import Path
 from rich import print
 from rossum_api.api_client import Resource
@@ -8,36 +12,138 @@ import yaml
 
 from project_rossum_deploy.utils.consts import settings
 from project_rossum_deploy.common.determine_path import determine_object_type_from_path
+from project_rossum_deploy.common.local_index import (
+    get_local_index,
+    hash_content,
+    is_entry_valid,
+)
 from project_rossum_deploy.utils.functions import (
     templatize_name_id,
 )
 
 
+def write_file_atomically(path: str, content: bytes) -> os.stat_result:
+    """Writes the file through a temporary file in the same directory, so that readers never see a partially written file.
+    Runs in a worker thread, the parent directory is created only if it does not exist yet.
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex}.tmp")
+    try:
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except FileNotFoundError:
+        os.makedirs(directory or ".", exist_ok=True)
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+
+    try:
+        with os.fdopen(fd, "wb") as wf:
+            wf.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    return os.stat(path)
+
+
+def write_file_if_changed(
+    path: str, content: bytes, local_entry: dict = None
+) -> tuple[bool, bytes, os.stat_result]:
+    """Writes the file only if its content differs, so that mtimes of unchanged files stay untouched (and git does not rehash them).
+
+    Returns:
+        tuple[bool, bytes, os.stat_result]: Whether the file was written, its previous content (None for new files) and its stat
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return True, None, write_file_atomically(path, content)
+
+    # The index knows the hash of the file as long as the file was not modified since
+    if is_entry_valid(local_entry, stat) and local_entry["hash"] == hash_content(
+        content
+    ):
+        return False, content, stat
+
+    with open(path, "rb") as rf:
+        previous_content = rf.read()
+    if previous_content == content:
+        return False, previous_content, stat
+
+    return True, previous_content, write_file_atomically(path, content)
+
+
+def find_changed_keys(previous_content: bytes, object: dict) -> list[str]:
+    try:
+        previous_object = json.loads(previous_content)
+    except ValueError:
+        return []
+    if not isinstance(previous_object, dict):
+        return []
+    return [
+        key
+        for key in [*previous_object, *(k for k in object if k not in previous_object)]
+        if previous_object.get(key, None) != object.get(key, None)
+    ]
+
+
+def serialize_and_write_json(path: str, object: dict, local_entry: dict = None):
+    content = json.dumps(object, indent=2).encode()
+    is_written, previous_content, stat = write_file_if_changed(
+        path, content, local_entry
+    )
+    changed_keys = (
+        find_changed_keys(previous_content, object)
+        if is_written and previous_content is not None
+        else []
+    )
+    return content, is_written, changed_keys, stat
+
+
 async def write_json(
     path: Path, object: dict, type: Resource = None, log_message: str = ""
-):
+) -> bool:
+    """Writes the object unless the file already has the same content.
+
+    Returns:
+        bool: Whether the file was written
+    """
     if dataclasses.is_dataclass(object):
         object = dataclasses.asdict(object)
-    if path.parent:
-        await path.parent.mkdir(parents=True, exist_ok=True)
     if type:
         ignored_keys = settings.IGNORED_KEYS.get(type)
         if ignored_keys:
             for key in ignored_keys:
                 if key in object:
                     del object[key]
-    with open(path, "w") as wf:
-        json.dump(object, wf, indent=2)
 
-    if log_message:
-        print(log_message)
+    local_index = await get_local_index(path)
+    local_entry = (
+        local_index.entries.get(local_index.get_key(path)) if local_index else None
+    )
+    # Serialization and disk I/O do not block the event loop (and the in-flight requests)
+    content, is_written, changed_keys, stat = await anyio.to_thread.run_sync(
+        serialize_and_write_json, str(path), object, local_entry
+    )
+
+    if local_index:
+        local_index.update(path, object, content, stat)
 
+    if is_written and log_message:
+        print(
+            f"{log_message} (changed: {', '.join(changed_keys)})"
+            if changed_keys
+            else log_message
+        )
 
-async def write_str(path: Path, code: str):
-    if path.parent:
-        await path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w") as wf:
-        wf.write(code)
+    return is_written
+
+
+async def write_str(path: Path, code: str) -> bool:
+    is_written, _, _ = await anyio.to_thread.run_sync(
+        write_file_if_changed, str(path), code.encode()
+    )
+    return is_written
 
 
 async def create_local_object(path: Path, object: dict):
@@ -93,6 +93,9 @@ try:
             self.SOURCE_TOKEN = credentials.get(self.SOURCE_DIRNAME, {}).get(
                 "token", None
             )
+            self.SOURCE_MAX_CONCURRENCY = credentials.get(self.SOURCE_DIRNAME, {}).get(
+                "max_concurrency", self.MAX_CONCURRENCY
+            )
 
             if not credentials.get("use_same_org_as_target", False):
                 self.IS_PROJECT_IN_SAME_ORG = False
@@ -114,11 +117,32 @@ try:
                 self.TARGET_TOKEN = credentials.get(self.TARGET_DIRNAME, {}).get(
                     "token", None
                 )
+                self.TARGET_MAX_CONCURRENCY = credentials.get(
+                    self.TARGET_DIRNAME, {}
+                ).get("max_concurrency", self.MAX_CONCURRENCY)
             else:
                 self.IS_PROJECT_IN_SAME_ORG = True
 
+            self.HTTP2 = credentials.get("http2", False)
+
         IS_PROJECT_IN_SAME_ORG: bool = False
 
+        HTTP2: bool = False
+        HTTP_MAX_CONNECTIONS: int = 20
+        # Connections are kept open between the phases of a command (e.g., push and the following pull)
+        HTTP_KEEPALIVE_EXPIRY: float = 60
+
+        # Bounds of the adaptive number of in-flight requests per Rossum API
+        INITIAL_CONCURRENCY: int = 5
+        MIN_CONCURRENCY: int = 1
+        MAX_CONCURRENCY: int = 20
+        SOURCE_MAX_CONCURRENCY: int = MAX_CONCURRENCY
+        TARGET_MAX_CONCURRENCY: int = MAX_CONCURRENCY
+        SLOW_RESPONSE_SECONDS: float = 5
+        MAX_SCHEDULED_OPERATIONS: int = 50
+        # Maximum page size accepted by the Rossum API
+        BULK_FETCH_BATCH_SIZE: int = 100
+
         SOURCE_API_BASE: str = ""
         # Empty string gives an API error even if there is username and password
         SOURCE_TOKEN: str = "dummy_token"
@@ -126,6 +150,13 @@ try:
         SOURCE_PASSWORD: str = ""
 
         MAPPING_FILENAME: str = "mapping.yaml"
+        STATE_DIRNAME: str = ".prd"
+        SYNC_CURSOR_FILENAME: str = "sync_cursor.json"
+        # Cursors never move past the pull start minus this margin (covers writes during pagination and clock skew)
+        SYNC_CURSOR_SAFETY_MARGIN_SECONDS: float = 300
+        LOCAL_INDEX_FILENAME: str = "index.json"
+        PUSH_JOURNAL_FILENAME: str = "push_journal.json"
+        PUSH_LOG_FILENAME: str = "push_log.jsonl"
         CREDENTIALS_FILENAME: str = "credentials.json"
         MAPPING_KEYS_ORDER: list = ["comment", "id", "name", "ignore", "targets"]
 
@@ -162,6 +193,10 @@ try:
             Resource.Queue: ["counts", "users", "workflows"],
             Resource.Hook: ["status"],
         }
+        # Set by Rossum on every write, not part of the object's content
+        SERVER_MANAGED_KEYS: list = ["modified_at", "modified_by"]
+        # Many-to-many references that Rossum also changes from the other side (e.g., hook.queues <-> queue.hooks)
+        ALWAYS_SENT_KEYS: list = ["hooks", "webhooks", "queues"]
 
         FORMULA_DIR_PREFIX: str = "formulas:"
 
@@ -5,6 +5,11 @@ from anyio import Path
 
 from click import progressbar
 
+from project_rossum_deploy.common.local_index import (
+    determine_entry_type,
+    get_local_index,
+)
+
 
 def coro(f):
     @wraps(f)
@@ -80,17 +85,16 @@ class PauseProgress:
         self._progress.start()
 
 
-async def gather_with_concurrency(n, *coros):
-    semaphore = asyncio.Semaphore(n)
-
-    async def sem_coro(coro):
-        async with semaphore:
-            return await coro
-
-    return await asyncio.gather(*(sem_coro(c) for c in coros))
-
-
 async def find_object_in_project(object: dict, base_path: Path):
+    # The object might have been renamed in Rossum, look it up by its ID first
+    local_index = await get_local_index(base_path)
+    if local_index and await local_index.find_object_path(
+        object["id"],
+        type=determine_entry_type(object.get("url", "")),
+        directory=base_path,
+    ):
+        return True
+
     file_name = templatize_name_id(object["name"], object["id"])
     return (
         await (base_path / file_name).exists()
@@ -3,6 +3,7 @@ from anyio import Path
 import pytest
 from rossum_api import ElisAPIClient
 
+from project_rossum_deploy.common import local_index
 from project_rossum_deploy.utils.consts import settings
 
 base_url = os.environ.get("SOURCE_API_BASE")
@@ -50,3 +51,11 @@ def target_client():
 @pytest.fixture(scope="function")
 def tmp_path(tmp_path):
     return Path(tmp_path)
+
+
+# Local indexes are cached per process, tests must not share them
+@pytest.fixture(autouse=True)
+def clear_local_indexes():
+    local_index._indexes.clear()
+    yield
+    local_index._indexes.clear()
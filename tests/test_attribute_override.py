@@ -1,7 +1,10 @@
 import jmespath
 import pytest
 import pytest_asyncio
-from project_rossum_deploy.common.attribute_override import override_attributes_v2
+from project_rossum_deploy.common.attribute_override import (
+    override_attributes_v2,
+    replace_ids_in_settings,
+)
 
 from project_rossum_deploy.utils.consts import (
     ATTRIBUTE_OVERRIDE_SOURCE_REFERENCE_KEYWORD,
@@ -214,3 +217,46 @@ async def test_override_uses_source_value_reference(loaded_mapping: dict):
     )
 
     assert f"{NEW_NAME} - {OLD_NAME}" == organization["name"]
+
+
+@pytest.mark.asyncio
+async def test_replace_ids_in_settings_pairs_and_single_target():
+    lookup_table = {123: [456, 789], 111: [222]}
+    settings = {
+        "queue_ids": [123, "123"],
+        "url": "https://elis.rossum.ai/api/v1/queues/111",
+        "ignored": [1234, "abc123", "0123"],
+    }
+
+    result = await replace_ids_in_settings(
+        1, settings, lookup_table, object_index=1, num_targets=2
+    )
+
+    assert result == {
+        "queue_ids": [789, "789"],
+        "url": "https://elis.rossum.ai/api/v1/queues/222",
+        "ignored": [1234, "abc123", "0123"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_replace_ids_in_settings_does_not_replace_twice():
+    # The target ID of the first object is the source ID of the second one
+    lookup_table = {1: [2], 2: [3]}
+
+    result = await replace_ids_in_settings(
+        1, {"a": 1, "b": 2}, lookup_table, object_index=0, num_targets=1
+    )
+
+    assert result == {"a": 2, "b": 3}
+
+
+@pytest.mark.asyncio
+async def test_replace_ids_in_settings_skips_ambiguous_targets():
+    lookup_table = {123: [456, 789]}
+
+    result = await replace_ids_in_settings(
+        1, {"queue_ids": [123]}, lookup_table, object_index=0, num_targets=3
+    )
+
+    assert result == {"queue_ids": [123]}
@@ -0,0 +1,223 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from project_rossum_deploy.common.concurrency import (
+    AdaptiveLimiter,
+    AdaptiveTransport,
+    SkippedOperationException,
+    parse_retry_after,
+    remove_dependency_cycles,
+    run_dependency_graph,
+)
+
+
+def create_limiter(initial_limit=4, min_limit=1, max_limit=8) -> AdaptiveLimiter:
+    return AdaptiveLimiter(
+        initial_limit=initial_limit,
+        min_limit=min_limit,
+        max_limit=max_limit,
+        slow_response_seconds=5,
+    )
+
+
+def create_client(limiter: AdaptiveLimiter, handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=AdaptiveTransport(httpx.MockTransport(handler), limiter)
+    )
+
+
+@pytest.mark.parametrize(
+    "initial_limit,min_limit,max_limit,expected",
+    [
+        (4, 1, 8, (4, 1, 8)),
+        (20, 1, 8, (8, 1, 8)),
+        (0, 0, 8, (1, 1, 8)),
+        (4, 6, 2, (6, 6, 6)),
+    ],
+)
+def test_limit_is_kept_within_bounds(initial_limit, min_limit, max_limit, expected):
+    limiter = create_limiter(initial_limit, min_limit, max_limit)
+
+    assert (limiter.limit, limiter.min_limit, limiter.max_limit) == expected
+
+
+def test_limit_grows_after_window_of_fast_responses_up_to_maximum():
+    limiter = create_limiter(initial_limit=2, max_limit=3)
+
+    for _ in range(2):
+        limiter.in_flight += 1
+        limiter.release(0.1, 200)
+    assert limiter.limit == 3
+
+    for _ in range(10):
+        limiter.in_flight += 1
+        limiter.release(0.1, 200)
+    assert limiter.limit == 3
+
+
+@pytest.mark.parametrize("status_code,elapsed", [(429, 0.1), (503, 0.1), (200, 10)])
+def test_limit_is_halved_on_congestion_down_to_minimum(status_code, elapsed):
+    limiter = create_limiter(initial_limit=8, min_limit=3)
+
+    limiter.in_flight += 1
+    limiter.release(elapsed, status_code)
+    assert limiter.limit == 4
+
+    # Responses of requests that were already in flight do not decrease the limit again
+    limiter.in_flight += 1
+    limiter.release(elapsed, status_code)
+    assert limiter.limit == 4
+
+    limiter._last_decrease -= AdaptiveLimiter.DECREASE_COOLDOWN_SECONDS
+    limiter.in_flight += 1
+    limiter.release(elapsed, status_code)
+    assert limiter.limit == 3
+
+
+@pytest.mark.asyncio
+async def test_requests_wait_for_free_slot():
+    limiter = create_limiter(initial_limit=1, max_limit=1)
+    await limiter.acquire()
+
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    limiter.release(0.1, 200)
+    await asyncio.wait_for(waiting, 1)
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.parametrize(
+    "value,expected",
+    [("2", 2), ("1.5", 1.5), ("-1", 0), ("", None), (None, None), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert 28 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+    assert (
+        parse_retry_after(format_datetime(retry_at - timedelta(minutes=5), usegmt=True))
+        == 0
+    )
+
+
+@pytest.mark.asyncio
+async def test_transport_decreases_limit_and_pauses_on_throttling():
+    limiter = create_limiter(initial_limit=8)
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            429, headers={"Retry-After": format_datetime(retry_at, usegmt=True)}
+        )
+
+    async with create_client(limiter, handler) as client:
+        response = await client.get("https://api.elis.rossum.ai/v1/queues")
+
+    assert response.status_code == 429
+    assert limiter.limit == 4
+    assert limiter.in_flight == 0
+    assert 28 < limiter.paused_until - time.monotonic() <= 30
+
+
+@pytest.mark.asyncio
+async def test_transport_releases_slot_of_successful_and_failed_requests():
+    limiter = create_limiter(initial_limit=1, max_limit=1)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("broken"):
+            raise httpx.ConnectError("Connection refused", request=request)
+        return httpx.Response(200, json={}, headers={"Retry-After": "30"})
+
+    async with create_client(limiter, handler) as client:
+        await client.get("https://api.elis.rossum.ai/v1/queues")
+        with pytest.raises(httpx.ConnectError):
+            await client.get("https://api.elis.rossum.ai/v1/broken")
+        await client.get("https://api.elis.rossum.ai/v1/queues")
+
+    assert limiter.in_flight == 0
+    # Retry-After is only respected on throttled responses
+    assert limiter.paused_until == 0
+
+
+def test_remove_dependency_cycles():
+    dependencies = {"a": {"b"}, "b": {"c"}, "c": {"a"}, "d": {"a"}}
+
+    removed = remove_dependency_cycles(dependencies)
+
+    assert removed == [("c", "a")]
+    assert dependencies == {"a": {"b"}, "b": {"c"}, "c": set(), "d": {"a"}}
+
+
+@pytest.mark.asyncio
+async def test_operations_receive_results_of_their_dependencies():
+    order = []
+
+    def create_operation(key: str):
+        async def operation(results: dict):
+            order.append(key)
+            return {"key": key, "dependencies": results}
+
+        return operation
+
+    outcomes = await run_dependency_graph(
+        {key: create_operation(key) for key in ["queue", "schema", "workspace"]},
+        {"queue": {"schema", "workspace", "inbox"}},
+    )
+
+    assert order.index("queue") == 2
+    schema, workspace = outcomes["schema"], outcomes["workspace"]
+    assert schema == {"key": "schema", "dependencies": {}}
+    # Dependencies without an operation are ignored
+    assert outcomes["queue"] == {
+        "key": "queue",
+        "dependencies": {"schema": schema, "workspace": workspace},
+    }
+
+
+@pytest.mark.asyncio
+async def test_operations_depending_on_failed_ones_are_skipped():
+    error = Exception("schema failed")
+    run = []
+
+    def create_operation(key: str):
+        async def operation(results: dict):
+            run.append(key)
+            if key == "schema":
+                raise error
+            return key
+
+        return operation
+
+    outcomes = await run_dependency_graph(
+        {key: create_operation(key) for key in ["schema", "queue", "inbox", "hook"]},
+        {"queue": {"schema"}, "inbox": {"queue"}},
+    )
+
+    assert outcomes["schema"] is error
+    assert isinstance(outcomes["queue"], SkippedOperationException)
+    assert isinstance(outcomes["inbox"], SkippedOperationException)
+    assert outcomes["hook"] == "hook"
+    assert sorted(run) == ["hook", "schema"]
+
+
+@pytest.mark.asyncio
+async def test_dependency_cycles_do_not_block_operations():
+    async def operation(results: dict):
+        return set(results)
+
+    outcomes = await run_dependency_graph(
+        {"a": operation, "b": operation}, {"a": {"b", "a"}, "b": {"a"}}
+    )
+
+    assert outcomes == {"a": {"b"}, "b": set()}
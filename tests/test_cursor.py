@@ -0,0 +1,133 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.download.cursor import SyncCursor
+from project_rossum_deploy.utils.consts import settings
+
+CURSOR = "2024-07-12T10:00:00+00:00"
+
+
+def create_queue(modified_at: str, hooks: list = []) -> dict:
+    return {
+        "id": 1,
+        "url": "https://api.elis.rossum.ai/v1/queues/1",
+        "name": "Queue",
+        "modified_at": modified_at,
+        "hooks": hooks,
+    }
+
+
+async def write_object(org_path: Path, object: dict) -> Path:
+    path = org_path / settings.SOURCE_DIRNAME / "queue.json"
+    await path.parent.mkdir(parents=True, exist_ok=True)
+    await path.write_text(json.dumps(object))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_cursor_is_saved_and_loaded(tmp_path):
+    org_path = Path(tmp_path)
+    cursor = SyncCursor(settings.SOURCE_DIRNAME)
+    cursor.see(Resource.Queue, create_queue("2024-07-12T09:00:00Z"))
+    cursor.see(Resource.Queue, create_queue(CURSOR))
+    cursor.see(Resource.Queue, create_queue("2024-07-12T08:00:00Z"))
+    cursor.mark_pending({"id": 2})
+    await cursor.save(org_path)
+
+    loaded = await SyncCursor.load(org_path, settings.SOURCE_DIRNAME)
+    assert loaded.previous_timestamps == {
+        Resource.Queue.value: datetime.fromisoformat(CURSOR)
+    }
+    assert loaded.previous_pending_ids == {2}
+
+    assert (
+        await SyncCursor.load(org_path, settings.TARGET_DIRNAME)
+    ).previous_timestamps == {}
+    assert (
+        await SyncCursor.load(org_path, settings.SOURCE_DIRNAME, download_all=True)
+    ).previous_timestamps == {}
+
+
+@pytest.mark.asyncio
+async def test_cursor_does_not_move_past_pull_start(tmp_path):
+    org_path = Path(tmp_path)
+    cursor = SyncCursor(settings.SOURCE_DIRNAME)
+    # An object modified while the pull is running might have been listed in its old version
+    cursor.see(
+        Resource.Queue,
+        create_queue(datetime.now(timezone.utc).isoformat()),
+    )
+    await cursor.save(org_path)
+
+    loaded = await SyncCursor.load(org_path, settings.SOURCE_DIRNAME)
+    assert loaded.previous_timestamps[Resource.Queue.value] <= datetime.now(
+        timezone.utc
+    ) - timedelta(seconds=settings.SYNC_CURSOR_SAFETY_MARGIN_SECONDS)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "modified_at,pending_ids,expected",
+    [
+        ("2024-07-12T09:00:00Z", [], True),
+        # Objects modified at the cursor were listed in that version
+        ("2024-07-12T10:00:00Z", [], True),
+        ("2024-07-12T11:00:00Z", [], False),
+        ("2024-07-12T09:00:00Z", [1], False),
+        ("", [], False),
+    ],
+)
+async def test_is_unchanged(tmp_path, modified_at, pending_ids, expected):
+    org_path = Path(tmp_path)
+    queue = create_queue(modified_at)
+    path = await write_object(org_path, queue)
+    cursor = SyncCursor(
+        settings.SOURCE_DIRNAME,
+        timestamps={Resource.Queue.value: CURSOR},
+        pending_ids=pending_ids,
+    )
+
+    assert await cursor.is_unchanged(Resource.Queue, queue, path) is expected
+
+
+@pytest.mark.asyncio
+async def test_is_unchanged_requires_local_file(tmp_path):
+    org_path = Path(tmp_path)
+    queue = create_queue("2024-07-12T09:00:00Z")
+    cursor = SyncCursor(
+        settings.SOURCE_DIRNAME, timestamps={Resource.Queue.value: CURSOR}
+    )
+
+    path = org_path / settings.SOURCE_DIRNAME / "queue.json"
+    assert not await cursor.is_unchanged(Resource.Queue, queue, path)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "resource,attribute",
+    [
+        (Resource.Queue, "hooks"),
+        (Resource.Queue, "webhooks"),
+        (Resource.Hook, "queues"),
+    ],
+)
+async def test_is_unchanged_compares_mirrored_references(tmp_path, resource, attribute):
+    org_path = Path(tmp_path)
+    object = {
+        "id": 1,
+        "url": f"https://api.elis.rossum.ai/v1/{resource.value}/1",
+        "name": "Object",
+        "modified_at": "2024-07-12T09:00:00Z",
+        attribute: [],
+    }
+    path = await write_object(org_path, object)
+    cursor = SyncCursor(settings.SOURCE_DIRNAME, timestamps={resource.value: CURSOR})
+    assert await cursor.is_unchanged(resource, object, path)
+
+    # Rossum attached the hook from the other side without updating modified_at
+    attached_object = {**object, attribute: ["https://api.elis.rossum.ai/v1/other/2"]}
+    assert not await cursor.is_unchanged(resource, attached_object, path)
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+import pytest_asyncio
+from anyio import Path
+
+from project_rossum_deploy.commands.upload.dependencies import (
+    ChangeSet,
+    merge_formula_changes,
+    merge_hook_changes,
+)
+
+HOOK_PATH = Path("source/hooks/Hook_[1].json")
+HOOK_CODE_PATH = Path("source/hooks/Hook_[1].py")
+SCHEMA_PATH = Path("source/schemas/Schema_[2].json")
+FORMULA_PATH = Path("source/schemas/formulas:Schema_[2]/total.py")
+
+
+def create_hook(code: str) -> dict:
+    return {
+        "id": 1,
+        "name": "Hook",
+        "extension_source": "custom",
+        "config": {"code": code, "runtime": "python3.12"},
+    }
+
+
+def create_schema(formula: str) -> dict:
+    return {
+        "id": 2,
+        "name": "Schema",
+        "content": [
+            {
+                "category": "section",
+                "id": "totals",
+                "children": [
+                    {"category": "datapoint", "id": "amount"},
+                    {"category": "datapoint", "id": "total", "formula": formula},
+                ],
+            }
+        ],
+    }
+
+
+@pytest_asyncio.fixture(scope="function")
+async def project_path(tmp_path, monkeypatch):
+    """Changed paths are relative to the current directory, like in push."""
+    monkeypatch.chdir(tmp_path)
+    for path, content in [
+        (HOOK_PATH, json.dumps(create_hook("old"))),
+        (HOOK_CODE_PATH, "old"),
+        (SCHEMA_PATH, json.dumps(create_schema("old"))),
+        (FORMULA_PATH, "old"),
+    ]:
+        await (Path(tmp_path) / path).parent.mkdir(parents=True, exist_ok=True)
+        await (Path(tmp_path) / path).write_text(content)
+    return Path(tmp_path)
+
+
+def test_change_set_keeps_first_occurrence_of_each_change():
+    changes = ChangeSet(
+        [("M", HOOK_PATH), ("M", Path(str(HOOK_PATH))), ("D", HOOK_PATH)]
+    )
+    changes.add(("M", SCHEMA_PATH))
+    changes.add(("M", HOOK_PATH))
+
+    assert changes.to_list() == [("M", HOOK_PATH), ("D", HOOK_PATH), ("M", SCHEMA_PATH)]
+    assert ("D", Path(str(HOOK_PATH))) in changes
+    assert ("??", HOOK_PATH) not in changes
+    assert list(changes) == changes.to_list()
+
+
+@pytest.mark.asyncio
+async def test_hook_code_file_changes_are_merged_into_hook(project_path):
+    await (project_path / HOOK_CODE_PATH).write_text("new")
+
+    changes = await merge_hook_changes(
+        [("M", HOOK_CODE_PATH), ("M", HOOK_PATH), ("M", SCHEMA_PATH)], Path("./")
+    )
+
+    assert changes == [("M", HOOK_PATH), ("M", SCHEMA_PATH)]
+    assert json.loads(await (project_path / HOOK_PATH).read_text()) == create_hook(
+        "new"
+    )
+
+
+@pytest.mark.asyncio
+async def test_hook_code_changed_in_json_is_written_to_code_file(project_path):
+    await (project_path / HOOK_PATH).write_text(json.dumps(create_hook("new")))
+
+    changes = await merge_hook_changes([("M", HOOK_PATH)], Path("./"))
+
+    assert changes == [("M", HOOK_PATH)]
+    assert await (project_path / HOOK_CODE_PATH).read_text() == "new"
+
+
+@pytest.mark.asyncio
+async def test_formula_file_changes_are_merged_into_schema(project_path):
+    await (project_path / FORMULA_PATH).write_text("new")
+
+    changes = await merge_formula_changes(
+        [("M", FORMULA_PATH), ("M", SCHEMA_PATH), ("M", HOOK_PATH)]
+    )
+
+    assert changes == [("M", SCHEMA_PATH), ("M", HOOK_PATH)]
+    assert json.loads(await (project_path / SCHEMA_PATH).read_text()) == create_schema(
+        "new"
+    )
+
+
+@pytest.mark.asyncio
+async def test_formula_changed_in_json_is_written_to_formula_file(project_path):
+    await (project_path / SCHEMA_PATH).write_text(json.dumps(create_schema("new")))
+
+    changes = await merge_formula_changes([("M", SCHEMA_PATH)])
+
+    assert changes == [("M", SCHEMA_PATH)]
+    assert await (project_path / FORMULA_PATH).read_text() == "new"
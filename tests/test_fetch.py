@@ -0,0 +1,70 @@
+import pytest
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.common.fetch import fetch_objects_by_ids
+from tests.utils.fake_client import FakeClient, create_url
+
+
+def create_schema(id: int) -> dict:
+    return {
+        "id": id,
+        "url": create_url(Resource.Schema, id),
+        "name": f"Schema {id}",
+        "content": [],
+    }
+
+
+def create_queue(id: int) -> dict:
+    return {
+        "id": id,
+        "url": create_url(Resource.Queue, id),
+        "name": f"Queue {id}",
+        "schema": create_url(Resource.Schema, 1),
+        "inbox": None,
+        "hooks": [],
+        "settings": {},
+    }
+
+
+def count_requests(client: FakeClient, type: str) -> int:
+    return len(
+        [request for request in client._http_client.requests if request[0] == type]
+    )
+
+
+@pytest.mark.asyncio
+async def test_complete_listings_are_fetched_in_batches():
+    client = FakeClient([(Resource.Queue, create_queue(id)) for id in range(1, 4)])
+
+    objects = await fetch_objects_by_ids(client, Resource.Queue, [1, 2, 3])
+
+    assert objects == {id: create_queue(id) for id in range(1, 4)}
+    assert count_requests(client, "fetch_all") == 1
+    assert count_requests(client, "fetch_one") == 0
+
+
+@pytest.mark.asyncio
+async def test_partial_listings_are_fetched_one_by_one_only():
+    client = FakeClient(
+        [(Resource.Schema, create_schema(id)) for id in range(1, 4)],
+        list_omitted_attributes={Resource.Schema: ["content"]},
+    )
+
+    objects = await fetch_objects_by_ids(client, Resource.Schema, [1, 2, 3])
+
+    assert objects == {id: create_schema(id) for id in range(1, 4)}
+    assert count_requests(client, "fetch_all") == 0
+    assert count_requests(client, "fetch_one") == 3
+
+
+@pytest.mark.asyncio
+async def test_incomplete_listed_objects_are_fetched_one_by_one():
+    client = FakeClient(
+        [(Resource.Queue, create_queue(id)) for id in range(1, 3)],
+        list_omitted_attributes={Resource.Queue: ["settings"]},
+    )
+
+    objects = await fetch_objects_by_ids(client, Resource.Queue, [1, 2])
+
+    assert objects == {id: create_queue(id) for id in range(1, 3)}
+    assert count_requests(client, "fetch_one") == 2
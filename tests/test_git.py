@@ -0,0 +1,94 @@
+import subprocess
+
+import pytest
+from anyio import Path
+
+from project_rossum_deploy.common.git import (
+    GitChanges,
+    parse_porcelain_v2,
+    read_git_changes,
+)
+
+HASH = "0" * 40
+
+PORCELAIN_OUTPUT = (
+    f"1 .M N... 100644 100644 100644 {HASH} {HASH} source/hooks/Hook_[1].json\0"
+    f"1 M. N... 100644 100644 100644 {HASH} {HASH} source/schemas/Schema with spaces_[2].json\0"
+    f"1 A. N... 000000 100644 100644 {HASH} {HASH} source/workspaces/Nový_[3]/workspace.json\0"
+    # Renamed entries are followed by the original path
+    f"2 R. N... 100644 100644 100644 {HASH} {HASH} R100 source/hooks/Renamed hook_[4].json\0source/hooks/Hook_[4].json\0"
+    f"u UU N... 100644 100644 100644 100644 {HASH} {HASH} {HASH} target/hooks/Conflict_[5].json\0"
+    "? source/hooks/New hook.json\0"
+    "! source/ignored.json\0"
+).encode("utf-8")
+
+
+def test_parse_porcelain_v2():
+    entries = parse_porcelain_v2(PORCELAIN_OUTPUT.decode("utf-8"))
+
+    assert entries == [
+        (".", "M", Path("source/hooks/Hook_[1].json")),
+        ("M", ".", Path("source/schemas/Schema with spaces_[2].json")),
+        ("A", ".", Path("source/workspaces/Nový_[3]/workspace.json")),
+        ("R", ".", Path("source/hooks/Renamed hook_[4].json")),
+        ("U", "U", Path("target/hooks/Conflict_[5].json")),
+        ("?", "?", Path("source/hooks/New hook.json")),
+    ]
+
+
+def test_parse_porcelain_v2_makes_paths_relative_to_current_directory():
+    entries = parse_porcelain_v2(
+        f"1 .M N... 100644 100644 100644 {HASH} {HASH} project/source/hooks/Hook_[1].json\0"
+        "? project/source/hooks/New hook.json\0",
+        prefix="project",
+    )
+
+    assert [path for _, _, path in entries] == [
+        Path("source/hooks/Hook_[1].json"),
+        Path("source/hooks/New hook.json"),
+    ]
+
+
+def test_changed_file_paths_use_short_format_codes():
+    changes = GitChanges(parse_porcelain_v2(PORCELAIN_OUTPUT.decode("utf-8")))
+
+    assert changes.get_changed_file_paths("source") == [
+        ("M", Path("source/hooks/Hook_[1].json")),
+        ("M", Path("source/schemas/Schema with spaces_[2].json")),
+        ("A", Path("source/workspaces/Nový_[3]/workspace.json")),
+        ("R", Path("source/hooks/Renamed hook_[4].json")),
+        ("??", Path("source/hooks/New hook.json")),
+    ]
+    assert changes.get_changed_file_paths("source", indexed_only=True) == [
+        ("M", Path("source/schemas/Schema with spaces_[2].json")),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_read_git_changes(tmp_path, monkeypatch):
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    git("init")
+    hooks_path = tmp_path / "project" / "source" / "hooks"
+    await hooks_path.mkdir(parents=True)
+    await (hooks_path / "Hook_[1].json").write_text("{}")
+    git("add", ".")
+    git(
+        "-c",
+        "user.name=test",
+        "-c",
+        "user.email=test@example.com",
+        "commit",
+        "-m",
+        "init",
+    )
+
+    await (hooks_path / "Hook_[1].json").write_text('{"id": 1}')
+    await (hooks_path / "Nový hook.json").write_text("{}")
+    monkeypatch.chdir(tmp_path / "project")
+
+    assert read_git_changes().get_changed_file_paths("source") == [
+        ("M", Path("source/hooks/Hook_[1].json")),
+        ("??", Path("source/hooks/Nový hook.json")),
+    ]
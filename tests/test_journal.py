@@ -0,0 +1,181 @@
+import json
+import subprocess
+
+import pytest
+import pytest_asyncio
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.upload.journal import (
+    PushLog,
+    filter_already_pushed_changes,
+    find_changes_since_last_push,
+    record_successful_push,
+)
+from project_rossum_deploy.common.git import read_git_changes
+from project_rossum_deploy.common.local_state import get_state_path
+from project_rossum_deploy.utils.consts import settings
+from tests.utils.fake_client import create_url
+
+HOOK_PATH = Path("source/hooks/Hook_[1].json")
+SCHEMA_PATH = Path("source/schemas/Schema_[2].json")
+NEW_HOOK_PATH = Path("source/hooks/New hook_[3].json")
+
+
+def git(*args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        check=True,
+        capture_output=True,
+    )
+
+
+async def write_object(org_path: Path, path: Path, object: dict):
+    await (org_path / path).parent.mkdir(parents=True, exist_ok=True)
+    await (org_path / path).write_text(json.dumps(object))
+
+
+@pytest_asyncio.fixture(scope="function")
+async def org_path(tmp_path, monkeypatch):
+    """A committed project, paths of changes are relative to the current directory."""
+    monkeypatch.chdir(tmp_path)
+    for path, object in [
+        (HOOK_PATH, {"id": 1, "name": "Hook"}),
+        (SCHEMA_PATH, {"id": 2, "name": "Schema"}),
+    ]:
+        await write_object(Path(tmp_path), path, object)
+    git("init")
+    git("add", ".")
+    git("commit", "-m", "Initial pull")
+    return Path(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_already_pushed_changes_are_filtered(org_path):
+    await record_successful_push(
+        org_path, settings.SOURCE_DIRNAME, unpushed_paths=[SCHEMA_PATH]
+    )
+    await write_object(org_path, NEW_HOOK_PATH, {"name": "New hook"})
+    changes = [("M", HOOK_PATH), ("M", SCHEMA_PATH), ("??", NEW_HOOK_PATH)]
+
+    assert await filter_already_pushed_changes(
+        org_path, settings.SOURCE_DIRNAME, changes
+    ) == [("M", SCHEMA_PATH), ("??", NEW_HOOK_PATH)]
+
+    await write_object(org_path, HOOK_PATH, {"id": 1, "name": "Renamed hook"})
+    assert (
+        await filter_already_pushed_changes(org_path, settings.SOURCE_DIRNAME, changes)
+        == changes
+    )
+
+
+@pytest.mark.asyncio
+async def test_everything_is_pushed_without_journal(org_path):
+    changes = [("M", HOOK_PATH)]
+
+    assert (
+        await filter_already_pushed_changes(org_path, settings.SOURCE_DIRNAME, changes)
+        == changes
+    )
+    assert (
+        await find_changes_since_last_push(
+            org_path, settings.SOURCE_DIRNAME, read_git_changes()
+        )
+        == []
+    )
+
+
+@pytest.mark.asyncio
+async def test_changes_committed_since_last_push_are_found(org_path):
+    await record_successful_push(org_path, settings.SOURCE_DIRNAME)
+
+    await write_object(org_path, HOOK_PATH, {"id": 1, "name": "Renamed hook"})
+    await write_object(org_path, NEW_HOOK_PATH, {"name": "New hook"})
+    await (org_path / SCHEMA_PATH).unlink()
+    git("add", ".")
+    git("commit", "-m", "Local changes")
+    # Uncommitted changes are reported by git status
+    await write_object(org_path, HOOK_PATH, {"id": 1, "name": "Hook again"})
+
+    changes = await find_changes_since_last_push(
+        org_path, settings.SOURCE_DIRNAME, read_git_changes()
+    )
+
+    # Deleted objects are not pushed
+    assert sorted(changes) == [("A", NEW_HOOK_PATH), ("M", HOOK_PATH)]
+
+
+@pytest.mark.asyncio
+async def test_only_uncommitted_changes_are_found_if_last_pushed_commit_is_lost(
+    org_path,
+):
+    await record_successful_push(org_path, settings.SOURCE_DIRNAME)
+    await write_object(org_path, NEW_HOOK_PATH, {"name": "New hook"})
+    git("add", ".")
+    git("commit", "--amend", "-m", "Rewritten history")
+    git("reflog", "expire", "--expire=now", "--all")
+    git("gc", "--prune=now")
+    await write_object(org_path, HOOK_PATH, {"id": 1, "name": "Renamed hook"})
+
+    changes = await find_changes_since_last_push(
+        org_path, settings.SOURCE_DIRNAME, read_git_changes()
+    )
+
+    assert changes == [("M", HOOK_PATH)]
+
+
+@pytest.mark.asyncio
+async def test_push_log_is_resumed(org_path):
+    push_log = await PushLog.start(org_path, settings.SOURCE_DIRNAME)
+    created_hook = {"id": 10, "url": create_url(Resource.Hook, 10), "name": "Hook"}
+    await write_object(org_path, HOOK_PATH, created_hook)
+    await push_log.record("??", HOOK_PATH, create_url(Resource.Hook, 1), created_hook)
+    await push_log.record("M", SCHEMA_PATH, create_url(Resource.Schema, 2), {"id": 2})
+
+    resumed_log = await PushLog.start(org_path, settings.SOURCE_DIRNAME, resume=True)
+    assert await resumed_log.is_completed(HOOK_PATH)
+    assert await resumed_log.is_completed(SCHEMA_PATH)
+    assert not await resumed_log.is_completed(NEW_HOOK_PATH)
+    assert resumed_log.get_replaced_urls() == {
+        create_url(Resource.Hook, 1): create_url(Resource.Hook, 10)
+    }
+
+    # Files changed after their operation was completed are pushed again
+    await write_object(org_path, SCHEMA_PATH, {"id": 2, "name": "Renamed schema"})
+    assert not await resumed_log.is_completed(SCHEMA_PATH)
+
+    # Logs of other destinations are not resumed
+    target_log = await PushLog.start(org_path, settings.TARGET_DIRNAME, resume=True)
+    assert target_log.records == {}
+
+    await resumed_log.finish()
+    assert (
+        await PushLog.start(org_path, settings.SOURCE_DIRNAME, resume=True)
+    ).records == {}
+
+
+@pytest.mark.asyncio
+async def test_push_log_ignores_truncated_record(org_path):
+    push_log = await PushLog.start(org_path, settings.SOURCE_DIRNAME)
+    await push_log.record("M", HOOK_PATH, create_url(Resource.Hook, 1), {"id": 1})
+    await push_log.record("M", SCHEMA_PATH, create_url(Resource.Schema, 2), {"id": 2})
+
+    # The push crashed while the last record was written
+    log_path = get_state_path(org_path, settings.PUSH_LOG_FILENAME)
+    lines = (await log_path.read_text()).splitlines(keepends=True)
+    await log_path.write_text("".join(lines[:-1]) + lines[-1][:20])
+
+    resumed_log = await PushLog.start(org_path, settings.SOURCE_DIRNAME, resume=True)
+    assert await resumed_log.is_completed(HOOK_PATH)
+    assert not await resumed_log.is_completed(SCHEMA_PATH)
+
+
+@pytest.mark.asyncio
+async def test_new_push_discards_previous_log(org_path):
+    push_log = await PushLog.start(org_path, settings.SOURCE_DIRNAME)
+    await push_log.record("M", HOOK_PATH, create_url(Resource.Hook, 1), {"id": 1})
+
+    await PushLog.start(org_path, settings.SOURCE_DIRNAME)
+
+    resumed_log = await PushLog.start(org_path, settings.SOURCE_DIRNAME, resume=True)
+    assert not await resumed_log.is_completed(HOOK_PATH)
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from anyio import Path
+
+from project_rossum_deploy.common.local_index import (
+    LocalIndex,
+    get_local_index,
+    read_local_entry,
+    save_local_indexes,
+)
+from project_rossum_deploy.common.local_state import get_state_path
+from project_rossum_deploy.utils.consts import settings
+
+
+def create_object(type: str, id: int) -> dict:
+    return {
+        "id": id,
+        "url": f"https://api.elis.rossum.ai/v1/{type}/{id}",
+        "name": f"{type} {id}",
+        "modified_at": "2024-07-12T10:00:00Z",
+    }
+
+
+async def write_object(path: Path, object: dict) -> Path:
+    await path.parent.mkdir(parents=True, exist_ok=True)
+    await path.write_text(json.dumps(object))
+    return path
+
+
+@pytest.mark.asyncio
+async def test_objects_are_found_by_type_and_id(tmp_path):
+    org_path = Path(tmp_path)
+    source_path = org_path / settings.SOURCE_DIRNAME
+    hook_path = await write_object(
+        source_path / "hooks" / "a.json", create_object("hooks", 1)
+    )
+    schema_path = await write_object(
+        source_path / "schemas" / "a.json", create_object("schemas", 1)
+    )
+    index = LocalIndex(org_path)
+    await index.scan(source_path)
+
+    assert await index.find_object_path(1, type="hooks") == hook_path
+    assert await index.find_object_path(1, type="schemas") == schema_path
+    assert await index.find_object_path(2, type="hooks") is None
+    assert (
+        await index.find_object_path(
+            1, type="hooks", directory=org_path / settings.TARGET_DIRNAME
+        )
+        is None
+    )
+
+    # The lookup follows objects that were moved and removed
+    index.remove(hook_path)
+    assert await index.find_object_path(1, type="hooks") is None
+    moved_path = source_path / "hooks" / "b.json"
+    content = json.dumps(create_object("hooks", 1)).encode()
+    await write_object(moved_path, create_object("hooks", 1))
+    index.update(
+        moved_path, create_object("hooks", 1), content, await moved_path.stat()
+    )
+    assert await index.find_object_path(1, type="hooks") == moved_path
+
+
+@pytest.mark.asyncio
+async def test_files_changed_outside_of_the_index_are_reindexed(tmp_path):
+    org_path = Path(tmp_path)
+    source_path = org_path / settings.SOURCE_DIRNAME
+    path = await write_object(
+        source_path / "hooks" / "a.json", create_object("hooks", 1)
+    )
+    index = LocalIndex(org_path)
+    await index.scan(source_path)
+
+    await write_object(path, {**create_object("hooks", 2), "name": "Changed hook"})
+
+    assert await index.find_object_path(1, type="hooks") is None
+    assert await index.find_object_path(2, type="hooks") == path
+
+    await path.unlink()
+    await index.scan(source_path)
+    assert index.keys_by_object == {}
+
+
+@pytest.mark.asyncio
+async def test_local_entry_is_read_from_files_outside_of_a_project(tmp_path):
+    path = Path(tmp_path) / "hook.json"
+
+    assert await read_local_entry(path) is None
+
+    await write_object(path, create_object("hooks", 1))
+    assert await read_local_entry(path) == create_object("hooks", 1)
+
+
+@pytest.mark.asyncio
+async def test_indexes_are_saved_in_their_project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    source_path = Path(settings.SOURCE_DIRNAME)
+    path = await write_object(
+        source_path / "hooks" / "a.json", create_object("hooks", 1)
+    )
+    index = await get_local_index(source_path)
+    assert await index.scan(source_path) == {path: index.entries["source/hooks/a.json"]}
+    assert await index.find_object_path(1, type="hooks", directory=source_path) == path
+
+    # The index is saved in the project even if the current directory changed since
+    monkeypatch.chdir(tmp_path / settings.SOURCE_DIRNAME)
+    await save_local_indexes()
+    assert await get_state_path(tmp_path, settings.LOCAL_INDEX_FILENAME).exists()
+    assert not await get_state_path(Path("."), settings.LOCAL_INDEX_FILENAME).exists()
@@ -0,0 +1,85 @@
+import pytest
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
+from tests.utils.fake_client import create_url
+
+
+def create_hook(**attributes) -> dict:
+    return {
+        "id": 1,
+        "url": create_url(Resource.Hook, 1),
+        "name": "Hook",
+        "queues": [],
+        "config": {"code": "", "runtime": "python3.12"},
+        "modified_at": "2024-07-12T10:00:00Z",
+        "modified_by": None,
+        **attributes,
+    }
+
+
+@pytest.mark.parametrize(
+    "local_hook,expected",
+    [
+        (create_hook(), True),
+        # Key order does not matter
+        (dict(reversed(create_hook().items())), True),
+        # Keys set by Rossum on every write are not part of the content
+        (create_hook(modified_at="2024-07-13T10:00:00Z", modified_by="user"), True),
+        # Keys that are not stored locally are not compared (IGNORED_KEYS)
+        (create_hook(status="ready"), True),
+        (create_hook(name="Renamed hook"), False),
+        (create_hook(config={"code": "pass", "runtime": "python3.12"}), False),
+    ],
+)
+def test_is_identical(local_hook, expected):
+    remote_timestamps = RemoteTimestamps(
+        {(Resource.Hook, 1): create_hook(status="pending")}
+    )
+
+    assert remote_timestamps.is_identical(Resource.Hook, local_hook) is expected
+
+
+def test_is_identical_requires_complete_remote_object():
+    remote_hook = create_hook()
+    del remote_hook["config"]
+    remote_timestamps = RemoteTimestamps({(Resource.Hook, 1): remote_hook})
+
+    assert not remote_timestamps.is_identical(Resource.Hook, create_hook())
+    assert not remote_timestamps.is_identical(Resource.Hook, create_hook(id=2))
+
+
+def test_find_conflicts():
+    remote_timestamps = RemoteTimestamps({(Resource.Hook, 1): create_hook()})
+    outdated_hook = create_hook(modified_at="2024-07-11T10:00:00Z")
+
+    assert remote_timestamps.find_conflicts(
+        [
+            (Resource.Hook, create_hook()),
+            (Resource.Hook, outdated_hook),
+            (Resource.Hook, create_hook(id=2)),
+        ]
+    ) == [(Resource.Hook, outdated_hook)]
+
+
+def test_stored_hook_invalidates_cached_queues():
+    queue = {"id": 2, "url": create_url(Resource.Queue, 2), "hooks": []}
+    other_queue = {"id": 3, "url": create_url(Resource.Queue, 3), "hooks": []}
+    unrelated_queue = {"id": 4, "url": create_url(Resource.Queue, 4), "hooks": []}
+    remote_timestamps = RemoteTimestamps(
+        {
+            (Resource.Hook, 1): create_hook(queues=[queue["url"]]),
+            (Resource.Queue, 2): queue,
+            (Resource.Queue, 3): other_queue,
+            (Resource.Queue, 4): unrelated_queue,
+        }
+    )
+
+    updated_hook = create_hook(queues=[other_queue["url"]])
+    remote_timestamps.store(Resource.Hook, updated_hook)
+
+    # Rossum detached the hook from the previous queue and attached it to the new one
+    assert remote_timestamps.get_object(Resource.Hook, 1) == updated_hook
+    assert not remote_timestamps.is_fetched(Resource.Queue, 2)
+    assert not remote_timestamps.is_fetched(Resource.Queue, 3)
+    assert remote_timestamps.get_object(Resource.Queue, 4) == unrelated_queue
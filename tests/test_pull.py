@@ -0,0 +1,126 @@
+import json
+
+import pytest
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.download.download import (
+    download_organization_single,
+)
+from project_rossum_deploy.commands.download.helpers import (
+    index_remote_objects,
+    remove_local_nonexistent_objects,
+)
+from project_rossum_deploy.common.mapping import create_empty_mapping
+from project_rossum_deploy.utils.consts import settings
+from tests.utils.fake_client import FakeClient, create_url
+
+ORGANIZATION = {
+    "id": 100,
+    "url": create_url(Resource.Organization, 100),
+    "name": "Organization",
+    "modified_at": "2024-07-12T10:00:00Z",
+}
+SCHEMA = {
+    "id": 2,
+    "url": create_url(Resource.Schema, 2),
+    "name": "Schema",
+    "content": [
+        {
+            "category": "section",
+            "id": "totals",
+            "children": [
+                {"category": "datapoint", "id": "total", "formula": "return 1"}
+            ],
+        }
+    ],
+    "modified_at": "2024-07-12T10:00:00Z",
+}
+HOOK = {
+    "id": 1,
+    "url": create_url(Resource.Hook, 1),
+    "name": "Hook",
+    "queues": [],
+    "extension_source": "custom",
+    "config": {"code": "pass", "runtime": "python3.12"},
+    "modified_at": "2024-07-12T10:00:00Z",
+}
+
+
+def create_client(objects: list[tuple[Resource, dict]]) -> FakeClient:
+    # Schema content is only returned by the detail endpoint
+    return FakeClient(
+        [(Resource.Organization, ORGANIZATION), *objects],
+        list_omitted_attributes={Resource.Schema: ["content"]},
+    )
+
+
+async def pull(client: FakeClient, org_path: Path):
+    _, workspaces, schemas, hooks = await download_organization_single(
+        client=client, org_path=org_path, destination=settings.SOURCE_DIRNAME
+    )
+    await remove_local_nonexistent_objects(
+        index_remote_objects(workspaces, schemas, hooks),
+        org_path,
+        settings.SOURCE_DIRNAME,
+        create_empty_mapping(),
+    )
+
+
+@pytest.mark.asyncio
+async def test_objects_deleted_or_renamed_in_rossum_are_removed(tmp_path):
+    org_path = Path(tmp_path)
+    source_path = org_path / settings.SOURCE_DIRNAME
+    await pull(
+        create_client([(Resource.Schema, SCHEMA), (Resource.Hook, HOOK)]), org_path
+    )
+    assert await (source_path / "hooks" / "Hook_[1].py").exists()
+    assert await (source_path / "schemas" / "formulas:Schema_[2]" / "total.py").exists()
+
+    renamed_schema = {
+        **SCHEMA,
+        "name": "Renamed schema",
+        "modified_at": "2024-07-13T10:00:00Z",
+    }
+    await pull(create_client([(Resource.Schema, renamed_schema)]), org_path)
+
+    assert not await (source_path / "hooks").exists()
+    assert not await (source_path / "schemas" / "Schema_[2].json").exists()
+    assert not await (source_path / "schemas" / "formulas:Schema_[2]").exists()
+    assert await (source_path / "schemas" / "Renamed schema_[2].json").exists()
+    assert await (
+        source_path / "schemas" / "formulas:Renamed schema_[2]" / "total.py"
+    ).exists()
+
+
+@pytest.mark.asyncio
+async def test_hooks_attached_from_queue_side_are_pulled(tmp_path):
+    org_path = Path(tmp_path)
+    hook_path = org_path / settings.SOURCE_DIRNAME / "hooks" / "Hook_[1].json"
+    await pull(create_client([(Resource.Hook, HOOK)]), org_path)
+
+    # Attaching the hook to a queue does not update the hook's modified_at
+    attached_hook = {**HOOK, "queues": [create_url(Resource.Queue, 3)]}
+    await pull(create_client([(Resource.Hook, attached_hook)]), org_path)
+
+    assert json.loads(await hook_path.read_text())["queues"] == attached_hook["queues"]
+
+
+@pytest.mark.asyncio
+async def test_unchanged_objects_are_kept(tmp_path):
+    org_path = Path(tmp_path)
+    source_path = org_path / settings.SOURCE_DIRNAME
+    await pull(
+        create_client([(Resource.Schema, SCHEMA), (Resource.Hook, HOOK)]), org_path
+    )
+
+    client = create_client([(Resource.Schema, SCHEMA), (Resource.Hook, HOOK)])
+    await pull(client, org_path)
+
+    # Nothing changed since the last pull, so only the listings were requested
+    assert not [
+        request for request in client._http_client.requests if request[0] != "fetch_all"
+    ]
+    assert await (source_path / "schemas" / "Schema_[2].json").exists()
+    assert await (source_path / "schemas" / "formulas:Schema_[2]" / "total.py").exists()
+    assert await (source_path / "hooks" / "Hook_[1].py").exists()
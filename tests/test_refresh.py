@@ -0,0 +1,150 @@
+import json
+from copy import deepcopy
+
+import pytest
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.upload.refresh import (
+    is_stored_under_name,
+    refresh_pushed_objects,
+)
+from project_rossum_deploy.common.local_index import get_local_index
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
+from project_rossum_deploy.utils.consts import settings
+from tests.utils.fake_client import FakeClient, create_url
+
+HOOK_PATH = Path("source/hooks/Hook_[1].json")
+QUEUE_PATH = Path("source/workspaces/Workspace_[3]/queues/Queue_[2]/queue.json")
+
+HOOK = {
+    "id": 1,
+    "url": create_url(Resource.Hook, 1),
+    "name": "Hook",
+    "queues": [],
+    "modified_at": "2024-07-12T10:00:00Z",
+}
+QUEUE = {
+    "id": 2,
+    "url": create_url(Resource.Queue, 2),
+    "name": "Queue",
+    "workspace": create_url(Resource.Workspace, 3),
+    "hooks": [],
+    "webhooks": [],
+    "modified_at": "2024-07-12T10:00:00Z",
+}
+
+
+@pytest.mark.parametrize(
+    "path,name,expected",
+    [
+        ("source/hooks/Hook_[1].json", "Hook", True),
+        ("source/hooks/Hook_[1].json", "Renamed hook", False),
+        ("source/hooks/Hook_[1].json", "Hook/", True),
+        ("source/workspaces/Workspace_[3]/queues/Hook_[1]/queue.json", "Hook", True),
+        ("source/workspaces/Workspace_[3]/queues/Hook_[1]/inbox.json", "Other", True),
+        ("source/organization.json", "Other", True),
+    ],
+)
+def test_is_stored_under_name(path, name, expected):
+    assert is_stored_under_name(Path(path), {"id": 1, "name": name}) is expected
+
+
+async def create_project(tmp_path) -> Path:
+    org_path = Path(tmp_path)
+    for path, object in [(HOOK_PATH, HOOK), (QUEUE_PATH, QUEUE)]:
+        await (org_path / path).parent.mkdir(parents=True, exist_ok=True)
+        await (org_path / path).write_text(json.dumps(object))
+    # The index is kept up to date by pulls in practice
+    source_path = org_path / settings.SOURCE_DIRNAME
+    await (await get_local_index(source_path)).scan(source_path)
+    return org_path
+
+
+async def push_hook(client: FakeClient, **attributes) -> tuple[dict, dict]:
+    local_hook = {**HOOK, **attributes}
+    result = await client._http_client.update(Resource.Hook, 1, local_hook)
+    return local_hook, result
+
+
+@pytest.mark.asyncio
+async def test_objects_changed_by_rossum_are_pulled(tmp_path):
+    org_path = await create_project(tmp_path)
+    client = FakeClient([(Resource.Hook, HOOK), (Resource.Queue, QUEUE)])
+    remote_timestamps = RemoteTimestamps({(Resource.Hook, 1): deepcopy(HOOK)})
+
+    local_hook, result = await push_hook(client, queues=[QUEUE["url"]])
+    is_refreshed = await refresh_pushed_objects(
+        client=client,
+        org_path=org_path,
+        destination=settings.SOURCE_DIRNAME,
+        pushed_objects=[(org_path / HOOK_PATH, local_hook, result)],
+        remote_timestamps=remote_timestamps,
+    )
+
+    assert is_refreshed
+    queue = json.loads(await (org_path / QUEUE_PATH).read_text())
+    assert queue["hooks"] == [HOOK["url"]]
+    assert queue["modified_at"] == QUEUE["modified_at"]
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_pulled_without_changed_references(tmp_path):
+    org_path = await create_project(tmp_path)
+    client = FakeClient([(Resource.Hook, HOOK), (Resource.Queue, QUEUE)])
+    remote_timestamps = RemoteTimestamps({(Resource.Hook, 1): deepcopy(HOOK)})
+
+    local_hook, result = await push_hook(client, config={"code": "pass"})
+    assert await refresh_pushed_objects(
+        client=client,
+        org_path=org_path,
+        destination=settings.SOURCE_DIRNAME,
+        pushed_objects=[(org_path / HOOK_PATH, local_hook, result)],
+        remote_timestamps=remote_timestamps,
+    )
+
+    assert [request[0] for request in client._http_client.requests] == ["update"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "attributes,previous_objects",
+    [
+        # Renamed objects are moved to a new path
+        ({"name": "Renamed hook"}, {(Resource.Hook, 1): HOOK}),
+        # Created objects have no previous version
+        ({}, {}),
+    ],
+)
+async def test_full_pull_is_needed(tmp_path, attributes, previous_objects):
+    org_path = await create_project(tmp_path)
+    client = FakeClient([(Resource.Hook, HOOK), (Resource.Queue, QUEUE)])
+
+    local_hook, result = await push_hook(client, **attributes)
+
+    assert not await refresh_pushed_objects(
+        client=client,
+        org_path=org_path,
+        destination=settings.SOURCE_DIRNAME,
+        pushed_objects=[(org_path / HOOK_PATH, local_hook, result)],
+        remote_timestamps=RemoteTimestamps(deepcopy(previous_objects)),
+    )
+
+
+@pytest.mark.asyncio
+async def test_full_pull_is_needed_for_objects_missing_locally(tmp_path):
+    org_path = await create_project(tmp_path)
+    other_queue = {**QUEUE, "id": 4, "url": create_url(Resource.Queue, 4)}
+    client = FakeClient(
+        [(Resource.Hook, HOOK), (Resource.Queue, QUEUE), (Resource.Queue, other_queue)]
+    )
+
+    local_hook, result = await push_hook(client, queues=[other_queue["url"]])
+
+    assert not await refresh_pushed_objects(
+        client=client,
+        org_path=org_path,
+        destination=settings.SOURCE_DIRNAME,
+        pushed_objects=[(org_path / HOOK_PATH, local_hook, result)],
+        remote_timestamps=RemoteTimestamps({(Resource.Hook, 1): deepcopy(HOOK)}),
+    )
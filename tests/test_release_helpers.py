@@ -0,0 +1,174 @@
+from copy import deepcopy
+
+from anyio import Path
+import pytest
+from rich.progress import Progress
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.migrate.migrate import release_objects
+from project_rossum_deploy.commands.migrate.upload_helpers import upload_hook
+from project_rossum_deploy.commands.migrate.workspaces import prepare_queue_upload
+from project_rossum_deploy.common.modified_at import RemoteTimestamps
+from project_rossum_deploy.common.read_write import write_json
+from project_rossum_deploy.utils.consts import settings
+from tests.utils.fake_client import FakeClient, create_url
+
+TARGET_QUEUE = {
+    "id": 40,
+    "url": create_url(Resource.Queue, 40),
+    "name": "Target queue",
+    "workspace": create_url(Resource.Workspace, 10),
+    "schema": create_url(Resource.Schema, 20),
+    "hooks": [create_url(Resource.Hook, 50)],
+    "webhooks": [create_url(Resource.Hook, 50)],
+    "modified_at": "2024-01-01",
+}
+TARGET_HOOK = {
+    "id": 50,
+    "url": create_url(Resource.Hook, 50),
+    "name": "Target hook",
+    "queues": [create_url(Resource.Queue, 40)],
+    "modified_at": "2024-01-01",
+}
+SOURCE_QUEUE = {
+    "id": 4,
+    "url": create_url(Resource.Queue, 4),
+    "name": "Source queue",
+    "workspace": create_url(Resource.Workspace, 1),
+    "schema": create_url(Resource.Schema, 2),
+    "hooks": [create_url(Resource.Hook, 5)],
+    "webhooks": [create_url(Resource.Hook, 5)],
+    "inbox": None,
+}
+# Hooks are released without queues, queues attach them afterwards
+SOURCE_HOOK = {
+    "id": 5,
+    "url": create_url(Resource.Hook, 5),
+    "name": "Source hook",
+    "queues": [],
+    "run_after": [],
+}
+SOURCE_ID_TARGET_PAIRS = {
+    1: [{"id": 10}],
+    2: [{"id": 20}],
+    5: [{"id": 50}],
+}
+
+
+@pytest.mark.asyncio
+async def test_rereleased_queue_reattaches_released_hooks():
+    client = FakeClient([(Resource.Queue, TARGET_QUEUE), (Resource.Hook, TARGET_HOOK)])
+    target_objects = {40: deepcopy(TARGET_QUEUE), 50: deepcopy(TARGET_HOOK)}
+    remote_timestamps = await RemoteTimestamps.fetch(
+        client, {Resource.Queue: {40}, Resource.Hook: {50}}
+    )
+
+    await upload_hook(
+        client=client,
+        hook=deepcopy(SOURCE_HOOK),
+        hook_mapping={},
+        target_id=50,
+        progress=None,
+        target_objects=target_objects,
+        errors={},
+        remote_timestamps=remote_timestamps,
+    )
+    # Rossum detached the hook from the queue
+    assert client._http_client.objects[(Resource.Queue, 40)]["hooks"] == []
+
+    errors = {}
+    await prepare_queue_upload(
+        queue=SOURCE_QUEUE,
+        client=client,
+        target_index=0,
+        target_objects_count=1,
+        source_id_target_pairs=SOURCE_ID_TARGET_PAIRS,
+        target_id=40,
+        target_objects=target_objects,
+        errors=errors,
+        remote_timestamps=remote_timestamps,
+    )
+
+    target_queue = client._http_client.objects[(Resource.Queue, 40)]
+    assert not errors
+    # The queue cached before the hook was released is outdated, the current version is used instead
+    assert ("fetch_one", Resource.Queue, 40) in client._http_client.requests
+    assert target_queue["hooks"] == [TARGET_HOOK["url"]]
+    assert target_queue["webhooks"] == [TARGET_HOOK["url"]]
+    assert client._http_client.objects[(Resource.Hook, 50)]["queues"] == [
+        TARGET_QUEUE["url"]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_queue_is_not_released_when_its_workspace_fails(
+    tmp_path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(settings, "IS_PROJECT_IN_SAME_ORG", True)
+    source_path = Path(tmp_path) / settings.SOURCE_DIRNAME
+    organization = {"id": 100, "url": create_url(Resource.Organization, 100)}
+    schema = {"id": 2, "url": create_url(Resource.Schema, 2), "name": "Schema"}
+    target_schema = {**schema, "id": 20, "url": create_url(Resource.Schema, 20)}
+    workspace = {
+        "id": 1,
+        "url": create_url(Resource.Workspace, 1),
+        "name": "Workspace",
+        "organization": organization["url"],
+    }
+    queue = {**SOURCE_QUEUE, "hooks": [], "webhooks": []}
+    await write_json(source_path / "organization.json", organization)
+    await write_json(source_path / "schemas" / "Schema_[2].json", schema)
+    await (source_path / "hooks").mkdir()
+    await write_json(
+        source_path / "workspaces" / "Workspace_[1]" / "workspace.json", workspace
+    )
+    await write_json(
+        source_path
+        / "workspaces"
+        / "Workspace_[1]"
+        / "queues"
+        / "Source queue_[4]"
+        / "queue.json",
+        queue,
+    )
+    mapping = {
+        "organization": {
+            "id": 100,
+            "targets": [{"target_id": 100}],
+            "schemas": [{"id": 2, "targets": [{"target_id": 20}]}],
+            "hooks": [],
+            "workspaces": [
+                {
+                    "id": 1,
+                    # The target workspace was not pulled, so releasing it fails
+                    "targets": [{"target_id": 10}],
+                    "queues": [{"id": 4, "targets": [{}], "inbox": {"targets": []}}],
+                }
+            ],
+        }
+    }
+    client = FakeClient(
+        [(Resource.Organization, organization), (Resource.Schema, target_schema)]
+    )
+
+    with Progress() as progress:
+        await release_objects(
+            source_path=source_path,
+            client=client,
+            mapping=mapping,
+            source_id_target_pairs={},
+            sources_by_source_id_map={},
+            target_organization_id=100,
+            progress=progress,
+            target_objects={100: organization, 20: target_schema},
+            errors={},
+        )
+
+    assert ("update", Resource.Schema, 20) in [
+        request[:3] for request in client._http_client.requests
+    ]
+    assert not [
+        request
+        for request in client._http_client.requests
+        if request[0] == "create" and request[1] == Resource.Queue
+    ]
@@ -0,0 +1,105 @@
+import json
+
+import pytest
+from anyio import Path
+from rossum_api.api_client import Resource
+
+from project_rossum_deploy.commands.upload.scheduler import (
+    DuplicateUrlException,
+    build_push_graph,
+)
+from project_rossum_deploy.utils.consts import GIT_CHARACTERS
+from tests.utils.fake_client import create_url
+
+SCHEMA_PATH = Path("source/schemas/Schema_[1].json")
+SCHEMA_COPY_PATH = Path("source/schemas/Schema copy_[1].json")
+QUEUE_PATH = Path("source/workspaces/Workspace_[1]/queues/Queue_[2]/queue.json")
+
+
+async def write_objects(org_path: Path, objects: dict[Path, dict]):
+    for path, object in objects.items():
+        await (org_path / path).parent.mkdir(parents=True, exist_ok=True)
+        await (org_path / path).write_text(json.dumps(object))
+
+
+def create_schema() -> dict:
+    return {"id": 1, "url": create_url(Resource.Schema, 1), "name": "Schema"}
+
+
+def create_queue() -> dict:
+    return {
+        "id": 2,
+        "url": create_url(Resource.Queue, 2),
+        "name": "Queue",
+        "schema": create_url(Resource.Schema, 1),
+        "workspace": create_url(Resource.Workspace, 1),
+        "hooks": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_objects_depend_on_pushed_references(tmp_path):
+    org_path = Path(tmp_path)
+    await write_objects(
+        org_path, {SCHEMA_PATH: create_schema(), QUEUE_PATH: create_queue()}
+    )
+
+    objects, urls, dependencies = await build_push_graph(
+        org_path,
+        [(GIT_CHARACTERS.UPDATED, SCHEMA_PATH), (GIT_CHARACTERS.UPDATED, QUEUE_PATH)],
+    )
+
+    assert objects == {SCHEMA_PATH: create_schema(), QUEUE_PATH: create_queue()}
+    assert urls == {
+        SCHEMA_PATH: create_url(Resource.Schema, 1),
+        QUEUE_PATH: create_url(Resource.Queue, 2),
+    }
+    # The workspace is not pushed, it already exists in Rossum
+    assert dependencies == {SCHEMA_PATH: set(), QUEUE_PATH: {SCHEMA_PATH}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("copy_first", [False, True])
+async def test_copied_urls_stand_for_the_original_object(tmp_path, copy_first):
+    org_path = Path(tmp_path)
+    await write_objects(
+        org_path,
+        {
+            SCHEMA_PATH: create_schema(),
+            SCHEMA_COPY_PATH: {**create_schema(), "name": "Schema copy"},
+            QUEUE_PATH: create_queue(),
+        },
+    )
+    changes = [
+        (GIT_CHARACTERS.UPDATED, SCHEMA_PATH),
+        (GIT_CHARACTERS.CREATED, SCHEMA_COPY_PATH),
+    ]
+
+    _, urls, dependencies = await build_push_graph(
+        org_path,
+        [
+            *(reversed(changes) if copy_first else changes),
+            (GIT_CHARACTERS.UPDATED, QUEUE_PATH),
+        ],
+    )
+
+    assert urls[SCHEMA_PATH] == create_url(Resource.Schema, 1)
+    assert urls[SCHEMA_COPY_PATH] is None
+    assert dependencies[QUEUE_PATH] == {SCHEMA_PATH}
+
+
+@pytest.mark.asyncio
+async def test_updated_files_with_the_same_url_are_refused(tmp_path):
+    org_path = Path(tmp_path)
+    await write_objects(
+        org_path, {SCHEMA_PATH: create_schema(), SCHEMA_COPY_PATH: create_schema()}
+    )
+
+    with pytest.raises(DuplicateUrlException):
+        await build_push_graph(
+            org_path,
+            [
+                (GIT_CHARACTERS.UPDATED, SCHEMA_PATH),
+                (GIT_CHARACTERS.UPDATED, SCHEMA_COPY_PATH),
+            ],
+        )
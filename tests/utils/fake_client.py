@@ -0,0 +1,104 @@
+from copy import deepcopy
+
+from rossum_api.api_client import Resource
+
+API_URL = "https://api.test/v1"
+
+
+def create_url(resource: Resource, id: int) -> str:
+    return f"{API_URL}/{resource.value}/{id}"
+
+
+class FakeHttpClient:
+    """In-memory stand-in for the HTTP client of ElisAPIClient used by unit tests.
+
+    Writes of hook.queues are mirrored to queue.hooks/webhooks (and back) the same way Rossum does it.
+    """
+
+    def __init__(
+        self,
+        objects: list[tuple[Resource, dict]] = [],
+        list_omitted_attributes: dict[Resource, list[str]] = {},
+    ):
+        # Attributes that the list endpoint does not return (e.g., schema content)
+        self.list_omitted_attributes = list_omitted_attributes
+        self.objects = {
+            (resource, object["id"]): deepcopy(object) for resource, object in objects
+        }
+        self.requests = []
+        self.writes = 0
+
+    async def fetch_one(self, resource: Resource, id: int) -> dict:
+        self.requests.append(("fetch_one", resource, id))
+        return deepcopy(self.objects[(resource, id)])
+
+    async def fetch_all(self, resource: Resource, **filters):
+        self.requests.append(("fetch_all", resource, filters))
+        ids = set(map(int, str(filters["id"]).split(","))) if "id" in filters else None
+        for (object_resource, id), object in list(self.objects.items()):
+            if object_resource == resource and (ids is None or id in ids):
+                omitted_attributes = self.list_omitted_attributes.get(resource, [])
+                yield {
+                    key: deepcopy(value)
+                    for key, value in object.items()
+                    if key not in omitted_attributes
+                }
+
+    async def update(self, resource: Resource, id_: int, data: dict) -> dict:
+        self.requests.append(("update", resource, id_, deepcopy(data)))
+        object = self.objects[(resource, id_)]
+        # Read-only attributes are ignored like in the API
+        object.update(
+            {
+                key: deepcopy(value)
+                for key, value in data.items()
+                if key not in ("id", "url")
+            }
+        )
+        self.bump_modified_at(object)
+        if resource == Resource.Hook and "queues" in data:
+            self.mirror_hook_queues(object)
+        elif resource == Resource.Queue and ("hooks" in data or "webhooks" in data):
+            self.mirror_queue_hooks(object)
+        return deepcopy(object)
+
+    async def create(self, resource: Resource, data: dict) -> dict:
+        self.requests.append(("create", resource, deepcopy(data)))
+        id = max([id for _, id in self.objects] + [0]) + 1
+        object = {**deepcopy(data), "id": id, "url": create_url(resource, id)}
+        self.bump_modified_at(object)
+        self.objects[(resource, id)] = object
+        return deepcopy(object)
+
+    def bump_modified_at(self, object: dict):
+        self.writes += 1
+        object["modified_at"] = f"modified-{self.writes}"
+
+    def mirror_hook_queues(self, hook: dict):
+        for (resource, _), queue in self.objects.items():
+            if resource != Resource.Queue:
+                continue
+            for attribute in ("hooks", "webhooks"):
+                urls = [url for url in queue.get(attribute, []) if url != hook["url"]]
+                if queue["url"] in hook["queues"]:
+                    urls.append(hook["url"])
+                queue[attribute] = urls
+
+    def mirror_queue_hooks(self, queue: dict):
+        hook_urls = set(queue.get("hooks", [])) | set(queue.get("webhooks", []))
+        for (resource, _), hook in self.objects.items():
+            if resource != Resource.Hook:
+                continue
+            queues = [url for url in hook.get("queues", []) if url != queue["url"]]
+            if hook["url"] in hook_urls:
+                queues.append(queue["url"])
+            hook["queues"] = queues
+
+
+class FakeClient:
+    def __init__(
+        self,
+        objects: list[tuple[Resource, dict]] = [],
+        list_omitted_attributes: dict[Resource, list[str]] = {},
+    ):
+        self._http_client = FakeHttpClient(objects, list_omitted_attributes)